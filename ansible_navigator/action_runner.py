@@ -48,7 +48,10 @@ class ActionRunner(App):
             interaction = Interaction(
                 name=name, action=action, menu=None, content=None, ui=self._ui._ui
             )
-            self._run_app(interaction)
+            try:
+                self._run_app(interaction)
+            finally:
+                self._ui.close()
 
     def _run_app(self, initial_interaction: Interaction) -> None:
         """enter the endless loop"""
@@ -23,6 +23,7 @@ from ._runner import PlaybookRunner
 from ..app import App
 from ..app_public import AppPublic
 
+from ..stats import STATS
 from ..steps import Step
 
 from ..ui_framework import CursesLinePart
@@ -30,6 +31,8 @@ from ..ui_framework import CursesLines
 from ..ui_framework import Interaction
 from ..ui_framework import dict_to_form
 from ..ui_framework.form_utils import form_to_dict
+from ..ui_framework.utils import forget
+from ..ui_framework.utils import touch
 
 
 from ..utils import check_for_ansible
@@ -263,6 +266,7 @@ class Action(App):
                     self.write_artifact(self.args.artifact)
                 self._logger.debug("runner finished")
                 break
+        self._forget_plays()
 
     def run(self, interaction: Interaction, app: AppPublic) -> None:
         # pylint: disable=too-many-branches
@@ -324,12 +328,17 @@ class Action(App):
 
             if self.steps.current.name == "quit":
                 if self.args.app == "load":
-                    return self.steps.current
+                    break
                 done = self._prepare_to_quit(self.steps.current)
                 if done:
-                    return self.steps.current
+                    break
                 self.steps.back_one()
 
+        # the rows won't be shown again, let them go
+        self._forget_plays()
+        if self.steps:
+            # quitting
+            return self.steps.current
         interaction.ui.scroll(previous_scroll)
         return None
 
@@ -408,6 +417,7 @@ class Action(App):
         version = data.get("version", "")
         if version.startswith("1."):
             try:
+                self._forget_plays()
                 self._plays.value = data["plays"]
                 self._interaction.ui.update_status(data["status"], data["status_color"])
                 self.stdout = data["stdout"]
@@ -508,7 +518,8 @@ class Action(App):
             )
         elif isinstance(self.steps.current, Step):
             if self.steps.current.show_func:
-                self.steps.current.show_func()
+                with STATS.timer("explore.{name}.show_func".format(name=self.steps.current.name)):
+                    self.steps.current.show_func()
 
             if self.steps.current.type == "menu":
 
@@ -596,10 +607,13 @@ class Action(App):
     def _dequeue(self) -> None:
         """Drain the runner queue"""
         drain_count = 0
-        while not self._queue.empty():
-            message = self._queue.get()
-            self._handle_message(message)
-            drain_count += 1
+        STATS.gauge("explore.queue_depth", self._queue.qsize())
+        with STATS.timer("explore.dequeue"):
+            while not self._queue.empty():
+                message = self._queue.get()
+                self._handle_message(message)
+                drain_count += 1
+        STATS.gauge("explore.stdout_lines", len(self.stdout))
         if drain_count:
             self._logger.debug("Drained %s events", drain_count)
 
@@ -651,6 +665,7 @@ class Action(App):
                             break
                 if task_id is not None:
                     self._plays.value[play_id]["tasks"][task_id].update(task)
+                    touch(self._plays.value[play_id]["tasks"][task_id])
 
             elif runner_event == "start":
                 task["__host"] = task["host"]
@@ -666,27 +681,26 @@ class Action(App):
         """Calculate the play's stats based
         on it's tasks
         """
-        for idx, play in enumerate(self._plays.value):
+        for play in self._plays.value:
             total = ["__ok", "__skipped", "__failed", "__unreachable", "__ignored", "__in_progress"]
-            self._plays.value[idx].update(
-                {
-                    tot: len([t for t in play["tasks"] if t["__result"].lower() == tot[2:]])
-                    for tot in total
-                }
-            )
-            self._plays.value[idx]["__changed"] = len(
-                [t for t in play["tasks"] if t["__changed"] is True]
-            )
+            stats: Dict[str, Any] = {
+                tot: len([t for t in play["tasks"] if t["__result"].lower() == tot[2:]])
+                for tot in total
+            }
+            stats["__changed"] = len([t for t in play["tasks"] if t["__changed"] is True])
             task_count = len(play["tasks"])
-            self._plays.value[idx]["__task_count"] = task_count
-            completed = task_count - self._plays.value[idx]["__in_progress"]
+            stats["__task_count"] = task_count
+            completed = task_count - stats["__in_progress"]
             if completed:
                 new = round((completed / task_count * 100))
-                current = self._plays.value[idx].get("__pcomplete", 0)
-                self._plays.value[idx]["__pcomplete"] = max(new, current)
-                self._plays.value[idx]["__% completed"] = str(max(new, current)) + "%"
+                current = play.get("__pcomplete", 0)
+                stats["__pcomplete"] = max(new, current)
+                stats["__% completed"] = str(max(new, current)) + "%"
             else:
-                self._plays.value[idx]["__% completed"] = "0%"
+                stats["__% completed"] = "0%"
+            if any(play.get(key) != value for key, value in stats.items()):
+                play.update(stats)
+                touch(play)
 
     def _prepare_to_quit(self, interaction: Interaction) -> bool:
         """Looks like we're headed out of here
@@ -711,6 +725,13 @@ class Action(App):
         self._logger.debug("runner not running")
         return True
 
+    def _forget_plays(self) -> None:
+        """Forget the versions of the plays and their tasks, so they can be freed"""
+        for play in self._plays.value:
+            for task in play["tasks"]:
+                forget(task)
+            forget(play)
+
     def _task_list_for_play(self) -> Step:
         """generate a menu of task for the currently selected play
 
@@ -745,8 +766,9 @@ class Action(App):
         self._calling_app.update()
 
         if self.runner:
-            self._dequeue()
-            self._set_status()
+            with STATS.timer("explore.update"):
+                self._dequeue()
+                self._set_status()
 
             if self.runner.finished and not self._runner_finished:
                 # self._interaction.ui.disable_refresh()
@@ -807,6 +829,7 @@ class Action(App):
         """
         if self.runner.finished:
             if self._subaction_type == "explore":
+                self._forget_plays()
                 self._plays.value = []
                 self._plays.index = None
                 self._msg_from_plays = (None, None)
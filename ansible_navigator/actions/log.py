@@ -2,7 +2,10 @@
 import logging
 from . import _actions as actions
 from ..app_public import AppPublic
+from ..ui_framework import Content
 from ..ui_framework import Interaction
+from ..ui_framework import Tail
+from ..utils import FileTail
 
 
 @actions.register
@@ -29,15 +32,16 @@ class Action:
         previous_scroll = interaction.ui.scroll()
         interaction.ui.scroll(0)
         auto_scroll = True
+        # only what was added is read, and only the lines showing are colored
+        tail = FileTail(app.args.logfile)
         while True:
-            with open(app.args.logfile) as fhand:
-                dalog = fhand.read()
+            tail.read()
 
-            new_scroll = len(dalog.splitlines())
+            new_scroll = len(tail.lines)
             if auto_scroll:
                 interaction.ui.scroll(new_scroll)
 
-            interaction = interaction.ui.show(obj=dalog, xform="text.log")
+            interaction = interaction.ui.show(obj=Tail(tail.lines), xform="text.log")
             app.update()
             if interaction.name != "refresh":
                 break
@@ -49,5 +53,8 @@ class Action:
                 self._logger.debug("autoscroll enabled")
                 auto_scroll = True
 
+        if interaction.content is not None:
+            # the text, for the next action, eg to write it to a file
+            interaction = interaction._replace(content=Content(showing="\n".join(tail.lines)))
         interaction.ui.scroll(previous_scroll)
         return interaction
@@ -0,0 +1,45 @@
+""" :stats """
+import logging
+from typing import Union
+
+from . import _actions as actions
+from ..app_public import AppPublic
+from ..stats import STATS
+from ..ui_framework import Interaction
+
+
+@actions.register
+class Action:
+    """:stats"""
+
+    # pylint: disable=too-few-public-methods
+
+    KEGEX = r"^stats(\s(?P<log>log))?$"
+
+    def __init__(self, args):
+        self._args = args
+        self._logger = logging.getLogger(__name__)
+
+    def run(self, interaction: Interaction, app: AppPublic) -> Union[Interaction, None]:
+        """Handle :stats
+
+        :param interaction: The interaction from the user
+        :type interaction: Interaction
+        :param app: The app instance
+        :type app: App
+        """
+        self._logger.debug("stats requested")
+        if interaction.action.match.groupdict()["log"]:
+            STATS.log()
+            self._logger.info("Render statistics written to the log")
+            return None
+
+        previous_scroll = interaction.ui.scroll()
+        interaction.ui.scroll(0)
+        while True:
+            app.update()
+            interaction = interaction.ui.show(obj=STATS.summary(), xform="source.yaml")
+            if interaction.name != "refresh":
+                break
+        interaction.ui.scroll(previous_scroll)
+        return interaction
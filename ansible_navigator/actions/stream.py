@@ -3,7 +3,9 @@ import logging
 
 from . import _actions as actions
 from ..app_public import AppPublic
+from ..ui_framework import Content
 from ..ui_framework import Interaction
+from ..ui_framework.colorize import AnsiLineStore
 
 
 @actions.register
@@ -31,14 +33,15 @@ class Action:
         previous_scroll = interaction.ui.scroll()
         interaction.ui.scroll(0)
         auto_scroll = True
+        # reads stdout as it grows, only the lines showing are converted
+        lines = AnsiLineStore(app.stdout)
         while True:
             app.update()
 
             new_scroll = len(app.stdout)
             if auto_scroll:
                 interaction.ui.scroll(new_scroll)
-            obj = "\n".join(app.stdout)
-            next_interaction: Interaction = interaction.ui.show(obj=obj, xform="source.ansi")
+            next_interaction: Interaction = interaction.ui.show(obj=lines, xform="source.ansi")
             if next_interaction.name != "refresh":
                 break
 
@@ -49,5 +52,10 @@ class Action:
                 self._logger.debug("autoscroll enabled")
                 auto_scroll = True
 
+        if next_interaction.content is not None:
+            # the text, for the next action, eg to write it to a file
+            next_interaction = next_interaction._replace(
+                content=Content(showing="\n".join(app.stdout))
+            )
         interaction.ui.scroll(previous_scroll)
         return next_interaction
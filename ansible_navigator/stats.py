@@ -0,0 +1,135 @@
+""" timings, gauges and cache statistics for the render pipeline
+"""
+import logging
+import time
+
+from collections import deque
+from contextlib import contextmanager
+from typing import Any
+from typing import Callable
+from typing import Deque
+from typing import Dict
+from typing import Iterator
+
+RING_SIZE = 500
+
+
+def lru_cache_info(func: Any) -> Callable[[], Dict[str, int]]:
+    """Adapt a functools.lru_cache wrapped function's cache_info
+    for Stats.register_cache
+
+    :param func: The lru_cache wrapped function
+    :type func: callable
+    :return: A callable returning the hits, misses and size of the cache
+    :rtype: callable
+    """
+
+    def info() -> Dict[str, int]:
+        cache_info = func.cache_info()
+        return {"hits": cache_info.hits, "misses": cache_info.misses, "size": cache_info.currsize}
+
+    return info
+
+
+def _percentile(ordered: list, percent: int) -> float:
+    """Return a percentile from an ordered list"""
+    return ordered[min(len(ordered) - 1, len(ordered) * percent // 100)]
+
+
+class Stats:
+    """Keep the most recent timings for each stage in a ring buffer,
+    along with gauges (eg queue depths) and cache statistics
+    """
+
+    def __init__(self, ring_size: int = RING_SIZE) -> None:
+        """start
+
+        :param ring_size: The number of timings kept for each stage
+        :type ring_size: int
+        """
+        self._caches: Dict[str, Callable[[], Dict[str, int]]] = {}
+        self._gauges: Dict[str, int] = {}
+        self._logger = logging.getLogger(__name__)
+        self._ring_size = ring_size
+        self._timings: Dict[str, Deque[float]] = {}
+
+    def record(self, stage: str, seconds: float) -> None:
+        """Record one timing for a stage
+
+        :param stage: The name of the stage
+        :type stage: str
+        :param seconds: How long the stage took
+        :type seconds: float
+        """
+        try:
+            self._timings[stage].append(seconds)
+        except KeyError:
+            self._timings[stage] = deque([seconds], maxlen=self._ring_size)
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """Time the enclosed block as one run of a stage
+
+        :param stage: The name of the stage
+        :type stage: str
+        """
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.record(stage, time.perf_counter() - start)
+
+    def gauge(self, name: str, value: int) -> None:
+        """Set the current value of a gauge
+
+        :param name: The name of the gauge
+        :type name: str
+        :param value: The current value
+        :type value: int
+        """
+        self._gauges[name] = value
+
+    def register_cache(self, name: str, info: Callable[[], Dict[str, int]]) -> None:
+        """Register a cache to be reported on
+
+        :param name: The name of the cache
+        :type name: str
+        :param info: A callable returning a dict with at least hits, misses and size
+        :type info: callable
+        """
+        self._caches[name] = info
+
+    def summary(self) -> Dict[str, Dict[str, Any]]:
+        """Summarize the timings, gauges and caches
+
+        :return: The per stage count, p50, p95 and max in ms, the gauges and the caches
+        :rtype: dict
+        """
+        timings: Dict[str, Dict[str, Any]] = {}
+        for stage, ring in sorted(self._timings.items()):
+            ordered = sorted(ring)
+            if not ordered:
+                continue
+            timings[stage] = {
+                "count": len(ordered),
+                "p50_ms": round(_percentile(ordered, 50) * 1000, 3),
+                "p95_ms": round(_percentile(ordered, 95) * 1000, 3),
+                "max_ms": round(ordered[-1] * 1000, 3),
+            }
+        caches: Dict[str, Dict[str, Any]] = {}
+        for name, info in sorted(self._caches.items()):
+            cache: Dict[str, Any] = dict(info())
+            lookups = cache["hits"] + cache["misses"]
+            cache["hit_rate"] = round(cache["hits"] / lookups, 3) if lookups else 0
+            caches[name] = cache
+        gauges = dict(sorted(self._gauges.items()))
+        return {"timings": timings, "gauges": gauges, "caches": caches}
+
+    def log(self) -> None:
+        """Write the summary to the log"""
+        for section, entries in self.summary().items():
+            for name, entry in entries.items():
+                self._logger.info("%s %s: %s", section, name, entry)
+
+
+STATS = Stats()
@@ -13,6 +13,7 @@ from .rules import Entry
 from .rules import MatchRule
 from .rules import PatternRule
 from .rules import WhileRule
+from .scopes import SCOPES
 from .state import State
 
 if TYPE_CHECKING:
@@ -30,7 +31,7 @@ class Compiler:
         self._rule_to_grammar: Dict["_Rule", "Grammar"] = {}
         self._c_rules: Dict["_Rule", "CompiledRule"] = {}
         root = self._compile_root(grammar)
-        self.root_state = State.root(Entry(root.name, root, ("", 0)))
+        self.root_state = State.root(Entry(SCOPES.intern(root.name), root, ("", 0)))
 
     def _visit_rule(self, grammar: "Grammar", rule: "_Rule") -> "_Rule":
         self._rule_to_grammar[rule] = grammar
@@ -112,6 +112,22 @@ def expand_escaped(match: Match[str], s: str) -> str:
     return _BACKREF_RE.sub(lambda m: f"{m[1]}{re.escape(match[int(m[2])])}", s)
 
 
+@functools.lru_cache(maxsize=None)
+def _has_backref(s: str) -> bool:
+    return _BACKREF_RE.search(s) is not None
+
+
+# the patterns of the grammars, there are only so many
 make_reg = functools.lru_cache(maxsize=None)(_Reg)
 make_regset = functools.lru_cache(maxsize=None)(_RegSet)
+# patterns with back references filled in, one for each delimiter seen, eg
+# of a heredoc, there's no limit to how many so only the recent are kept
+BACKREF_CACHE_SIZE = 256
+make_backref_reg = functools.lru_cache(maxsize=BACKREF_CACHE_SIZE)(_Reg)
 ERR_REG = make_reg("$ ^")
+
+
+def make_expanded_reg(match: Match[str], s: str) -> _Reg:
+    if not _has_backref(s):
+        return make_reg(s)
+    return make_backref_reg(expand_escaped(match, s))
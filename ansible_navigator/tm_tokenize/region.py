@@ -2,6 +2,8 @@ from typing import NamedTuple
 from typing import Tuple
 
 Scope = Tuple[str, ...]
+# a scope interned in scopes.SCOPES
+ScopeId = int
 
 Regions = Tuple["Region", ...]
 
@@ -9,4 +11,4 @@ Regions = Tuple["Region", ...]
 class Region(NamedTuple):
     start: int
     end: int
-    scope: Scope
+    scope: ScopeId
@@ -13,10 +13,10 @@ from .reg import _Reg
 from .reg import _RegSet
 from .reg import ERR_REG
 from .reg import do_regset
-from .reg import expand_escaped
-from .reg import make_reg
+from .reg import make_expanded_reg
 from .region import Region
 from .region import Regions
+from .scopes import SCOPES
 from .state import State
 from .tokenize import tokenize
 from .utils import uniquely_constructed
@@ -24,7 +24,7 @@ from .utils import uniquely_constructed
 
 if TYPE_CHECKING:
     from .compiler import Compiler
-    from .region import Scope
+    from .region import ScopeId
 
 Captures = Tuple[Tuple[int, "_Rule"], ...]
 
@@ -62,7 +62,7 @@ class CompiledRule(Protocol):
 
 
 class Entry(NamedTuple):
-    scope: Tuple[str, ...]
+    scope: "ScopeId"
     rule: CompiledRule
     start: Tuple[str, int]
     reg: _Reg = ERR_REG
@@ -151,11 +151,11 @@ class EndRule(NamedTuple):
         match: Match[str],
         state: "State",
     ) -> Tuple["State", bool, "Regions"]:
-        scope = state.cur.scope + self.name
-        next_scope = scope + self.content_name
+        scope = SCOPES.push(state.cur.scope, self.name)
+        next_scope = SCOPES.push(scope, self.content_name)
 
         boundary = match.end() == len(match.string)
-        reg = make_reg(expand_escaped(match, self.end))
+        reg = make_expanded_reg(match, self.end)
         start = (match.string, match.start())
         state = state.push(Entry(next_scope, self, start, reg, boundary))
         regions = _captures(compiler, scope, match, self.begin_captures)
@@ -176,7 +176,7 @@ class EndRule(NamedTuple):
         # the same position.
         # we'll advance the highlighter by one position to get past the loop
         # this appears to be what vs code does as well
-        if state.entries[-1].start == (m.string, m.end()):
+        if state.cur.start == (m.string, m.end()):
             ret.append(Region(m.end(), m.end() + 1, state.cur.scope))
             end = m.end() + 1
         else:
@@ -217,7 +217,7 @@ class MatchRule(NamedTuple):
         match: Match[str],
         state: "State",
     ) -> Tuple["State", bool, "Regions"]:
-        scope = state.cur.scope + self.name
+        scope = SCOPES.push(state.cur.scope, self.name)
         return state, False, _captures(compiler, scope, match, self.captures)
 
     def search(
@@ -377,11 +377,11 @@ class WhileRule(NamedTuple):
         match: Match[str],
         state: "State",
     ) -> Tuple["State", bool, "Regions"]:
-        scope = state.cur.scope + self.name
-        next_scope = scope + self.content_name
+        scope = SCOPES.push(state.cur.scope, self.name)
+        next_scope = SCOPES.push(scope, self.content_name)
 
         boundary = match.end() == len(match.string)
-        reg = make_reg(expand_escaped(match, self.while_))
+        reg = make_expanded_reg(match, self.while_)
         start = (match.string, match.start())
         entry = Entry(next_scope, self, start, reg, boundary)
         state = state.push_while(self, entry)
@@ -419,7 +419,7 @@ class WhileRule(NamedTuple):
 
 def _captures(
     compiler: "Compiler",
-    scope: "Scope",
+    scope: "ScopeId",
     match: Match[str],
     captures: "Captures",
 ) -> "Regions":
@@ -478,9 +478,9 @@ def _inner_capture_parse(
     compiler: "Compiler",
     start: int,
     s: str,
-    scope: "Scope",
+    scope: "ScopeId",
     rule: "CompiledRule",
 ) -> "Regions":
-    state = State.root(Entry(scope + rule.name, rule, (s, 0)))
+    state = State.root(Entry(SCOPES.push(scope, rule.name), rule, (s, 0)))
     _, regions = tokenize(compiler, state, s, first_line=False)
     return tuple(r._replace(start=r.start + start, end=r.end + start) for r in regions)
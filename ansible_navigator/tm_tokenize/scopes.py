@@ -0,0 +1,52 @@
+import threading
+
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+from .region import Scope
+from .region import ScopeId
+
+
+class Scopes:
+    """every scope seen, each given an id, so regions and entries carry an int
+    and the scope below one with names pushed on it is found in a dict rather
+    than being built as a new tuple for every match"""
+
+    def __init__(self) -> None:
+        self._scopes: List[Scope] = []
+        self._ids: Dict[Scope, ScopeId] = {}
+        # for each id, the names pushed on it to the id of the result
+        self._pushed: List[Dict[Tuple[str, ...], ScopeId]] = []
+        self._lock = threading.Lock()
+        self.root = self.intern(())
+
+    def __len__(self) -> int:
+        return len(self._scopes)
+
+    def __getitem__(self, scope_id: ScopeId) -> Scope:
+        return self._scopes[scope_id]
+
+    def intern(self, scope: Scope) -> ScopeId:
+        try:
+            return self._ids[scope]
+        except KeyError:
+            with self._lock:
+                if scope not in self._ids:
+                    # the list is appended to first, an id is never handed
+                    # out before its scope can be looked up
+                    self._scopes.append(scope)
+                    self._pushed.append({})
+                    self._ids[scope] = len(self._scopes) - 1
+                return self._ids[scope]
+
+    def push(self, scope_id: ScopeId, names: Tuple[str, ...]) -> ScopeId:
+        pushed = self._pushed[scope_id]
+        try:
+            return pushed[names]
+        except KeyError:
+            ret = pushed[names] = self.intern(self._scopes[scope_id] + names)
+            return ret
+
+
+SCOPES = Scopes()
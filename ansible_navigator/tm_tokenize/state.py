@@ -1,4 +1,5 @@
-from typing import NamedTuple
+from typing import Any
+from typing import Optional
 from typing import Tuple
 from typing import TYPE_CHECKING
 
@@ -8,29 +9,89 @@ if TYPE_CHECKING:
     from .rules import WhileRule
 
 
-class State(NamedTuple):
-    entries: Tuple["Entry", ...]
-    while_stack: Tuple[Tuple["WhileRule", int], ...]
+class State:
+    """a persistent stack of entries, each state links to the one below it
+    so push and pop share the rest of the stack rather than copying it"""
+
+    __slots__ = ("cur", "parent", "while_rule", "whiles", "_hash")
+
+    def __init__(
+        self,
+        cur: "Entry",
+        parent: Optional["State"] = None,
+        while_rule: Optional["WhileRule"] = None,
+    ) -> None:
+        self.cur = cur
+        self.parent = parent
+        # set if the entry on top was pushed by a while rule
+        self.while_rule = while_rule
+        # the nearest state, this one or below, with a while rule on top
+        self.whiles: Optional[State]
+        if while_rule is not None:
+            self.whiles = self
+        elif parent is not None:
+            self.whiles = parent.whiles
+        else:
+            self.whiles = None
+        # from the parent's hash, not the whole stack, so a deep one hashes in O(1)
+        self._hash: int = hash((cur, parent._hash if parent is not None else None, while_rule))
+
+    def __repr__(self) -> str:
+        return f"{type(self).__name__}(entries={self.entries!r})"
+
+    def __eq__(self, other: Any) -> bool:
+        if not isinstance(other, State):
+            return NotImplemented
+        # down the stacks until they share a state, without recursing
+        state: Optional[State] = self
+        while state is not other:
+            if (
+                state is None
+                or other is None
+                or state._hash != other._hash
+                or state.cur != other.cur
+                or state.while_rule != other.while_rule
+            ):
+                return False
+            state, other = state.parent, other.parent
+        return True
+
+    def __hash__(self) -> int:
+        return self._hash
 
     @classmethod
     def root(cls, entry: "Entry") -> "State":
-        return cls((entry,), ())
+        return cls(entry)
 
     @property
-    def cur(self) -> "Entry":
-        return self.entries[-1]
+    def entries(self) -> Tuple["Entry", ...]:
+        """all of the entries, from the bottom of the stack, for debugging"""
+        entries = []
+        state: Optional[State] = self
+        while state is not None:
+            entries.append(state.cur)
+            state = state.parent
+        return tuple(reversed(entries))
+
+    def while_states(self) -> Tuple["State", ...]:
+        """the states with a while rule on top, from the bottom of the stack"""
+        states = []
+        state = self.whiles
+        while state is not None:
+            states.append(state)
+            state = state.parent.whiles if state.parent is not None else None
+        return tuple(reversed(states))
 
     def push(self, entry: "Entry") -> "State":
-        return self._replace(entries=(*self.entries, entry))
+        return State(entry, self)
 
     def pop(self) -> "State":
-        return self._replace(entries=self.entries[:-1])
+        assert self.parent is not None, "can't pop the root"
+        return self.parent
 
     def push_while(self, rule: "WhileRule", entry: "Entry") -> "State":
-        entries = (*self.entries, entry)
-        while_stack = (*self.while_stack, (rule, len(entries)))
-        return self._replace(entries=entries, while_stack=while_stack)
+        return State(entry, self, rule)
 
     def pop_while(self) -> "State":
-        entries, while_stack = self.entries[:-1], self.while_stack[:-1]
-        return self._replace(entries=entries, while_stack=while_stack)
+        assert self.while_rule is not None, "no while rule on top"
+        return self.pop()
@@ -1,4 +1,7 @@
+import time
+
 from typing import List
+from typing import Optional
 from typing import Tuple
 from typing import TYPE_CHECKING
 
@@ -10,25 +13,32 @@ if TYPE_CHECKING:
     from .compiler import Compiler
 
 
+class TokenizeTimeout(Exception):
+    """the line took longer than allowed, the regions found so far are kept"""
+
+    def __init__(self, regions: Regions) -> None:
+        super().__init__("tokenize passed its deadline")
+        self.regions = regions
+
+
 def tokenize(
     compiler: "Compiler",
     state: State,
     line: str,
     first_line: bool,
+    deadline: Optional[float] = None,
 ) -> Tuple[State, Regions]:
 
-    """tokenize a string into it's parts"""
+    """tokenize a string into it's parts, raising TokenizeTimeout if
+    time.perf_counter() passes the deadline"""
     ret: List[Region] = []
     pos = 0
     boundary = state.cur.boundary
 
-    # TODO: this is still a little wasteful
-    while_stack = []
-    for while_rule, idx in state.while_stack:
-        while_stack.append((while_rule, idx))
-        while_state = State(state.entries[:idx], tuple(while_stack))
-
-        while_res = while_rule.continues(
+    # each while rule, from the outermost in, must continue on this line
+    for while_state in state.while_states():
+        assert while_state.while_rule is not None
+        while_res = while_state.while_rule.continues(
             compiler,
             while_state,
             line,
@@ -53,6 +63,8 @@ def tokenize(
     while search_res is not None:
         state, pos, boundary, regions = search_res
         ret.extend(regions)
+        if deadline is not None and time.perf_counter() > deadline:
+            raise TokenizeTimeout(tuple(ret))
 
         search_res = state.cur.rule.search(
             compiler,
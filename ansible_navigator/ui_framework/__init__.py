@@ -13,4 +13,5 @@ from .ui import Action
 from .ui import Content
 from .ui import Interaction
 from .ui import Menu
+from .ui import Tail
 from .ui import UserInterface
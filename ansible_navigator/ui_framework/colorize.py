@@ -1,20 +1,47 @@
 """ Tokenize and color text
 """
 
+# pylint: disable=too-many-lines
 import json
 import logging
 import os
 import re
+import time
 
 import colorsys
 import curses
 import functools
 
+from collections import OrderedDict
 from itertools import chain
+from itertools import groupby
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Sequence
+from typing import Tuple
+from typing import Union
+from typing import overload
+
+from ..stats import STATS
+from ..stats import lru_cache_info
+from ..tm_tokenize.compiler import Compiler
 from ..tm_tokenize.grammars import Grammars
+from ..tm_tokenize.reg import make_backref_reg
+from ..tm_tokenize.reg import make_reg
+from ..tm_tokenize.reg import make_regset
+from ..tm_tokenize.region import Regions
+from ..tm_tokenize.scopes import SCOPES
+from ..tm_tokenize.state import State
+from ..tm_tokenize.tokenize import TokenizeTimeout
 from ..tm_tokenize.tokenize import tokenize
 from .curses_defs import CursesLine
 from .curses_defs import CursesLinePart
+from .curses_defs import CursesLineRun
+from .curses_defs import CursesLineStore
+from .curses_defs import STR_BYTES
+from .serialize import serialize
 
 CURSES_STYLES = {
     0: None,
@@ -28,24 +55,100 @@ CURSES_STYLES = {
     8: getattr(curses, "A_INVIS", None),
 }
 
+CHECKPOINT_LINES = 64
+# tokenizing a line takes time quadratic in its length, longer lines are colored
+# only as far as this and a line is given up on after this many seconds
+MAX_LINE_LENGTH = 4096
+LINE_TIME_BUDGET = 0.05
+COLOR_CACHE_SIZE = 4096
+# estimates of the memory for a colored line, and each part of it, less the text
+LINE_BYTES = 120
+PART_BYTES = 300
+# the color of a scope not yet looked up
+_UNSEEN = object()
+
+ANSI_RE = re.compile(r"\x1b\[[\d;]*m")
+SGR_RE = re.compile(
+    r"""(?x)
+        \x1b\[                              # Control Sequence Introducer
+        (?P<fg_action>(38;5|39);)?          # optional FG color action
+        (?P<_bg_action>(48;5|49);)?         # optional BG color action
+        (?P<one>\d+)                        # required, one number
+        (;(?P<two>\d+))?                    # optional 2nd number
+        m
+    """
+)
+# the foreground colors, 30-37 then the bright 90-97, to curses colors 0-15
+ANSI_16 = {code: idx for idx, code in enumerate(chain(range(30, 38), range(90, 98)))}
+# the curses color pair and style
+AnsiState = Tuple[int, int]
+ANSI_DEFAULT: AnsiState = (0, 0)
+# the color and style is kept before every so many lines of a growing ansi
+# document, and this many of the lines converted most recently
+ANSI_CHECKPOINT_LINES = 128
+ANSI_RING_LINES = 1024
 THEME = "dark_vs.json"
 
+# str.splitlines splits on these, a \r may yet be followed by a \n
+LINE_BREAKS = "\n\x0b\x0c\x1c\x1d\x1e\x85\u2028\u2029"
+
 
 class ColorSchema:
-    """Simple holer for the schema (theme)"""
+    """Simple holer for the schema (theme)
+
+    The theme's selectors are put in a table when loaded, so finding the color
+    for a scope is a lookup for each dotted prefix of each name in the scope.
+    The innermost name wins, then the longest prefix, then the first entry in
+    the theme with the selector. The tokenizer's regions carry interned scope
+    ids, their colors are kept in a list indexed by id as they're looked up.
+    """
 
     # pylint: disable=too-few-public-methods
 
-    def __init__(self, schema):
+    def __init__(self, schema, cache_size=COLOR_CACHE_SIZE):
         """start
 
         :param schema: The color scheme, theme to use
         :type schema: dict
+        :param cache_size: The number of scopes to remember the color of
+        :type cache_size: int
         """
         self._schema = schema
+        self._selectors = {}
+        for token_color in self._schema["tokenColors"]:
+            foreground = token_color.get("settings", {}).get("foreground", None)
+            for selector in to_list(token_color.get("scope", [])):
+                self._selectors.setdefault(selector, hex_to_rgb(foreground))
+        # cached per instance, so the schema isn't kept alive by the class
+        self.get_color = functools.lru_cache(maxsize=cache_size)(self._get_color)
+        self._id_colors: List = []
+
+    def colors(self):
+        """All of the colors used by the theme
 
-    @functools.lru_cache(maxsize=None)
-    def get_color(self, scope):
+        :return: The colors in rgb format
+        :rtype: set of tuples
+        """
+        return set(color for color in self._selectors.values() if color)
+
+    def color_of(self, scope_id):
+        """Get the color for an interned scope
+
+        :param scope_id: The id of the scope in SCOPES
+        :type scope_id: int
+        :return: the color in rgb format or None
+        :rtype: tuple or None
+        """
+        try:
+            color = self._id_colors[scope_id]
+        except IndexError:
+            self._id_colors.extend([_UNSEEN] * (len(SCOPES) - len(self._id_colors)))
+            color = _UNSEEN
+        if color is _UNSEEN:
+            color = self._id_colors[scope_id] = self.get_color(SCOPES[scope_id])
+        return color
+
+    def _get_color(self, scope):
         """Get a color from the schema, from most specific to least
 
         :param scope: The scope, aka format
@@ -54,14 +157,12 @@ class ColorSchema:
         :rtype: tuple or None
         """
         for name in reversed(scope):
-            for parts in range(0, len(name.split("."))):
-                prop = name.split()[-1].rsplit(".", parts)[0]
-                color = next(
-                    (tc for tc in self._schema["tokenColors"] if prop in to_list(tc["scope"])), None
-                )
-                if color:
-                    foreground = color.get("settings", {}).get("foreground", None)
-                    return hex_to_rgb(foreground)
+            words = name.split()
+            prefix = words[-1] if words else ""
+            while prefix:
+                if prefix in self._selectors:
+                    return self._selectors[prefix]
+                prefix = prefix.rpartition(".")[0]
         return None
 
 
@@ -69,19 +170,40 @@ class Colorize:
     """Functionality for coloring"""
 
     # pylint: disable=too-few-public-methods
-    def __init__(self, share_dir):
+    # pylint: disable=too-many-instance-attributes
+    def __init__(
+        self,
+        share_dir,
+        max_line_length=MAX_LINE_LENGTH,
+        line_time_budget=LINE_TIME_BUDGET,
+    ):
+        """start
+
+        :param share_dir: The directory with the themes and grammars
+        :type share_dir: str
+        :param max_line_length: Only color this much of a longer line
+        :type max_line_length: int
+        :param line_time_budget: Give up coloring a line after this many seconds
+        :type line_time_budget: float
+        """
+        self._max_line_length = max_line_length
+        self._line_time_budget = line_time_budget
         self._logger = logging.getLogger(__name__)
         self._schema = None
         self._theme_dir = os.path.join(share_dir, "themes")
         self._grammar_dir = os.path.join(share_dir, "grammar")
         self._grammars = Grammars(self._grammar_dir)
+        self._highlighters: Dict[str, Highlighter] = {}
+        self._ansi = AnsiLines()
         self._load()
+        STATS.register_cache("colorize.lines", self.lines_info)
+        STATS.register_cache("colorize.ansi", self.ansi_info)
 
     def _load(self):
         with open(os.path.join(self._theme_dir, THEME)) as data_file:
             self._schema = ColorSchema(json.load(data_file))
+        STATS.register_cache("colorize.get_color", lru_cache_info(self._schema.get_color))
 
-    @functools.lru_cache(maxsize=100)
     def render(self, doc, scope):
         """render some text into columns and colors
 
@@ -93,22 +215,564 @@ class Colorize:
         :rtype: list
         """
         if scope == "source.ansi":
-            return [ansi_to_curses(l) for l in doc.splitlines()]
+            return self._ansi.render(doc)
+        document = self.document(doc, scope)
+        if document is not None:
+            return document.colored_lines(0, len(document))
+        res = [[{"column": 0, "chars": l, "color": None}] for l in doc.splitlines()]
+        return res
+
+    def serialize(self, obj, scope):
+        """serialize an obj as yaml or json and color it, without tokenizing
+
+        :param obj: The thing to serialize
+        :type obj: Any
+        :param scope: The scope, source.yaml or source.json
+        :type scope: str
+        :return: A list of lines, each a list of dicts, None if the obj
+            needs to be serialized and rendered
+        :rtype: list or None
+        """
+        return serialize(obj, scope, self._schema.get_color)
+
+    def document(self, doc, scope):
+        """Start rendering some text, the lines are tokenized and colored
+        as they are asked for
+
+        :param doc: The thing to tokenize and color
+        :type doc: str
+        :param scope: The scope, aka the format of the string
+        :type scope: str
+        :return: The document, None if there isn't a grammar for the scope
+        :rtype: Document or None
+        """
+        highlighter = self._highlighter(scope)
+        if highlighter is None:
+            return None
+        return highlighter.document(doc)
+
+    def tail(self, source, scope):
+        """Start rendering the lines of some text as it grows, eg a log,
+        the lines are tokenized and colored only where they are asked for
+
+        :param source: The lines, they may be appended to later
+        :type source: list of str
+        :param scope: The scope, aka the format of the text
+        :type scope: str
+        :return: The document, the lines are plain if there isn't a grammar for the scope
+        :rtype: TailDocument
+        """
+        return TailDocument(self._highlighter(scope), source)
+
+    def _highlighter(self, scope):
+        """Find or make the highlighter for a scope
+
+        :param scope: The scope
+        :type scope: str
+        :return: The highlighter, None if there isn't a grammar for the scope
+        :rtype: Highlighter or None
+        """
         try:
             compiler = self._grammars.compiler_for_scope(scope)
         except KeyError:
-            compiler = None
-
-        if compiler:
-            state = compiler.root_state
-            lines = []
-            for line_idx, line in enumerate(doc.splitlines()):
-                first_line = line_idx == 0
-                state, regions = tokenize(compiler, state, line, first_line)
-                lines.append((regions, line))
-            return columns_and_colors(lines, self._schema)
-        res = [[{"column": 0, "chars": l, "color": None}] for l in doc.splitlines()]
-        return res
+            return None
+        highlighter = self._highlighters.get(scope)
+        if highlighter is None:
+            highlighter = self._highlighters[scope] = Highlighter(
+                compiler,
+                self._schema,
+                max_line_length=self._max_line_length,
+                line_time_budget=self._line_time_budget,
+            )
+        return highlighter
+
+    def theme_colors(self):
+        """All of the colors the rendered lines may have
+
+        :return: The colors in rgb format
+        :rtype: set of tuples
+        """
+        return self._schema.colors()
+
+    def lines_info(self):
+        """The lines reused and tokenized by the highlighters, for Stats
+
+        :return: The hits, misses, number of lines and bytes held and lines over budget
+        :rtype: dict
+        """
+        info = {"hits": 0, "misses": 0, "size": 0, "bytes": 0, "too_long": 0, "too_slow": 0}
+        for highlighter in self._highlighters.values():
+            info["hits"] += highlighter.reused
+            info["misses"] += highlighter.tokenized
+            info["too_long"] += highlighter.too_long
+            info["too_slow"] += highlighter.too_slow
+            if highlighter.last is not None:
+                info["size"] += len(highlighter.last.colored)
+                info["bytes"] += highlighter.last.nbytes()
+        return info
+
+    def ansi_info(self):
+        """The ansi lines reused and converted, for Stats
+
+        :return: The hits, misses and number of lines held
+        :rtype: dict
+        """
+        return {
+            "hits": self._ansi.reused,
+            "misses": self._ansi.converted,
+            "size": len(self._ansi.lines),
+        }
+
+
+class Highlighter:
+    # pylint: disable=too-few-public-methods
+    # pylint: disable=too-many-instance-attributes
+    """Tokenize and color the documents of one scope. A document that shares
+    lines with the last one, eg a log that has grown, is only tokenized from
+    the first line that changed, or the checkpoint before it.
+
+    A line that is too long, or takes too long, is colored as far as the budget
+    allows and the rest left plain. The line after it is tokenized as if it
+    weren't there, since the state the tokenizer stopped in can't be trusted.
+    """
+
+    def __init__(
+        self,
+        compiler: Compiler,
+        schema: ColorSchema,
+        checkpoint_lines: int = CHECKPOINT_LINES,
+        max_line_length: int = MAX_LINE_LENGTH,
+        line_time_budget: float = LINE_TIME_BUDGET,
+    ) -> None:
+        # pylint: disable=too-many-arguments
+        """start
+
+        :param compiler: The compiler for the scope
+        :type compiler: Compiler
+        :param schema: The color schema
+        :type schema: ColorSchema
+        :param checkpoint_lines: Keep the tokenizer state every this many lines
+        :type checkpoint_lines: int
+        :param max_line_length: Only color this much of a longer line
+        :type max_line_length: int
+        :param line_time_budget: Give up coloring a line after this many seconds
+        :type line_time_budget: float
+        """
+        self.compiler = compiler
+        self.schema = schema
+        self.checkpoint_lines = checkpoint_lines
+        self.max_line_length = max_line_length
+        self.line_time_budget = line_time_budget
+        self.last: Union[Document, None] = None
+        self.reused = 0
+        self.tokenized = 0
+        self.too_long = 0
+        self.too_slow = 0
+        self._logger = logging.getLogger(__name__)
+
+    def tokenize_line(self, state: State, line: str, first_line: bool) -> Tuple[State, Regions]:
+        """Tokenize one line within the length and time budget
+
+        :param state: The state of the tokenizer before the line
+        :type state: State
+        :param line: The line
+        :type line: str
+        :param first_line: Is this the first line of the document
+        :type first_line: bool
+        :return: The state after the line and the regions of the line
+        :rtype: State, tuple of Region
+        """
+        over_length = len(line) > self.max_line_length
+        if over_length:
+            self.too_long += 1
+            self._logger.debug("Only coloring %s of %s characters", self.max_line_length, len(line))
+        deadline = time.perf_counter() + self.line_time_budget
+        try:
+            new_state, regions = tokenize(
+                self.compiler, state, line[: self.max_line_length], first_line, deadline
+            )
+        except TokenizeTimeout as exc:
+            self.too_slow += 1
+            self._logger.debug("Coloring a line of %s characters took too long", len(line))
+            return state, exc.regions
+        if over_length:
+            return state, regions
+        return new_state, regions
+
+    def document(self, doc: str) -> "Document":
+        """Start rendering a document, nothing is tokenized until asked for
+
+        :param doc: The text to tokenize and color
+        :type doc: str
+        :return: The document
+        :rtype: Document
+        """
+        if self.last is None:
+            unchanged, lines = 0, doc.splitlines()
+        else:
+            unchanged, lines = unchanged_lines(self.last.doc, self.last.lines, doc)
+        document = Document(self, doc, lines)
+        if self.last is not None:
+            self.reused += document.resume(self.last, unchanged)
+        self.last = document
+        return document
+
+    def render(self, doc: str) -> List[List[Dict]]:
+        """render some text into columns and colors
+
+        :param doc: The text to tokenize and color
+        :type doc: str
+        :return: A list of lines, each a list of dicts
+        :rtype: list
+        """
+        document = self.document(doc)
+        return document.colored_lines(0, len(document))
+
+
+def unchanged_lines(last_doc: str, last_lines: List[str], doc: str) -> Tuple[int, List[str]]:
+    """Find the lines at the start of a document that are unchanged
+    from the last document
+
+    :param last_doc: The last document
+    :type last_doc: str
+    :param last_lines: The lines of the last document
+    :type last_lines: list of str
+    :param doc: The document
+    :type doc: str
+    :return: The number of lines unchanged and all of the lines
+    :rtype: int, list of str
+    """
+    if last_doc and doc.startswith(last_doc):
+        if last_doc[-1] in LINE_BREAKS:
+            # each line was complete, only look at what was added
+            return len(last_lines), last_lines + doc[len(last_doc) :].splitlines()
+        if last_doc[-1] != "\r":
+            # the last line may have grown
+            idx = len(last_lines) - 1
+            return idx, last_lines[:idx] + doc[len(last_doc) - len(last_lines[idx]) :].splitlines()
+
+    lines = doc.splitlines()
+    unchanged = 0
+    for old, new in zip(last_lines, lines):
+        if old != new:
+            break
+        unchanged += 1
+    return unchanged, lines
+
+
+class AnsiLines:
+    # pylint: disable=too-few-public-methods
+    """Convert the lines of ansi documents, eg stdout as it grows, keeping the
+    color and style after each line. A document that shares lines with the last
+    one is only converted from the first line that changed.
+    """
+
+    def __init__(self) -> None:
+        self._doc = ""
+        self.lines: List[str] = []
+        self._states: List[AnsiState] = []
+        self._converted: List[CursesLine] = []
+        self.reused = 0
+        self.converted = 0
+
+    def render(self, doc: str) -> List[CursesLine]:
+        """Convert a document into lines for curses
+
+        :param doc: The text with ansi colors
+        :type doc: str
+        :return: The lines
+        :rtype: list of CursesLine
+        """
+        unchanged, lines = unchanged_lines(self._doc, self.lines, doc)
+        del self._states[unchanged:]
+        del self._converted[unchanged:]
+        self.reused += unchanged
+        state = self._states[-1] if self._states else ANSI_DEFAULT
+        for line in lines[unchanged:]:
+            state, curses_line = convert_ansi(line, state)
+            self._states.append(state)
+            self._converted.append(curses_line)
+        self.converted += len(lines) - unchanged
+        self.lines = lines
+        self._doc = doc
+        return list(self._converted)
+
+
+class AnsiLineStore(CursesLineStore):
+    """The lines of an ansi document as it grows, eg stdout, converted for
+    curses only as they're shown
+
+    The lines are read from the list they're appended to, not copied or joined.
+    The color and style before every so many lines is kept as a checkpoint,
+    so a line is converted from the nearest one rather than from the top,
+    and the lines converted most recently are kept in a ring.
+    """
+
+    def __init__(
+        self,
+        source: List[str],
+        checkpoint_lines: int = ANSI_CHECKPOINT_LINES,
+        ring_lines: int = ANSI_RING_LINES,
+    ) -> None:
+        """start
+
+        :param source: The lines with ansi colors, they may be appended to later
+        :type source: list of str
+        :param checkpoint_lines: Keep the color and style before every so many lines
+        :type checkpoint_lines: int
+        :param ring_lines: Keep this many of the lines converted
+        :type ring_lines: int
+        """
+        super().__init__()
+        self.source = source
+        self.checkpoint_lines = checkpoint_lines
+        self._checkpoints: List[AnsiState] = [ANSI_DEFAULT]
+        self._ring: "OrderedDict[int, Tuple[AnsiState, CursesLine]]" = OrderedDict()
+        self._ring_lines = ring_lines
+        self.converted = 0
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    def text(self, index: int) -> str:
+        return ANSI_RE.sub("", self.source[index])
+
+    def runs(self, index: int) -> Iterator[CursesLineRun]:
+        return (
+            (part.column, len(part.string), part.color, part.decoration)
+            for part in self._line(index)
+        )
+
+    def _line(self, index: int) -> CursesLine:
+        entry = self._ring.get(index)
+        if entry is None:
+            entry = convert_ansi(self.source[index], self._state_before(index))
+            self.converted += 1
+            self._ring[index] = entry
+            if len(self._ring) > self._ring_lines:
+                self._ring.popitem(last=False)
+        else:
+            self._ring.move_to_end(index)
+        return entry[1]
+
+    def _state_before(self, index: int) -> AnsiState:
+        """Find the color and style at the start of a line, from the line
+        before if it was converted, else the nearest checkpoint
+
+        :param index: The line number
+        :type index: int
+        :return: The color and style
+        :rtype: tuple
+        """
+        before = self._ring.get(index - 1)
+        if before is not None:
+            return before[0]
+        every = self.checkpoint_lines
+        while len(self._checkpoints) <= index // every:
+            start = (len(self._checkpoints) - 1) * every
+            self._checkpoints.append(
+                ansi_state(self.source[start : start + every], self._checkpoints[-1])
+            )
+        start = index // every * every
+        return ansi_state(self.source[start:index], self._checkpoints[index // every])
+
+
+class Document(Sequence[str]):
+    """The lines of one document, tokenized and colored from the top as far as
+    they have been asked for. The tokenizer state before every so many lines
+    is kept as a checkpoint, so the next document can resume from one.
+
+    Tokenizing isn't thread safe, the caller holds a lock if needed.
+    """
+
+    def __init__(self, highlighter: Highlighter, doc: str, lines: List[str]) -> None:
+        """start
+
+        :param highlighter: The highlighter for the scope
+        :type highlighter: Highlighter
+        :param doc: The text to tokenize and color
+        :type doc: str
+        :param lines: The lines of the text
+        :type lines: list of str
+        """
+        self.doc = doc
+        self.lines = lines
+        self.colored: List[List[Dict]] = []
+        self._colored_bytes = 0
+        self._highlighter = highlighter
+        # the state before line n * checkpoint_lines
+        self._checkpoints: List[State] = [highlighter.compiler.root_state]
+        # the state after the last line colored
+        self._state = highlighter.compiler.root_state
+
+    def __len__(self) -> int:
+        return len(self.lines)
+
+    @overload
+    def __getitem__(self, index: int) -> str:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[str]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        return self.lines[index]
+
+    @property
+    def complete(self) -> bool:
+        """Have all of the lines been colored
+
+        :return: True if they have
+        :rtype: bool
+        """
+        return len(self.colored) == len(self.lines)
+
+    def nbytes(self) -> int:
+        """An estimate of the memory used by the document, as far as it's colored
+
+        :return: The number of bytes
+        :rtype: int
+        """
+        # the text is kept whole and split into lines
+        return 2 * len(self.doc) + STR_BYTES * len(self.lines) + self._colored_bytes
+
+    def resume(self, last: "Document", unchanged: int) -> int:
+        # pylint: disable=protected-access
+        """Start from the colored lines of the last document
+
+        :param last: The last document of the scope
+        :type last: Document
+        :param unchanged: The number of lines at the start that are the same
+        :type unchanged: int
+        :return: The number of colored lines reused
+        :rtype: int
+        """
+        every = self._highlighter.checkpoint_lines
+        reused = min(unchanged, len(last.colored))
+        if reused == len(last.colored):
+            state = last._state
+        else:
+            reused = reused // every * every
+            state = last._checkpoints[reused // every]
+        self.colored = last.colored[:reused]
+        self._colored_bytes = _colored_bytes(self.colored)
+        self._checkpoints = last._checkpoints[: reused // every + 1]
+        self._state = state
+        return reused
+
+    def tokenize_to(self, stop: int) -> None:
+        """Tokenize and color the lines up to one
+
+        :param stop: The line to stop before
+        :type stop: int
+        """
+        stop = min(stop, len(self.lines))
+        if stop <= len(self.colored):
+            return
+        every = self._highlighter.checkpoint_lines
+        state = self._state
+        tokenized = []
+        for idx in range(len(self.colored), stop):
+            if idx % every == 0 and idx // every == len(self._checkpoints):
+                self._checkpoints.append(state)
+            state, regions = self._highlighter.tokenize_line(state, self.lines[idx], idx == 0)
+            tokenized.append((regions, self.lines[idx]))
+        colored = columns_and_colors(tokenized, self._highlighter.schema)
+        self.colored.extend(colored)
+        self._colored_bytes += _colored_bytes(colored)
+        self._state = state
+        self._highlighter.tokenized += len(tokenized)
+
+    def colored_lines(self, start: int, stop: int) -> List[List[Dict]]:
+        """Return some of the colored lines, tokenizing them if needed
+
+        :param start: The first line
+        :type start: int
+        :param stop: The line to stop before
+        :type stop: int
+        :return: The lines, each a list of dicts
+        :rtype: list
+        """
+        self.tokenize_to(stop)
+        return self.colored[start:stop]
+
+
+class TailDocument(Sequence[str]):
+    """The lines of a document as it grows, eg a log, tokenized and colored
+    only where they have been asked for rather than from the top
+
+    Lines asked for right after the last ones continue from the state the
+    tokenizer was left in, others start from the root state. That's right for
+    a grammar that doesn't carry state from one line to the next, like a log's.
+
+    Tokenizing isn't thread safe, the caller holds a lock if needed.
+    """
+
+    def __init__(self, highlighter: Union[Highlighter, None], source: List[str]) -> None:
+        """start
+
+        :param highlighter: The highlighter for the scope, None to leave the lines plain
+        :type highlighter: Highlighter or None
+        :param source: The lines, they may be appended to later
+        :type source: list of str
+        """
+        self.source = source
+        self._highlighter = highlighter
+        # the line after the last one tokenized, and the state after it
+        self._next = 0
+        self._state: Union[State, None] = None
+
+    def __len__(self) -> int:
+        return len(self.source)
+
+    @overload
+    def __getitem__(self, index: int) -> str:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> List[str]:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[str, List[str]]:
+        return self.source[index]
+
+    def colored_lines(self, start: int, stop: int) -> List[List[Dict]]:
+        """Tokenize and color some of the lines
+
+        :param start: The first line
+        :type start: int
+        :param stop: The line to stop before
+        :type stop: int
+        :return: The lines, each a list of dicts
+        :rtype: list
+        """
+        lines = self.source[start:stop]
+        highlighter = self._highlighter
+        if highlighter is None:
+            return [[{"column": 0, "chars": line, "color": None}] for line in lines]
+        state = self._state
+        if start != self._next or state is None:
+            state = highlighter.compiler.root_state
+        tokenized = []
+        for idx, line in enumerate(lines, start):
+            state, regions = highlighter.tokenize_line(state, line, idx == 0)
+            tokenized.append((regions, line))
+        self._next = start + len(lines)
+        self._state = state
+        highlighter.tokenized += len(tokenized)
+        return columns_and_colors(tokenized, highlighter.schema)
+
+
+def _colored_bytes(lines: List[List[Dict]]) -> int:
+    """An estimate of the memory used by some colored lines, less the text
+
+    :param lines: The lines, each a list of dicts
+    :type lines: list
+    :return: The number of bytes
+    :rtype: int
+    """
+    return sum(LINE_BYTES + PART_BYTES * len(line) for line in lines)
 
 
 def to_list(thing):
@@ -201,44 +865,83 @@ def columns_and_colors(lines, schema):
     :type lines: list of lines, each a ([regions], line)
     :param scheam: An instance of the ColorSchema
     :type schema: ColorSchema
+    :return: A list of lines, each a list of dicts
+    :rtype: list
     """
-    result = []
+    return [_line_columns_and_colors(regions, line, schema) for regions, line in lines]
 
-    for line in lines:
-        column = 0
-        char_dicts = [{"chars": c, "color": None} for c in line[1]]
-
-        for region in line[0]:
-            color = schema.get_color(region.scope)
-            if color:
-                for idx in range(region.start, region.end):
-                    char_dicts[idx]["color"] = color
-
-        if char_dicts:
-            grouped = [char_dicts.pop(0)]
-            while char_dicts:
-                entry = char_dicts.pop(0)
-                if entry["color"] == grouped[-1]["color"]:
-                    grouped[-1]["chars"] += entry["chars"]
-                else:
-                    grouped.append(entry)
-            result.append(grouped)
-        else:
-            result.append([{"chars": line[1], "color": None}])
 
-    for line in result:
-        column = 0
-        for chunk in line:
-            chunk["column"] = column
-            column += len(chunk["chars"])
+def _line_columns_and_colors(regions, line, schema):
+    """Convert the regions of one line into runs of the same color,
+    in one pass over the regions
 
-    return result
+    :param regions: The regions of the line, in order
+    :type regions: tuple of Region
+    :param line: The line
+    :type line: str
+    :param scheam: An instance of the ColorSchema
+    :type schema: ColorSchema
+    :return: A list of dicts, one for each run of the same color
+    :rtype: list
+    """
+    # the start and color of each run
+    starts = []
+    position = 0
+    for region in regions:
+        start = region.start
+        if start < position:
+            # the regions overlap, paint them in turn
+            return _painted_columns_and_colors(regions, line, schema)
+        end = min(region.end, len(line))
+        if end <= start:
+            continue
+        if start > position and (not starts or starts[-1][1] is not None):
+            starts.append((position, None))
+        color = schema.color_of(region.scope)
+        if not starts or starts[-1][1] != color:
+            starts.append((start, color))
+        position = end
+    if position < len(line) and (not starts or starts[-1][1] is not None):
+        starts.append((position, None))
+    if not starts:
+        return [{"chars": line, "color": None, "column": 0}]
 
+    ends = [start for start, _color in starts[1:]] + [len(line)]
+    return [
+        {"chars": line[start:end], "color": color, "column": start}
+        for (start, color), end in zip(starts, ends)
+    ]
 
-def ansi_to_curses(line: str) -> CursesLine:
 
-    # pylint: disable=too-many-branches
-    # pylint: disable=too-many-locals
+def _painted_columns_and_colors(regions, line, schema):
+    """Convert the regions of one line into runs of the same color,
+    painting a color for each character, for when the regions overlap
+
+    :param regions: The regions of the line
+    :type regions: tuple of Region
+    :param line: The line
+    :type line: str
+    :param scheam: An instance of the ColorSchema
+    :type schema: ColorSchema
+    :return: A list of dicts, one for each run of the same color
+    :rtype: list
+    """
+    colors = [None] * len(line)
+    for region in regions:
+        color = schema.color_of(region.scope)
+        if color:
+            end = min(region.end, len(line))
+            colors[region.start : end] = [color] * (end - region.start)
+    runs = []
+    column = 0
+    for color, group in groupby(colors):
+        length = len(list(group))
+        runs.append({"chars": line[column : column + length], "color": color, "column": column})
+        column += length
+    return runs or [{"chars": line, "color": None, "column": 0}]
+
+
+def ansi_to_curses(line: str) -> CursesLine:
     """Convert ansible color codes to curses colors
 
     :param line: A string with ansi colors
@@ -246,53 +949,94 @@ def ansi_to_curses(line: str) -> CursesLine:
     :return: A list of str tuples [(x, s, c), (x, s, c)...]
     :rtype: list
     """
+    _state, curses_line = convert_ansi(line, ANSI_DEFAULT)
+    return curses_line
+
+
+def convert_ansi(line: str, state: AnsiState) -> Tuple[AnsiState, CursesLine]:
+    """Convert ansi color codes to curses colors, starting with the color
+    and style left by the line before
+
+    :param line: A string with ansi colors
+    :type line: string
+    :param state: The color and style at the start of the line
+    :type state: tuple
+    :return: The color and style at the end of the line, and the line for curses
+    :rtype: tuple, CursesLine
+    """
     printable = []
-    ansi_regex = re.compile(r"(\x1b\[[\d;]*m)")
-    color_regex = re.compile(
-        r"""(?x)
-            \x1b\[                              # Control Sequence Introducer
-            (?P<fg_action>(38;5|39);)?          # optional FG color action
-            (?P<_bg_action>(48;5|49);)?         # optional BG color action
-            (?P<one>\d+)                        # required, one number
-            (;(?P<two>\d+))?                    # optional 2nd number
-            m
-        """
-    )
-    parts = ansi_regex.split(line)
     colno = 0
-    color = 0
-    style = 0
-    while parts:
-        part = parts.pop(0)
-        if part:
-            match = color_regex.match(part)
-            if match:
-                cap = match.groupdict()
-                one = cap["one"]
-                two = cap["two"]
-                if cap["fg_action"] == "39;":
-                    pass  # default color
-                elif one == "0" and two is None:
-                    pass  # default color
-                elif cap["fg_action"] == "38;5;":
-                    color = curses.color_pair(int(one) % curses.COLORS)
-                    if two:
-                        style = CURSES_STYLES.get(int(two), None) or 0
-                elif not cap["fg_action"]:
-                    ansi_16 = list(chain(range(30, 38), range(90, 98)))
-                    if two is None:
-                        color = ansi_16.index(int(one)) if int(one) in ansi_16 else int(one)
-                        color = curses.color_pair(color % curses.COLORS)
-                    else:
-                        color = ansi_16.index(int(two)) if int(two) in ansi_16 else int(two)
-                        color = curses.color_pair(color % curses.COLORS)
-                        style = CURSES_STYLES.get(int(one), None) or 0
-            else:
-                curses_line = CursesLinePart(
-                    column=colno, string=part, color=color, decoration=style
-                )
-                printable.append(curses_line)
-                colno += len(part)
-                color = 0
-                style = 0
-    return tuple(printable)
+    position = 0
+    color, style = state
+    for match in ANSI_RE.finditer(line):
+        if match.start() > position:
+            part = line[position : match.start()]
+            printable.append(
+                CursesLinePart(column=colno, string=part, color=color, decoration=style)
+            )
+            colno += len(part)
+        position = match.end()
+        color, style = _apply_sgr(match.group(0), color, style)
+    if position < len(line):
+        part = line[position:]
+        printable.append(CursesLinePart(column=colno, string=part, color=color, decoration=style))
+    return (color, style), tuple(printable)
+
+
+def ansi_state(lines: Iterable[str], state: AnsiState) -> AnsiState:
+    """Find the color and style after some lines, without converting them
+
+    :param lines: Strings with ansi colors
+    :type lines: An iterable of str
+    :param state: The color and style at the start of the first line
+    :type state: tuple
+    :return: The color and style at the end of the last line
+    :rtype: tuple
+    """
+    color, style = state
+    for line in lines:
+        if "\x1b" in line:
+            for match in ANSI_RE.finditer(line):
+                color, style = _apply_sgr(match.group(0), color, style)
+    return color, style
+
+
+def _apply_sgr(sequence: str, color: int, style: int) -> AnsiState:
+    """Change the color and style for one select graphic rendition sequence
+
+    :param sequence: The escape sequence
+    :type sequence: str
+    :param color: The current curses color pair
+    :type color: int
+    :param style: The current curses style
+    :type style: int
+    :return: The new color and style
+    :rtype: tuple
+    """
+    match = SGR_RE.match(sequence)
+    if match is None:
+        # \x1b[m is a reset, anything else isn't understood
+        return ANSI_DEFAULT if sequence == "\x1b[m" else (color, style)
+    fg_action, one, two = match.group("fg_action", "one", "two")
+    if fg_action == "39;":
+        color = 0
+    elif one == "0" and two is None:
+        return ANSI_DEFAULT
+    elif fg_action == "38;5;":
+        color = curses.color_pair(int(one) % curses.COLORS)
+        if two:
+            style = CURSES_STYLES.get(int(two), None) or 0
+    elif not fg_action:
+        if two is None and int(one) not in ANSI_16 and int(one) in CURSES_STYLES:
+            style = CURSES_STYLES[int(one)] or 0
+        elif two is None:
+            color = curses.color_pair(ANSI_16.get(int(one), int(one)) % curses.COLORS)
+        else:
+            color = curses.color_pair(ANSI_16.get(int(two), int(two)) % curses.COLORS)
+            style = CURSES_STYLES.get(int(one), None) or 0
+    return color, style
+
+
+STATS.register_cache("tm_tokenize.make_reg", lru_cache_info(make_reg))
+STATS.register_cache("tm_tokenize.backref_reg", lru_cache_info(make_backref_reg))
+STATS.register_cache("tm_tokenize.make_regset", lru_cache_info(make_regset))
@@ -0,0 +1,288 @@
+""" rendered content, some of it prepared in the background
+"""
+import hashlib
+import logging
+import sys
+
+from collections import OrderedDict
+from concurrent.futures import CancelledError
+from concurrent.futures import Future
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import Hashable
+from typing import List
+from typing import Tuple
+from typing import Union
+
+from .curses_defs import CursesLineStore
+from .utils import row_version
+
+MAXSIZE = 16
+# the content kept, by an estimate of the memory it uses
+MAX_BYTES = 64 * 1024 * 1024
+PREFETCH_WORKERS = 1
+
+
+class Skipped(Exception):
+    """Raised by a render in the background, to give way to the foreground"""
+
+
+class _Content:
+    # pylint: disable=too-few-public-methods
+    """The content rendered for one object"""
+
+    def __init__(self, obj: Any, future: "Future[Any]") -> None:
+        # hold the obj, so the id in the cache key can't be reused,
+        # a string is keyed by its digest, so it isn't kept
+        self.obj = None if isinstance(obj, str) else obj
+        # dropped once the lines are made from what was rendered
+        self.future: Union["Future[Any]", None] = future
+        self.lines: Union[CursesLineStore, None] = None
+        self.nbytes = 0
+
+
+def digest(text: str) -> bytes:
+    """Make a digest of some text, to key it without keeping it
+
+    :param text: The text
+    :type text: str
+    :return: The digest
+    :rtype: bytes
+    """
+    return hashlib.blake2b(text.encode("utf-8", "surrogatepass"), digest_size=16).digest()
+
+
+class ContentCache:
+    """Keep the lines rendered for the content most recently shown,
+    and render content that's likely to be shown next in a thread pool
+
+    Rendering is split in two. The render callable serializes and tokenizes
+    and is run in the background when prefetching. The finish callable turns
+    that into lines for curses and is always run by the caller. A prefetch that
+    was cancelled, raised Skipped or failed is rendered by the caller when it's
+    wanted.
+
+    Strings are cached by a digest of their value, dicts by identity and
+    version, so a dict that changes after being shown must be touched, like
+    a menu row. Anything else isn't cached.
+
+    The least recently used content is dropped when there's more than maxsize,
+    or an estimate of the memory used by the lines is over max_bytes. Lines
+    are filled and tokenized as they're shown, so they're measured again each
+    time they're asked for.
+    """
+
+    # pylint: disable=too-many-instance-attributes
+    def __init__(
+        self, maxsize: int = MAXSIZE, max_bytes: int = MAX_BYTES, workers: int = PREFETCH_WORKERS
+    ) -> None:
+        """start
+
+        :param maxsize: The number of objects to keep the content of
+        :type maxsize: int
+        :param max_bytes: Keep the content using about this much memory
+        :type max_bytes: int
+        :param workers: The number of threads used to prefetch
+        :type workers: int
+        """
+        self._entries: "OrderedDict[Hashable, _Content]" = OrderedDict()
+        self._executor: Union[ThreadPoolExecutor, None] = None
+        self._maxsize = maxsize
+        self.max_bytes = max_bytes
+        self.bytes = 0
+        self._workers = workers
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+        self.evictions = 0
+        self.evicted_bytes = 0
+        self.too_big = 0
+        self._logger = logging.getLogger(__name__)
+
+    def cache_info(self) -> Dict[str, int]:
+        """The content reused, rendered, prefetched and dropped, for Stats
+
+        :return: The hits, misses, prefetched, number of objects and bytes
+            cached and what was evicted
+        :rtype: dict
+        """
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "prefetched": self.prefetched,
+            "size": len(self._entries),
+            "bytes": self.bytes,
+            "max_bytes": self.max_bytes,
+            "evictions": self.evictions,
+            "evicted_bytes": self.evicted_bytes,
+            "too_big": self.too_big,
+        }
+
+    @staticmethod
+    def key(obj: Any, *args: Hashable) -> Union[Tuple[Hashable, ...], None]:
+        """Make the key for an object's content
+
+        :param obj: The object to be shown
+        :type obj: Any
+        :param args: Anything else the content depends on, eg the xform
+        :type args: hashable
+        :return: The key, or None if the object can't be cached
+        :rtype: tuple or None
+        """
+        if isinstance(obj, str):
+            return (digest(obj),) + args
+        if isinstance(obj, dict):
+            return (id(obj), row_version(obj)) + args
+        return None
+
+    def lines(
+        self,
+        obj: Any,
+        key: Union[Tuple[Hashable, ...], None],
+        render: Callable[[Any], Any],
+        finish: Callable[[Any], CursesLineStore],
+    ) -> CursesLineStore:
+        """Return the lines for an object, waiting for a prefetch of it
+        or rendering it now
+
+        :param obj: The object to be shown
+        :type obj: Any
+        :param key: The key from key()
+        :type key: tuple or None
+        :param render: Serialize and tokenize an object
+        :type render: callable
+        :param finish: Make the lines for curses from what render returned
+        :type finish: callable
+        :return: The lines
+        :rtype: CursesLineStore
+        """
+        if key is None:
+            self.misses += 1
+            return finish(render(obj))
+
+        entry = self._entries.get(key)
+        if entry is None or (isinstance(obj, dict) and entry.obj is not obj):
+            self.misses += 1
+            future: "Future[Any]" = Future()
+            future.set_result(render(obj))
+            entry = self._store(key, _Content(obj, future))
+        else:
+            self.hits += 1
+            self._entries.move_to_end(key)
+
+        if entry.lines is None:
+            assert entry.future is not None
+            try:
+                rendered = entry.future.result()
+            except (CancelledError, Skipped):
+                rendered = render(obj)
+            except Exception as exc:  # pylint: disable=broad-except
+                # eg the obj changed while it was serialized in the background
+                self._logger.debug("Prefetch failed, rendering again: %s", str(exc))
+                rendered = render(obj)
+            entry.future = None
+            entry.lines = finish(rendered)
+        lines = entry.lines
+        self._measure(key, entry)
+        return lines
+
+    def prefetch(
+        self,
+        objs: List[Tuple[Any, Union[Tuple[Hashable, ...], None]]],
+        render: Callable[[Any], Any],
+    ) -> None:
+        """Render some objects in the background, anything still waiting
+        from an earlier prefetch is cancelled
+
+        :param objs: The objects and their keys, most likely to be shown first
+        :type objs: list of tuples
+        :param render: Serialize and tokenize an object
+        :type render: callable
+        """
+        wanted = set(key for _obj, key in objs)
+        for key, entry in list(self._entries.items()):
+            if key not in wanted and entry.future is not None and entry.future.cancel():
+                self._drop(key)
+
+        for obj, key in objs:
+            if key is None or key in self._entries:
+                continue
+            if self._executor is None:
+                self._executor = ThreadPoolExecutor(
+                    max_workers=self._workers, thread_name_prefix="prefetch"
+                )
+            self.prefetched += 1
+            self._store(key, _Content(obj, self._executor.submit(render, obj)))
+
+    def shutdown(self) -> None:
+        """Cancel the prefetches waiting and stop the thread pool, without
+        waiting for a render that's already running
+        """
+        for entry in self._entries.values():
+            if entry.future is not None:
+                entry.future.cancel()
+        if self._executor is not None:
+            if sys.version_info >= (3, 9):
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            else:
+                self._executor.shutdown(wait=False)
+            self._executor = None
+
+    def _store(self, key: Tuple[Hashable, ...], entry: _Content) -> _Content:
+        """Add an entry, dropping the least recently used
+
+        :param key: The key from key()
+        :type key: tuple
+        :param entry: The content
+        :type entry: _Content
+        :return: The entry
+        :rtype: _Content
+        """
+        if key in self._entries:
+            self._drop(key)
+        self._entries[key] = entry
+        self._evict()
+        return entry
+
+    def _measure(self, key: Tuple[Hashable, ...], entry: _Content) -> None:
+        """Estimate the memory used by an entry's lines again, dropping
+        the least recently used if it's over the limit
+
+        :param key: The key from key()
+        :type key: tuple
+        :param entry: The content
+        :type entry: _Content
+        """
+        assert entry.lines is not None
+        nbytes = entry.lines.nbytes()
+        if nbytes > self.max_bytes:
+            # more than fits, it's shown but not kept
+            self.too_big += 1
+            self._drop(key)
+            return
+        self.bytes += nbytes - entry.nbytes
+        entry.nbytes = nbytes
+        self._evict()
+
+    def _evict(self) -> None:
+        """Drop the least recently used entries while there are too many,
+        or they use too much memory
+        """
+        while len(self._entries) > self._maxsize or self.bytes > self.max_bytes:
+            key = next(iter(self._entries))
+            self.evictions += 1
+            self.evicted_bytes += self._entries[key].nbytes
+            self._drop(key)
+
+    def _drop(self, key: Hashable) -> None:
+        """Remove an entry, cancelling its prefetch if it hasn't started
+
+        :param key: The key from key()
+        :type key: tuple
+        """
+        entry = self._entries.pop(key)
+        self.bytes -= entry.nbytes
+        if entry.future is not None:
+            entry.future.cancel()
@@ -0,0 +1,200 @@
+""" search the lines of content
+"""
+import bisect
+import curses
+import threading
+
+from typing import List
+from typing import Pattern
+from typing import Tuple
+from typing import Union
+
+from .curses_defs import CursesLine
+from .curses_defs import CursesLines
+from .curses_defs import CursesLineStore
+
+# content longer than this is indexed in a background thread
+BACKGROUND_LINES = 20000
+CHUNK_LINES = 5000
+
+
+class ContentSearch:
+    # pylint: disable=too-many-instance-attributes
+    """An index of the lines matching a regex
+
+    Short content is indexed when asked for a match, long content is indexed in
+    a background thread in chunks, so matches near the top can be used before
+    the index is complete. Lines appended to the content are indexed as well.
+    """
+
+    def __init__(
+        self, regex: Pattern, lines: CursesLineStore, background_lines: int = BACKGROUND_LINES
+    ) -> None:
+        """start
+
+        :param regex: The regex to search for
+        :type regex: Pattern
+        :param lines: The lines to search
+        :type lines: CursesLineStore
+        :param background_lines: Index content longer than this in the background
+        :type background_lines: int
+        """
+        self.regex = regex
+        self.lines = lines
+        self.matches: List[int] = []
+        # a jump waiting for the background index, 1 or -1
+        self.pending = 0
+        self._background_lines = background_lines
+        self._cancelled = False
+        self._current: Union[int, None] = None
+        self._indexed = 0
+        self._position = 0
+        self._thread: Union[threading.Thread, None] = None
+
+    @property
+    def indexing(self) -> bool:
+        """Is the index being built in the background
+
+        :return: True if the background thread is still running
+        :rtype: bool
+        """
+        return self._thread is not None and self._thread.is_alive()
+
+    def cancel(self) -> None:
+        """Stop indexing in the background"""
+        self._cancelled = True
+
+    def restart(self, lines: CursesLineStore) -> "ContentSearch":
+        """Search some other lines for the same regex
+
+        :param lines: The lines to search
+        :type lines: CursesLineStore
+        :return: The new search
+        :rtype: ContentSearch
+        """
+        self.cancel()
+        return ContentSearch(self.regex, lines, self._background_lines)
+
+    def update(self) -> None:
+        """Index any lines not yet indexed, in the background if there are many"""
+        if self.indexing or self._indexed >= len(self.lines):
+            return
+        if len(self.lines) - self._indexed > self._background_lines:
+            self._thread = threading.Thread(target=self._index, daemon=True)
+            self._thread.start()
+        else:
+            self._index()
+
+    def _index(self) -> None:
+        """Index the lines not yet indexed, a chunk at a time"""
+        search = self.regex.search
+        text = self.lines.text
+        while not self._cancelled and self._indexed < len(self.lines):
+            start = self._indexed
+            stop = min(start + CHUNK_LINES, len(self.lines))
+            self.matches.extend(idx for idx in range(start, stop) if search(text(idx)))
+            self._indexed = stop
+
+    def next_match(self, first: int, last: int, step: int) -> Union[int, None]:
+        """Find the next or previous matching line, wrapping around.
+
+        When the last match returned is still showing, step from it,
+        otherwise from the lines showing.
+
+        :param first: The first line showing
+        :type first: int
+        :param last: The last line showing
+        :type last: int
+        :param step: 1 for the next match, -1 for the previous
+        :type step: int
+        :return: The line number of the match, None if there isn't one yet
+        :rtype: int or None
+        """
+        self.update()
+        count = len(self.matches)
+        if not count:
+            return None
+
+        current = self._current
+        if current is not None and first <= current <= last:
+            if self.matches[self._position] == current:
+                position = self._position + step
+            elif step > 0:
+                position = bisect.bisect_right(self.matches, current)
+            else:
+                position = bisect.bisect_left(self.matches, current) - 1
+        elif step > 0:
+            position = bisect.bisect_left(self.matches, first)
+        else:
+            position = bisect.bisect_right(self.matches, last) - 1
+
+        if position >= count and self.indexing:
+            # the next match may not have been found yet
+            return None
+        self._position = position % count
+        self._current = self.matches[self._position]
+        return self._current
+
+    def highlight(self, lines: CursesLines) -> CursesLines:
+        """Highlight the matches in the lines showing
+
+        :param lines: The lines showing
+        :type lines: CursesLines
+        :return: The lines with the matches highlighted
+        :rtype: CursesLines
+        """
+        return tuple(self._highlight_line(line) for line in lines)
+
+    def _highlight_line(self, line: CursesLine) -> CursesLine:
+        """Reverse the parts of a line that match
+
+        :param line: A line
+        :type line: CursesLine
+        :return: The line with the matches highlighted
+        :rtype: CursesLine
+        """
+        text = "".join(part.string for part in line)
+        spans = [match.span() for match in self.regex.finditer(text) if match.end() > match.start()]
+        if not spans:
+            return line
+        parts = []
+        offset = 0
+        for part in line:
+            end = offset + len(part.string)
+            for start, stop, reverse in _cuts(spans, offset, end):
+                parts.append(
+                    part._replace(
+                        column=part.column + start - offset,
+                        string=part.string[start - offset : stop - offset],
+                        decoration=part.decoration | (curses.A_REVERSE if reverse else 0),
+                    )
+                )
+            offset = end
+        return tuple(parts)
+
+
+def _cuts(spans: List[Tuple[int, int]], start: int, end: int) -> List[Tuple[int, int, bool]]:
+    """Cut a part of a line where the spans begin and end
+
+    :param spans: The ordered spans of the matches
+    :type spans: list of tuples
+    :param start: The offset of the part in the line
+    :type start: int
+    :param end: The offset of the end of the part
+    :type end: int
+    :return: The start, end and if in a span, for each piece of the part
+    :rtype: list of tuples
+    """
+    cuts = []
+    position = start
+    for span_start, span_end in spans:
+        if span_end <= position or span_start >= end:
+            continue
+        if span_start > position:
+            cuts.append((position, span_start, False))
+            position = span_start
+        cuts.append((position, min(span_end, end), True))
+        position = min(span_end, end)
+    if position < end:
+        cuts.append((position, end, False))
+    return cuts
@@ -1,8 +1,17 @@
 """ commonly used defs
 """
 
+from array import array
+from collections import OrderedDict
+from typing import Callable
+from typing import Iterable
+from typing import Iterator
+from typing import List
 from typing import NamedTuple
+from typing import Sequence
 from typing import Tuple
+from typing import Union
+from typing import overload
 
 
 class CursesLinePart(NamedTuple):
@@ -18,3 +27,299 @@ class CursesLinePart(NamedTuple):
 
 CursesLine = Tuple[CursesLinePart, ...]
 CursesLines = Tuple[CursesLine, ...]
+
+# one run is (column, length, color, decoration)
+CursesLineRun = Tuple[int, int, int, int]
+RUN_WIDTH = 4
+# lines filled at once by a LazyLineStore, so scrolling doesn't fill one at a time
+FILL_LINES = 100
+# lines kept by a WindowLineStore, more than fit on a screen
+RING_LINES = 1024
+# estimates of the memory for a string, less its text, and a tuple of a run
+STR_BYTES = 50
+RUN_BYTES = 100
+
+
+class CursesLineStore(Sequence[CursesLine]):
+    """A compact store of lines for the render pipeline
+
+    Each line is kept as one string, the concatenation of its parts,
+    and the parts themselves as runs of (column, length, color, decoration)
+    packed into a single integer array. CursesLineParts are only built
+    for the lines asked for, which is generally just the ones on the screen.
+    """
+
+    def __init__(self, lines: Iterable[CursesLine] = ()) -> None:
+        """start
+
+        :param lines: Some CursesLines to begin with
+        :type lines: An iterable of CursesLine
+        """
+        self._strings: List[str] = []
+        self._chars = 0
+        self._runs = array("q")
+        # the run index at which each line starts, plus one past the end
+        self._line_runs = array("q", [0])
+        self.extend(lines)
+
+    def __len__(self) -> int:
+        return len(self._strings)
+
+    @overload
+    def __getitem__(self, index: int) -> CursesLine:
+        ...
+
+    @overload
+    def __getitem__(self, index: slice) -> CursesLines:
+        ...
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[CursesLine, CursesLines]:
+        if isinstance(index, slice):
+            return tuple(self._line(idx) for idx in range(*index.indices(len(self))))
+        if index < 0:
+            index += len(self)
+        if not 0 <= index < len(self):
+            raise IndexError("line index out of range")
+        return self._line(index)
+
+    def __iter__(self) -> Iterator[CursesLine]:
+        return (self._line(idx) for idx in range(len(self)))
+
+    def append(self, line: CursesLine) -> None:
+        """Add one CursesLine to the store
+
+        :param line: The line to add
+        :type line: CursesLine
+        """
+        self.append_runs(
+            "".join(part.string for part in line),
+            ((part.column, len(part.string), part.color, part.decoration) for part in line),
+        )
+
+    def append_runs(self, string: str, runs: Iterable[CursesLineRun]) -> None:
+        """Add one line to the store, without the need for CursesLineParts
+
+        :param string: The text of the line, all of the runs concatenated
+        :type string: str
+        :param runs: The runs of the line, each (column, length, color, decoration)
+        :type runs: An iterable of 4 tuples of int
+        """
+        self._strings.append(string)
+        self._chars += len(string)
+        for run in runs:
+            if run[1]:
+                self._runs.extend(run)
+        self._line_runs.append(len(self._runs) // RUN_WIDTH)
+
+    def extend(self, lines: Iterable[CursesLine]) -> None:
+        """Add a number of CursesLines to the store
+
+        :param lines: The lines to add
+        :type lines: An iterable of CursesLine
+        """
+        for line in lines:
+            self.append(line)
+
+    def nbytes(self) -> int:
+        """An estimate of the memory used by the lines
+
+        :return: The number of bytes
+        :rtype: int
+        """
+        runs = self._runs.itemsize * (len(self._runs) + len(self._line_runs))
+        return self._chars + STR_BYTES * len(self._strings) + runs
+
+    def text(self, index: int) -> str:
+        """Return the plain text of one line
+
+        :param index: The line number
+        :type index: int
+        :return: The text of the line, without colors
+        :rtype: str
+        """
+        return self._strings[index]
+
+    def runs(self, index: int) -> Iterator[CursesLineRun]:
+        """Return the runs of one line
+
+        :param index: The line number
+        :type index: int
+        :return: The runs, each (column, length, color, decoration)
+        :rtype: An iterator of 4 tuples of int
+        """
+        runs = self._runs
+        for run_idx in range(self._line_runs[index], self._line_runs[index + 1]):
+            offset = run_idx * RUN_WIDTH
+            yield runs[offset], runs[offset + 1], runs[offset + 2], runs[offset + 3]
+
+    def _line(self, index: int) -> CursesLine:
+        """Build the CursesLine for one line
+
+        :param index: The line number
+        :type index: int
+        :return: The line
+        :rtype: CursesLine
+        """
+        return self._parts(self._strings[index], self.runs(index))
+
+    @staticmethod
+    def _parts(string: str, runs: Iterable[CursesLineRun]) -> CursesLine:
+        """Build a CursesLine from a string and its runs
+
+        :param string: The text of the line
+        :type string: str
+        :param runs: The runs of the line
+        :type runs: An iterable of 4 tuples of int
+        :return: The line
+        :rtype: CursesLine
+        """
+        parts = []
+        position = 0
+        for column, length, color, decoration in runs:
+            parts.append(
+                CursesLinePart(
+                    column=column,
+                    string=string[position : position + length],
+                    color=color,
+                    decoration=decoration,
+                )
+            )
+            position += length
+        return tuple(parts)
+
+
+class LazyLineStore(CursesLineStore):
+    """A store of lines filled from the top only as far as lines are asked for
+
+    The text of every line is known up front, so the length and text of
+    the lines can be used, eg for search, before they are rendered.
+    """
+
+    def __init__(
+        self,
+        texts: Sequence[str],
+        fill: Callable[[int, int], Iterable[Tuple[str, Iterable[CursesLineRun]]]],
+    ) -> None:
+        """start
+
+        :param texts: The text of each line
+        :type texts: A sequence of str
+        :param fill: Render the lines from one up to another, the string and runs of each
+        :type fill: callable
+        """
+        super().__init__()
+        self.texts = texts
+        self._fill = fill
+
+    @property
+    def filled(self) -> int:
+        """The number of lines rendered so far
+
+        :return: The number of lines
+        :rtype: int
+        """
+        return len(self._strings)
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def nbytes(self) -> int:
+        # the texts are counted if they know their size, eg a document
+        texts = getattr(self.texts, "nbytes", None)
+        return super().nbytes() + (texts() if texts is not None else 0)
+
+    def text(self, index: int) -> str:
+        return self.texts[index]
+
+    def runs(self, index: int) -> Iterator[CursesLineRun]:
+        self._fill_to(index + 1)
+        return super().runs(index)
+
+    def _line(self, index: int) -> CursesLine:
+        self._fill_to(index + 1)
+        return super()._line(index)
+
+    def _fill_to(self, stop: int) -> None:
+        """Render the lines up to one, and a few more
+
+        :param stop: The line to stop before
+        :type stop: int
+        """
+        if stop <= self.filled:
+            return
+        stop = min(max(stop, self.filled + FILL_LINES), len(self))
+        for string, runs in self._fill(self.filled, stop):
+            self.append_runs(string, runs)
+
+
+class WindowLineStore(CursesLineStore):
+    """A store of lines filled only around the ones asked for, eg the end
+    of a log as it grows, rather than from the top
+
+    The lines filled most recently are kept in a ring, the rest are
+    filled again if they're asked for again.
+    """
+
+    def __init__(
+        self,
+        texts: Sequence[str],
+        fill: Callable[[int, int], Iterable[Tuple[str, Iterable[CursesLineRun]]]],
+        ring_lines: int = RING_LINES,
+    ) -> None:
+        """start
+
+        :param texts: The text of each line, it may grow
+        :type texts: A sequence of str
+        :param fill: Render the lines from one up to another, the string and runs of each
+        :type fill: callable
+        :param ring_lines: Keep this many of the lines filled
+        :type ring_lines: int
+        """
+        super().__init__()
+        self.texts = texts
+        self.filled = 0
+        self._fill = fill
+        self._ring: "OrderedDict[int, Tuple[str, Tuple[CursesLineRun, ...]]]" = OrderedDict()
+        self._ring_lines = ring_lines
+
+    def __len__(self) -> int:
+        return len(self.texts)
+
+    def nbytes(self) -> int:
+        # only the ring, the texts belong to whatever they're read from, eg a log
+        return sum(
+            STR_BYTES + len(string) + RUN_BYTES * len(runs) for string, runs in self._ring.values()
+        )
+
+    def text(self, index: int) -> str:
+        return self.texts[index]
+
+    def runs(self, index: int) -> Iterator[CursesLineRun]:
+        return iter(self._entry(index)[1])
+
+    def _line(self, index: int) -> CursesLine:
+        return self._parts(*self._entry(index))
+
+    def _entry(self, index: int) -> Tuple[str, Tuple[CursesLineRun, ...]]:
+        """Find the string and runs of a line, filling it and the lines
+        after it up to the next one already filled, if it isn't
+
+        :param index: The line number
+        :type index: int
+        :return: The string and runs
+        :rtype: tuple
+        """
+        entry = self._ring.get(index)
+        if entry is not None:
+            self._ring.move_to_end(index)
+            return entry
+        stop = index + 1
+        while stop < min(index + FILL_LINES, len(self)) and stop not in self._ring:
+            stop += 1
+        for idx, (string, runs) in enumerate(self._fill(index, stop), index):
+            self._ring[idx] = (string, tuple(run for run in runs if run[1]))
+            self.filled += 1
+        entry = self._ring[index]
+        while len(self._ring) > self._ring_lines:
+            self._ring.popitem(last=False)
+        return entry
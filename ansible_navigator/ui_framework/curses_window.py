@@ -108,12 +108,12 @@ class CursesWindow:
             )
         if line:
             win.move(lineno, 0)
-            for line_part in line:
-                column = line_part.column + len(prefix or "")
+            for part_column, string, color, decoration in line:
+                column = part_column + len(prefix or "")
                 if column <= self._screen_w:
-                    text = line_part.string[0 : self._screen_w - column + 1]
+                    text = string[0 : self._screen_w - column + 1]
                     try:
-                        win.addstr(lineno, column, text, line_part.color | line_part.decoration)
+                        win.addstr(lineno, column, text, color | decoration)
                     except curses.error:
                         # curses error at last column & row but I don't care
                         # because it still draws it
@@ -4,17 +4,84 @@ import curses
 import functools
 import re
 
+from collections import OrderedDict
 from typing import Any
 from typing import Callable
 from typing import Dict
 from typing import List
 from typing import Tuple
+from typing import Union
 
 from .curses_defs import CursesLine
 from .curses_defs import CursesLinePart
 from .curses_defs import CursesLines
-from .utils import convert_percentage
-from .utils import distribute
+from .menu_layout import MenuLayoutCache
+from .menu_layout import column_layout
+from .utils import cell_text
+from .utils import row_version
+
+MAXSIZE = 2048
+
+
+class MenuLineCache:
+    """The menu lines already built, for the rows of a menu
+
+    A line is built again only when its row's version changes, so rows
+    that change after being shown must be touched. The whole cache is
+    emptied when the layout or colors change.
+    """
+
+    def __init__(self, maxsize: int = MAXSIZE) -> None:
+        """start
+
+        :param maxsize: The number of lines to keep
+        :type maxsize: int
+        """
+        self._key: Any = None
+        self._lines: "OrderedDict[int, Tuple[Dict, int, CursesLine]]" = OrderedDict()
+        self._maxsize = maxsize
+        self.hits = 0
+        self.misses = 0
+
+    def cache_info(self) -> Dict[str, int]:
+        """The lines reused and built, for Stats
+
+        :return: The hits, misses and number of lines cached
+        :rtype: dict
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._lines)}
+
+    def line(self, dyct: Dict, key: Any, build: Callable[[Dict], CursesLine]) -> CursesLine:
+        """Return the line for a row, building it if needed
+
+        :param dyct: The menu row
+        :type dyct: dict
+        :param key: Anything else the line depends on, eg the layout
+        :type key: hashable
+        :param build: Builds the line for a row
+        :type build: callable
+        :return: The menu line
+        :rtype: CursesLine
+        """
+        if key != self._key:
+            self._key = key
+            self._lines.clear()
+
+        version = row_version(dyct)
+        cached = self._lines.get(id(dyct))
+        # the row is held, so its id can't be reused
+        if cached is not None and cached[0] is dyct and cached[1] == version:
+            self._lines.move_to_end(id(dyct))
+            self.hits += 1
+            return cached[2]
+
+        self.misses += 1
+        line = build(dyct)
+        self._lines[id(dyct)] = (dyct, version, line)
+        self._lines.move_to_end(id(dyct))
+        if len(self._lines) > self._maxsize:
+            self._lines.popitem(last=False)
+        return line
 
 
 class MenuBuilder:
@@ -27,12 +94,16 @@ class MenuBuilder:
         screen_w: int,
         number_colors: int,
         color_menu_item: Callable,
+        layout_cache: Union[MenuLayoutCache, None] = None,
+        line_cache: Union[MenuLineCache, None] = None,
     ):
         # pylint: disable=too-many-arguments
         self._number_colors = number_colors
         self._pbar_width = pbar_width
         self._screen_w = screen_w
         self._color_menu_item = color_menu_item
+        self._layout_cache = MenuLayoutCache() if layout_cache is None else layout_cache
+        self._line_cache = MenuLineCache() if line_cache is None else line_cache
 
     def build(self, dicts: List, cols: List, indicies) -> Tuple[CursesLines, CursesLines]:
         """main entry point for menu builer"""
@@ -52,28 +123,15 @@ class MenuBuilder:
         """
         line_prefix_w = len(str(len(dicts))) + len("|")
 
-        for idx in indicies:
-            convert_percentage(dicts[idx], cols, self._pbar_width)
-
-        lines = [[str(dicts[idx].get(c)) for c in cols] for idx in indicies]
-        colws = [
-            max([len(str(v)) for v in c])
-            for c in zip(*lines + [[re.sub("^__", "", col) for col in cols]])
-        ]
-        # add a space
-        colws = [c + 1 for c in colws]
-
+        # the widths come from every row, not just those showing
+        colws = self._layout_cache.widths(dicts, cols, self._pbar_width)
         available = self._screen_w - line_prefix_w - 1  # scrollbar width
-        adj_colws = distribute(available, colws)
+        col_starts, adj_colws = column_layout(colws, available)
 
-        col_starts = [0]
-        for idx, colw in enumerate(adj_colws):
-            col_starts.append(colw + col_starts[idx])
-
-        menu_layout = tuple([col_starts, cols, adj_colws])
+        menu_layout = tuple([list(col_starts), cols, list(adj_colws)])
         header = self._menu_header_line(menu_layout)
 
-        menu_layout = tuple([col_starts, cols, adj_colws, header])
+        menu_layout = tuple([list(col_starts), cols, list(adj_colws), list(header)])
         menu_lines = self._menu_lines(dicts, menu_layout, indicies)
         return tuple([header]), menu_lines
 
@@ -147,7 +205,16 @@ class MenuBuilder:
         :return: the menu lines
         :type: CursesLines
         """
-        return tuple(self._menu_line(dicts[idx], menu_layout) for idx in indicies)
+        col_starts, cols, adj_colws, _header = menu_layout
+        key = (
+            tuple(col_starts),
+            tuple(cols),
+            tuple(adj_colws),
+            self._color_menu_item,
+            self._number_colors,
+        )
+        build = functools.partial(self._menu_line, menu_layout=menu_layout)
+        return tuple(self._line_cache.line(dicts[idx], key, build) for idx in indicies)
 
     def _menu_line(self, dyct: dict, menu_layout: Tuple[List, ...]) -> CursesLine:
         """Generate one the menu line
@@ -207,11 +274,12 @@ class MenuBuilder:
         color = self._color_menu_item(colno, cols[colno], dyct)
         color = curses.color_pair(color % self._number_colors)
 
-        text = str(coltext)[0 : adj_colws[colno]]
+        full_text = cell_text(coltext, self._pbar_width)
+        text = full_text[0 : adj_colws[colno]]
         if isinstance(coltext, (int, bool, float)) or cols[colno].lower() == "__duration":
             # right jusitfy on header if int, bool, float or "duration"
             print_at = col_starts[colno] + len(header[colno][1]) - len(text)
-        elif _is_progress(str(coltext)):
+        elif _is_progress(full_text):
             # right justify in column if %
             print_at = col_starts[colno] + adj_colws[colno] - len(text)
         else:
@@ -0,0 +1,123 @@
+""" incremental filtering of menu rows
+"""
+from collections import OrderedDict
+from typing import Dict
+from typing import List
+from typing import Pattern
+from typing import Tuple
+from typing import Union
+
+from .utils import ROW_CLOCK
+from .utils import row_version
+
+MAXSIZE = 8
+
+
+class _FilterResult:
+    # pylint: disable=too-few-public-methods
+    """The filter result for one list of rows"""
+
+    def __init__(self, rows: List[Dict]) -> None:
+        # hold the rows, so the id in the cache key can't be reused
+        self.rows = rows
+        self.clock = -1
+        self.indicies: Tuple[int, ...] = ()
+        self.matches: List[bool] = []
+        self.versions: List[int] = []
+
+
+class MenuFilterCache:
+    """Find the rows of a menu that match a filter
+
+    The matches for each list of rows are cached. When nothing has been
+    touched since the last call, the cached indicies are returned. Otherwise
+    only appended rows and rows with a new version are tested again.
+    The cache holds a few lists and is emptied when the filter changes.
+    """
+
+    def __init__(self, maxsize: int = MAXSIZE) -> None:
+        """start
+
+        :param maxsize: The number of lists of rows to cache results for
+        :type maxsize: int
+        """
+        self._maxsize = maxsize
+        self._regex: Union[Pattern, None] = None
+        self._results: "OrderedDict[Tuple[int, Tuple[str, ...]], _FilterResult]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def cache_info(self) -> Dict[str, int]:
+        """The cached results reused and rows tested, for Stats
+
+        :return: The hits, misses and number of lists cached
+        :rtype: dict
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._results)}
+
+    def indicies(self, regex: Pattern, rows: List[Dict], columns: List[str]) -> Tuple[int, ...]:
+        """Return the indicies of the rows matching a regex in any column
+
+        :param regex: The filter
+        :type regex: Pattern
+        :param rows: The menu rows
+        :type rows: list of dicts
+        :param columns: The keys in each row to check
+        :type columns: list of str
+        :return: The indicies of the matching rows
+        :rtype: tuple of int
+        """
+        if regex is not self._regex:
+            self._regex = regex
+            self._results.clear()
+
+        key = (id(rows), tuple(columns))
+        result = self._results.get(key)
+        if result is None or result.rows is not rows:
+            result = self._results[key] = _FilterResult(rows)
+            if len(self._results) > self._maxsize:
+                self._results.popitem(last=False)
+        self._results.move_to_end(key)
+
+        # the list may have shrunk
+        changed = len(result.matches) > len(rows)
+        del result.matches[len(rows) :]
+        del result.versions[len(rows) :]
+
+        # rows were touched, find them by version
+        if result.clock != ROW_CLOCK.now:
+            for idx, version in enumerate(result.versions):
+                if row_version(rows[idx]) != version:
+                    result.versions[idx] = row_version(rows[idx])
+                    result.matches[idx] = self._match(regex, rows[idx], columns)
+                    changed = True
+                    self.misses += 1
+
+        # rows were appended
+        for row in rows[len(result.matches) :]:
+            result.versions.append(row_version(row))
+            result.matches.append(self._match(regex, row, columns))
+            changed = True
+            self.misses += 1
+
+        if changed:
+            result.indicies = tuple(idx for idx, match in enumerate(result.matches) if match)
+        else:
+            self.hits += 1
+        result.clock = ROW_CLOCK.now
+        return result.indicies
+
+    @staticmethod
+    def _match(regex: Pattern, row: Dict, columns: List[str]) -> bool:
+        """Check one row's columns against the regex
+
+        :param regex: The filter
+        :type regex: Pattern
+        :param row: The row to check
+        :type row: dict
+        :param columns: The keys in the row to check
+        :type columns: list of str
+        :return: True if any column matched
+        :rtype: bool
+        """
+        return any(regex.search(str(row[column])) for column in columns)
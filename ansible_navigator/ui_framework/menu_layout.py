@@ -0,0 +1,137 @@
+""" incremental column layout for menus
+"""
+import functools
+import re
+
+from collections import OrderedDict
+from typing import Dict
+from typing import List
+from typing import Tuple
+
+from .utils import ROW_CLOCK
+from .utils import cell_text
+from .utils import distribute
+from .utils import row_version
+
+MAXSIZE = 8
+
+
+class _ColumnWidths:
+    # pylint: disable=too-few-public-methods
+    """The running maximum width of each column for one list of rows"""
+
+    def __init__(self, rows: List[Dict], columns: List[str]) -> None:
+        # hold the rows, so the id in the cache key can't be reused
+        self.rows = rows
+        self.clock = -1
+        self.versions: List[int] = []
+        self.widths = [len(re.sub("^__", "", column)) for column in columns]
+
+
+class MenuLayoutCache:
+    """Keep the width of each column of a menu as rows are added or changed
+
+    Every row is measured once, when first seen, and again only when its version
+    changes. Widths only ever grow, so the columns don't move while scrolling.
+    The cache holds the widths for a few lists of rows.
+    """
+
+    def __init__(self, maxsize: int = MAXSIZE) -> None:
+        """start
+
+        :param maxsize: The number of lists of rows to keep widths for
+        :type maxsize: int
+        """
+        self._maxsize = maxsize
+        self._widths: "OrderedDict[Tuple[int, Tuple[str, ...]], _ColumnWidths]" = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def cache_info(self) -> Dict[str, int]:
+        """The rows measured and reused, for Stats
+
+        :return: The hits, misses and number of lists cached
+        :rtype: dict
+        """
+        return {"hits": self.hits, "misses": self.misses, "size": len(self._widths)}
+
+    def widths(self, rows: List[Dict], columns: List[str], pbar_width: int) -> Tuple[int, ...]:
+        """Return the width of each column, the widest value or the header
+
+        :param rows: The menu rows
+        :type rows: list of dicts
+        :param columns: The keys in each row used as columns
+        :type columns: list of str
+        :param pbar_width: The width of a progress bar
+        :type pbar_width: int
+        :return: The width of each column
+        :rtype: tuple of int
+        """
+        key = (id(rows), tuple(columns))
+        result = self._widths.get(key)
+        if result is None or result.rows is not rows:
+            result = self._widths[key] = _ColumnWidths(rows, columns)
+            if len(self._widths) > self._maxsize:
+                self._widths.popitem(last=False)
+        self._widths.move_to_end(key)
+
+        # the list may have shrunk, the widths are kept
+        del result.versions[len(rows) :]
+
+        misses = self.misses
+        measured = len(result.versions)
+        if result.clock != ROW_CLOCK.now:
+            for idx, version in enumerate(result.versions):
+                if row_version(rows[idx]) != version:
+                    result.versions[idx] = row_version(rows[idx])
+                    self._measure(result.widths, rows[idx], columns, pbar_width)
+                    self.misses += 1
+
+        for row in rows[measured:]:
+            result.versions.append(row_version(row))
+            self._measure(result.widths, row, columns, pbar_width)
+            self.misses += 1
+
+        if self.misses == misses:
+            self.hits += 1
+        result.clock = ROW_CLOCK.now
+        return tuple(result.widths)
+
+    @staticmethod
+    def _measure(widths: List[int], row: Dict, columns: List[str], pbar_width: int) -> None:
+        """Grow the widths to fit one row
+
+        :param widths: The width of each column
+        :type widths: list of int
+        :param row: The row to measure
+        :type row: dict
+        :param columns: The keys in the row used as columns
+        :type columns: list of str
+        :param pbar_width: The width of a progress bar
+        :type pbar_width: int
+        """
+        for colno, column in enumerate(columns):
+            width = len(cell_text(row.get(column), pbar_width))
+            if width > widths[colno]:
+                widths[colno] = width
+
+
+@functools.lru_cache(maxsize=128)
+def column_layout(
+    widths: Tuple[int, ...], available: int
+) -> Tuple[Tuple[int, ...], Tuple[int, ...]]:
+    """Fit the columns into the available width
+
+    :param widths: The width of each column
+    :type widths: tuple of int
+    :param available: The width of the screen available to the menu
+    :type available: int
+    :return: The start and adjusted width of each column
+    :rtype: tuple of int, tuple of int
+    """
+    # add a space
+    adj_colws = distribute(available, [width + 1 for width in widths])
+    col_starts = [0]
+    for colw in adj_colws:
+        col_starts.append(col_starts[-1] + colw)
+    return tuple(col_starts), tuple(adj_colws)
@@ -0,0 +1,722 @@
+""" Serialize an obj as yaml or json and color it in one pass
+
+The serializer knows which parts of the text are keys, strings, numbers and
+punctuation, so rather than tokenizing the serialized text with the grammars,
+each part is given the theme's color for the scope the grammar would give it.
+The text is the same as from yaml.dump and json.dumps with the options used
+for showing content. An obj that can't be serialized here, eg it has types
+only the yaml representer knows of, or would be dumped with anchors, is left
+to be serialized and tokenized as before.
+"""
+import functools
+import io
+import json
+import math
+import re
+
+from typing import Any
+from typing import Callable
+from typing import Dict
+from typing import List
+from typing import Pattern
+from typing import Set
+from typing import Tuple
+from typing import Union
+
+from ..yaml import Dumper
+from ..yaml import yaml
+
+STR_TAG = "tag:yaml.org,2002:str"
+# the emitter folds lines that are longer than this
+YAML_WIDTH = 80
+
+# the scope the grammar gives each part of the text, only the innermost names
+# are used to find a color, so the meta scopes around them are left out
+YAML_SCOPES = {
+    "document": ("source.yaml", "entity.other.document.begin.yaml"),
+    "key": ("source.yaml", "string.unquoted.plain.out.yaml", "entity.name.tag.yaml"),
+    "separator": ("source.yaml", "punctuation.separator.key-value.mapping.yaml"),
+    "item": ("source.yaml", "punctuation.definition.block.sequence.item.yaml"),
+    "plain": ("source.yaml", "string.unquoted.plain.out.yaml"),
+    "null": ("source.yaml", "constant.language.null.yaml"),
+    "bool": ("source.yaml", "constant.language.boolean.yaml"),
+    "int": ("source.yaml", "constant.numeric.integer.yaml"),
+    "float": ("source.yaml", "constant.numeric.float.yaml"),
+    "{": ("source.yaml", "meta.flow-mapping.yaml", "punctuation.definition.mapping.begin.yaml"),
+    "}": ("source.yaml", "meta.flow-mapping.yaml", "punctuation.definition.mapping.end.yaml"),
+    "[": ("source.yaml", "meta.flow-sequence.yaml", "punctuation.definition.sequence.begin.yaml"),
+    "]": ("source.yaml", "meta.flow-sequence.yaml", "punctuation.definition.sequence.end.yaml"),
+    "'": ("source.yaml", "string.quoted.single.yaml"),
+    "'begin": (
+        "source.yaml",
+        "string.quoted.single.yaml",
+        "punctuation.definition.string.begin.yaml",
+    ),
+    "'end": ("source.yaml", "string.quoted.single.yaml", "punctuation.definition.string.end.yaml"),
+    "'escape": (
+        "source.yaml",
+        "string.quoted.single.yaml",
+        "constant.character.escape.single-quoted.yaml",
+    ),
+    '"': ("source.yaml", "string.quoted.double.yaml"),
+    '"begin': (
+        "source.yaml",
+        "string.quoted.double.yaml",
+        "punctuation.definition.string.begin.yaml",
+    ),
+    '"end': ("source.yaml", "string.quoted.double.yaml", "punctuation.definition.string.end.yaml"),
+    '"escape': ("source.yaml", "string.quoted.double.yaml", "constant.character.escape.yaml"),
+}
+_JSON_KEY = ("source.json", "meta.structure.dictionary.json", "string.json")
+_JSON_KEY_NAME = _JSON_KEY + ("support.type.property-name.json",)
+_JSON_VALUE = (
+    "source.json",
+    "meta.structure.dictionary.json",
+    "meta.structure.dictionary.value.json",
+)
+_JSON_STRING = _JSON_VALUE + ("string.quoted.double.json",)
+JSON_SCOPES = {
+    "{": (
+        "source.json",
+        "meta.structure.dictionary.json",
+        "punctuation.definition.dictionary.begin.json",
+    ),
+    "}": (
+        "source.json",
+        "meta.structure.dictionary.json",
+        "punctuation.definition.dictionary.end.json",
+    ),
+    "[": ("source.json", "meta.structure.array.json", "punctuation.definition.array.begin.json"),
+    "]": ("source.json", "meta.structure.array.json", "punctuation.definition.array.end.json"),
+    ":": _JSON_VALUE + ("punctuation.separator.dictionary.key-value.json",),
+    ",": _JSON_VALUE + ("punctuation.separator.dictionary.pair.json",),
+    "item,": ("source.json", "meta.structure.array.json", "punctuation.separator.array.json"),
+    "key": _JSON_KEY_NAME,
+    "keybegin": _JSON_KEY_NAME + ("punctuation.support.type.property-name.begin.json",),
+    "keyend": _JSON_KEY_NAME + ("punctuation.support.type.property-name.end.json",),
+    "keyescape": _JSON_KEY_NAME + ("constant.character.escape.json",),
+    '"': _JSON_STRING,
+    '"begin': _JSON_STRING + ("punctuation.definition.string.begin.json",),
+    '"end': _JSON_STRING + ("punctuation.definition.string.end.json",),
+    '"escape': _JSON_STRING + ("constant.character.escape.json",),
+    "number": _JSON_VALUE + ("constant.numeric.json",),
+    "constant": _JSON_VALUE + ("constant.language.json",),
+}
+
+# the escapes the grammars know of, in a quoted string
+YAML_ESCAPE_RE = re.compile(r"""(\\(?:[0abtnvfre "/\\N_Lp]|x\d\d|u\d{4}|U\d{8}))""")
+SINGLE_ESCAPE_RE = re.compile(r"('')")
+JSON_ESCAPE_RE = re.compile(r"""(\\(?:["\\/bfnrt]|u[0-9a-fA-F]{4}))""")
+# a string that's plain, if it doesn't resolve to something other than a str,
+# it has none of the indicators and can only be folded at a space
+PLAIN_RE = re.compile(r"[A-Za-z0-9_./(](?:[A-Za-z0-9_ ./()=+@$%^~;-]*[A-Za-z0-9_./()=+@$%^~;-])?\Z")
+# libyaml, the Dumper, writes a key this long or longer as ? key
+SIMPLE_KEY_LENGTH = 129
+
+_RESOLVER = yaml.resolver.Resolver()
+
+
+class Unsupported(Exception):
+    """The obj can't be serialized here"""
+
+
+def _resolves_to_str(value: str) -> bool:
+    """Would a plain scalar be read back as a str
+
+    :param value: The scalar
+    :type value: str
+    :return: True if it would
+    :rtype: bool
+    """
+    return _RESOLVER.resolve(yaml.ScalarNode, value, (True, False)) == STR_TAG
+
+
+def _plain(value: str) -> bool:
+    """Is a str written as a plain scalar, most keys and many values are
+
+    :param value: The str
+    :type value: str
+    :return: True if it's plain
+    :rtype: bool
+    """
+    if len(value) > YAML_WIDTH:
+        return PLAIN_RE.match(value) is not None and _resolves_to_str(value)
+    return _short_plain(value)
+
+
+@functools.lru_cache(maxsize=4096)
+def _short_plain(value: str) -> bool:
+    """Is a short str plain, these repeat, eg keys, so are cached
+
+    :param value: The str
+    :type value: str
+    :return: True if it's plain
+    :rtype: bool
+    """
+    return PLAIN_RE.match(value) is not None and _resolves_to_str(value)
+
+
+class ColoredLines:
+    """Lines of text, the parts of each run together by color,
+    the same as Colorize.render returns them"""
+
+    def __init__(self, colors: Dict[str, Union[Tuple[int, int, int], None]]) -> None:
+        """start
+
+        :param colors: The color of each kind of part
+        :type colors: dict
+        """
+        self.colors = colors
+        self.lines: List[List[Dict]] = []
+        self.column = 0
+        self._parts: List[Dict] = []
+
+    def add(self, chars: str, kind: Union[str, None] = None) -> None:
+        """Add a part to the line
+
+        :param chars: The text of the part
+        :type chars: str
+        :param kind: The kind of part, None for uncolored
+        :type kind: str or None
+        """
+        if not chars:
+            return
+        color = self.colors[kind] if kind is not None else None
+        parts = self._parts
+        if parts and parts[-1]["color"] == color:
+            parts[-1]["chars"] += chars
+        else:
+            parts.append({"chars": chars, "color": color, "column": self.column})
+        self.column += len(chars)
+
+    def add_quoted(self, chars: str, quote: str, escapes: Pattern, prefix: str) -> None:
+        """Add part of a quoted string, coloring the escapes in it
+
+        :param chars: The text of the part, without the quotes
+        :type chars: str
+        :param quote: The kind of the quoted string
+        :type quote: str
+        :param escapes: A regex with one group, matching the escapes
+        :type escapes: Pattern
+        :param prefix: Prefixed to escape for the kind of the escapes
+        :type prefix: str
+        """
+        if "\\" not in chars and "'" not in chars:
+            self.add(chars, quote)
+            return
+        for idx, piece in enumerate(escapes.split(chars)):
+            self.add(piece, prefix + "escape" if idx % 2 else quote)
+
+    def end(self) -> None:
+        """End the line"""
+        self.lines.append(self._parts or [{"chars": "", "color": None, "column": 0}])
+        self._parts = []
+        self.column = 0
+
+
+class _ScalarStyle(yaml.emitter.Emitter):
+    # pylint: disable=too-few-public-methods
+    """PyYAML's emitter, used to choose the style of a scalar"""
+
+    def __init__(self) -> None:
+        super().__init__(io.StringIO())
+
+    def choose(self, value: str, simple_key: bool) -> Tuple[str, bool]:
+        """Choose the style of a str
+
+        :param value: The str
+        :type value: str
+        :param simple_key: Is it a key
+        :type simple_key: bool
+        :raises Unsupported: If it's a key that would be written as ? key
+        :return: The style, "" for plain, and if it has line breaks
+        :rtype: tuple
+        """
+        # pylint: disable=attribute-defined-outside-init
+        self.event = yaml.ScalarEvent(None, STR_TAG, (_resolves_to_str(value), True), value)
+        self.simple_key_context = simple_key
+        self.analysis = self.analyze_scalar(value)
+        if simple_key and (
+            self.analysis.empty
+            or self.analysis.multiline
+            or len(self.analysis.scalar) >= SIMPLE_KEY_LENGTH
+        ):
+            raise Unsupported(value)
+        return self.choose_scalar_style(), self.analysis.multiline
+
+
+def _dumped_scalar(value: str, column: int, indent: int) -> str:
+    """Dump a str that may be folded or run over several lines, at the same
+    column and indent as in the document, since the emitters fold differently
+
+    :param value: The str
+    :type value: str
+    :param column: The column it starts in
+    :type column: int
+    :param indent: The indent of the lines after the first
+    :type indent: int
+    :raises Unsupported: If it's too far past the indent to place
+    :return: The text of the scalar, over one or more lines
+    :rtype: str
+    """
+    # the value of a key, or an item of a sequence, in mappings nested to the indent
+    length = column - indent
+    if length >= SIMPLE_KEY_LENGTH:
+        raise Unsupported(value)
+    obj: Any = {"k" * length: value} if length else [value]
+    for _level in range(indent // 2 - (1 if length else 0)):
+        obj = {"k": obj}
+    text = yaml.dump(obj, default_flow_style=False, Dumper=Dumper, explicit_start=True)
+    # after the --- and a line for each mapping it's nested in
+    before = indent // 2 if length else indent // 2 + 1
+    return text[:-1].split("\n", before)[-1][column:]
+
+
+class YamlColorizer:
+    # pylint: disable=too-few-public-methods
+    """Serialize an obj like yaml.dump, with default_flow_style=False,
+    explicit_start=True and sort_keys=True, into colored lines"""
+
+    def __init__(self, colors: Dict[str, Union[Tuple[int, int, int], None]]) -> None:
+        """start
+
+        :param colors: The color for each of YAML_SCOPES
+        :type colors: dict
+        """
+        self._lines = ColoredLines(colors)
+        self._style: Union[_ScalarStyle, None] = None
+        self._seen: Set[int] = set()
+
+    def serialize(self, obj: Any) -> List[List[Dict]]:
+        """Serialize an obj
+
+        :param obj: A dict or list
+        :type obj: dict or list
+        :raises Unsupported: If it can't be serialized here
+        :return: The colored lines
+        :rtype: list
+        """
+        if type(obj) not in (dict, list) or not obj:
+            # a scalar or flow collection follows the ---
+            raise Unsupported(type(obj))
+        self._lines.add("---", "document")
+        self._lines.end()
+        self._value(obj, 0, top=True)
+        self._lines.end()
+        return self._lines.lines
+
+    def _collection(self, obj: Any) -> bool:
+        """Is an obj a non-empty collection, shown as a block
+
+        :param obj: The obj
+        :type obj: Any
+        :raises Unsupported: If it was seen before, it would be an alias
+        :return: True if it's a dict or list with something in it
+        :rtype: bool
+        """
+        if type(obj) not in (dict, list):
+            return False
+        if id(obj) in self._seen:
+            raise Unsupported("alias")
+        self._seen.add(id(obj))
+        return bool(obj)
+
+    def _newline(self, indent: int) -> None:
+        """Start a new line, indented
+
+        :param indent: The indent
+        :type indent: int
+        """
+        self._lines.end()
+        self._lines.add(" " * indent)
+
+    def _value(self, obj: Any, indent: int, top: bool = False) -> None:
+        """Write the value of a mapping, on the lines after the key if a block
+
+        :param obj: The value
+        :type obj: Any
+        :param indent: The indent of the mapping
+        :type indent: int
+        :param top: Is this the document, rather than a value
+        :type top: bool
+        """
+        if not self._collection(obj):
+            self._lines.add(" ")
+            self._scalar(obj, indent + 2)
+        elif isinstance(obj, dict):
+            self._mapping(obj, indent if top else indent + 2, inline=top)
+        else:
+            # a sequence in a mapping isn't indented
+            self._sequence(obj, indent, inline=top)
+
+    def _mapping(self, obj: Dict, indent: int, inline: bool) -> None:
+        """Write a block mapping
+
+        :param obj: The mapping
+        :type obj: dict
+        :param indent: The indent of its keys
+        :type indent: int
+        :param inline: Is the first key on the current line
+        :type inline: bool
+        """
+        items = list(obj.items())
+        try:
+            items = sorted(items)
+        except TypeError:
+            pass
+        for key, value in items:
+            if not inline:
+                self._newline(indent)
+            inline = False
+            self._scalar(key, indent + 2, key=True)
+            self._lines.add(":", "separator")
+            self._value(value, indent)
+
+    def _sequence(self, obj: List, indent: int, inline: bool) -> None:
+        """Write a block sequence
+
+        :param obj: The sequence
+        :type obj: list
+        :param indent: The indent of its items
+        :type indent: int
+        :param inline: Is the first item on the current line
+        :type inline: bool
+        """
+        for item in obj:
+            if not inline:
+                self._newline(indent)
+            inline = False
+            self._lines.add("-", "item")
+            self._lines.add(" ")
+            if not self._collection(item):
+                self._scalar(item, indent + 2)
+            elif isinstance(item, dict):
+                self._mapping(item, indent + 2, inline=True)
+            else:
+                self._sequence(item, indent + 2, inline=True)
+
+    def _scalar(self, obj: Any, indent: int, key: bool = False) -> None:
+        """Write a scalar, or an empty collection
+
+        :param obj: The scalar
+        :type obj: Any
+        :param indent: The indent of any lines after the first
+        :type indent: int
+        :param key: Is it a key
+        :type key: bool
+        :raises Unsupported: If it's not a type yaml has a plain tag for
+        """
+        kind = type(obj)
+        add = self._lines.add
+        if kind is str:
+            self._str(obj, indent, key)
+        elif obj is None:
+            add("null", "null")
+        elif kind is bool:
+            add("true" if obj else "false", "bool")
+        elif kind is int:
+            self._number(str(obj), "int", key)
+        elif kind is float:
+            self._number(_yaml_float(obj), "float", key)
+        elif kind is dict and not key:
+            add("{", "{")
+            add("}", "}")
+        elif kind is list and not key:
+            add("[", "[")
+            add("]", "]")
+        else:
+            raise Unsupported(kind)
+
+    def _number(self, text: str, kind: str, key: bool) -> None:
+        """Write an int or float
+
+        :param text: The number as yaml writes it
+        :type text: str
+        :param kind: int or float
+        :type kind: str
+        :param key: Is it a key
+        :type key: bool
+        :raises Unsupported: If it's a key that would be written as ? key
+        """
+        if key and len(text) >= SIMPLE_KEY_LENGTH:
+            raise Unsupported(text)
+        self._lines.add(text, kind)
+
+    def _str(self, value: str, indent: int, key: bool) -> None:
+        """Write a str, plain, quoted or over several lines, as the emitter would
+
+        :param value: The str
+        :type value: str
+        :param indent: The indent of any lines after the first
+        :type indent: int
+        :param key: Is it a key
+        :type key: bool
+        :raises Unsupported: If it's a key that would be written as ? key
+        """
+        if key and len(value) >= SIMPLE_KEY_LENGTH:
+            # written as ? key
+            raise Unsupported(value)
+        column = self._lines.column
+        if _plain(value) and (key or " " not in value or column + len(value) <= YAML_WIDTH):
+            self._lines.add(value, "key" if key else "plain")
+            return
+        if self._style is None:
+            self._style = _ScalarStyle()
+        style, multiline = self._style.choose(value, key)
+        if key and style == '"':
+            raise Unsupported(value)
+        text = "'" + value.replace("'", "''") + "'" if style == "'" else value
+        if not key and (style == '"' or multiline or column + len(text) > YAML_WIDTH):
+            text = _dumped_scalar(value, column, indent)
+            style = text[0] if text[0] in "'\"" else ""
+        self._scalar_lines(text, style, key)
+
+    def _scalar_lines(self, text: str, style: str, key: bool) -> None:
+        """Write the text of a str, over one or more lines
+
+        :param text: The text, quoted if the style is
+        :type text: str
+        :param style: The style, "" for plain
+        :type style: str
+        :param key: Is it a key
+        :type key: bool
+        """
+        lines = self._lines
+        text_lines = text.split("\n")
+        if not style:
+            lines.add(text_lines[0], "key" if key else "plain")
+            for line in text_lines[1:]:
+                lines.end()
+                stripped = line.lstrip(" ")
+                lines.add(line[: len(line) - len(stripped)])
+                lines.add(stripped, "plain")
+            return
+
+        escapes = SINGLE_ESCAPE_RE if style == "'" else YAML_ESCAPE_RE
+        last = len(text_lines) - 1
+        for idx, line in enumerate(text_lines):
+            if idx:
+                lines.end()
+            else:
+                lines.add(line[0], style + "begin")
+                line = line[1:]
+            if idx == last:
+                lines.add_quoted(line[:-1], style, escapes, style)
+                lines.add(line[-1], style + "end")
+            else:
+                lines.add_quoted(line, style, escapes, style)
+
+
+class JsonColorizer:
+    # pylint: disable=too-few-public-methods
+    """Serialize an obj like json.dumps, with indent=4 and sort_keys=True,
+    into colored lines"""
+
+    def __init__(self, colors: Dict[str, Union[Tuple[int, int, int], None]]) -> None:
+        """start
+
+        :param colors: The color for each of JSON_SCOPES
+        :type colors: dict
+        """
+        self._lines = ColoredLines(colors)
+        self._markers: Set[int] = set()
+
+    def serialize(self, obj: Any) -> List[List[Dict]]:
+        """Serialize an obj
+
+        :param obj: The obj
+        :type obj: Any
+        :raises Unsupported: If it can't be serialized here
+        :return: The colored lines
+        :rtype: list
+        """
+        self._value(obj, 0)
+        self._lines.end()
+        return self._lines.lines
+
+    def _value(self, obj: Any, level: int) -> None:
+        """Write a value, in the order json checks the types
+
+        :param obj: The value
+        :type obj: Any
+        :param level: The depth of the value
+        :type level: int
+        :raises Unsupported: If it's not a type json can serialize, or a float
+            json would write as NaN or Infinity
+        """
+        add = self._lines.add
+        if isinstance(obj, str):
+            self._str(obj, '"', "")
+        elif obj is None:
+            add("null", "constant")
+        elif obj is True:
+            add("true", "constant")
+        elif obj is False:
+            add("false", "constant")
+        elif isinstance(obj, int):
+            add(int.__repr__(obj), "number")
+        elif isinstance(obj, float):
+            if not math.isfinite(obj):
+                raise Unsupported(obj)
+            add(float.__repr__(obj), "number")
+        elif isinstance(obj, (list, tuple)):
+            self._container(obj, level, "[", "]", self._array_items)
+        elif isinstance(obj, dict):
+            self._container(obj, level, "{", "}", self._object_items)
+        else:
+            raise Unsupported(type(obj))
+
+    def _container(
+        self, obj: Any, level: int, begin: str, end: str, items: Callable[[Any, int], None]
+    ) -> None:
+        """Write an array or object
+
+        :param obj: The list or dict
+        :type obj: list or dict
+        :param level: The depth of the container
+        :type level: int
+        :param begin: The bracket it begins with
+        :type begin: str
+        :param end: The bracket it ends with
+        :type end: str
+        :param items: Write the items
+        :type items: callable
+        :raises Unsupported: If it contains itself
+        """
+        add = self._lines.add
+        add(begin, begin)
+        if obj:
+            if id(obj) in self._markers:
+                raise Unsupported("circular reference")
+            self._markers.add(id(obj))
+            items(obj, level + 1)
+            self._markers.discard(id(obj))
+            self._lines.end()
+            add(" " * (4 * level))
+        add(end, end)
+
+    def _array_items(self, obj: Any, level: int) -> None:
+        """Write the items of an array, each on a line
+
+        :param obj: The list
+        :type obj: list or tuple
+        :param level: The depth of the items
+        :type level: int
+        """
+        for idx, item in enumerate(obj):
+            if idx:
+                self._lines.add(",", "item,")
+            self._lines.end()
+            self._lines.add(" " * (4 * level))
+            self._value(item, level)
+
+    def _object_items(self, obj: Dict, level: int) -> None:
+        """Write the members of an object, each on a line
+
+        :param obj: The dict
+        :type obj: dict
+        :param level: The depth of the members
+        :type level: int
+        :raises Unsupported: If the keys can't be sorted, json would raise
+        """
+        try:
+            items = sorted(obj.items())
+        except TypeError as exc:
+            raise Unsupported("keys") from exc
+        add = self._lines.add
+        for idx, (key, value) in enumerate(items):
+            if idx:
+                add(",", ",")
+            self._lines.end()
+            add(" " * (4 * level))
+            self._str(_json_key(key), "key", "key")
+            add(":", ":")
+            add(" ")
+            self._value(value, level)
+
+    def _str(self, value: str, kind: str, prefix: str) -> None:
+        """Write a string, quoted and escaped
+
+        :param value: The string
+        :type value: str
+        :param kind: The kind of string, key or a value
+        :type kind: str
+        :param prefix: The prefix of the kinds for its quotes and escapes
+        :type prefix: str
+        """
+        encoded = json.encoder.encode_basestring_ascii(value)  # type: ignore[attr-defined]
+        begin, end = (prefix or '"') + "begin", (prefix or '"') + "end"
+        self._lines.add('"', begin)
+        self._lines.add_quoted(encoded[1:-1], kind, JSON_ESCAPE_RE, prefix or '"')
+        self._lines.add('"', end)
+
+
+def _json_key(key: Any) -> str:
+    """Convert a key to a string, as json does
+
+    :param key: The key
+    :type key: Any
+    :raises Unsupported: If json can't use it as a key
+    :return: The key as a string
+    :rtype: str
+    """
+    if isinstance(key, str):
+        return key
+    if isinstance(key, float):
+        if not math.isfinite(key):
+            raise Unsupported(key)
+        return float.__repr__(key)
+    if key is True:
+        return "true"
+    if key is False:
+        return "false"
+    if key is None:
+        return "null"
+    if isinstance(key, int):
+        return int.__repr__(key)
+    raise Unsupported(type(key))
+
+
+def _yaml_float(value: float) -> str:
+    """Represent a float, as the yaml representer does
+
+    :param value: The float
+    :type value: float
+    :return: The scalar
+    :rtype: str
+    """
+    if math.isnan(value):
+        return ".nan"
+    if value == float("inf"):
+        return ".inf"
+    if value == float("-inf"):
+        return "-.inf"
+    text = repr(value).lower()
+    if "." not in text and "e" in text:
+        text = text.replace("e", ".0e", 1)
+    return text
+
+
+def serialize(obj: Any, scope: str, get_color: Callable) -> Union[List[List[Dict]], None]:
+    """Serialize an obj as yaml or json and color it
+
+    :param obj: The obj
+    :type obj: Any
+    :param scope: source.yaml or source.json
+    :type scope: str
+    :param get_color: Find the color of a scope, from the ColorSchema
+    :type get_color: callable
+    :return: The colored lines, None if it can't be serialized here
+    :rtype: list or None
+    """
+    colorizer: Union[YamlColorizer, JsonColorizer]
+    if scope == "source.yaml":
+        colorizer = YamlColorizer({kind: get_color(scp) for kind, scp in YAML_SCOPES.items()})
+    elif scope == "source.json":
+        colorizer = JsonColorizer({kind: get_color(scp) for kind, scp in JSON_SCOPES.items()})
+    else:
+        return None
+    try:
+        return colorizer.serialize(obj)
+    except (Unsupported, RecursionError):
+        return None
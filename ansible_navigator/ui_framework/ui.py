@@ -2,20 +2,24 @@
 """
 
 # pylint: disable=too-many-lines
+import contextlib
 import curses
+import functools
 import json
 import logging
 
 import os
 import re
+import threading
 
 from curses import ascii as curses_ascii
 
-from functools import lru_cache
 from math import ceil, floor
 from typing import Any
 from typing import Callable
 from typing import Dict
+from typing import Iterable
+from typing import Iterator
 from typing import List
 from typing import Match
 from typing import NamedTuple
@@ -24,12 +28,21 @@ from typing import Tuple
 from typing import Union
 
 from .colorize import Colorize
+from .colorize import Document
+from .colorize import TailDocument
 from .colorize import rgb_to_ansi  # , hex_to_rgb_curses
+from .content_cache import ContentCache
+from .content_cache import Skipped
+from .content_search import ContentSearch
 
 
 from .curses_defs import CursesLine
 from .curses_defs import CursesLinePart
+from .curses_defs import CursesLineRun
 from .curses_defs import CursesLines
+from .curses_defs import CursesLineStore
+from .curses_defs import LazyLineStore
+from .curses_defs import WindowLineStore
 
 from .curses_window import CursesWindow
 from .curses_window import Window
@@ -38,7 +51,14 @@ from .form import Form
 from .field_text import FieldText
 from .form_handler_text import FormHandlerText
 from .menu_builder import MenuBuilder
-
+from .menu_builder import MenuLineCache
+from .menu_filter import MenuFilterCache
+from .menu_layout import MenuLayoutCache
+from .menu_layout import column_layout
+from .utils import row_version
+
+from ..stats import STATS
+from ..stats import lru_cache_info
 from ..yaml import yaml, Dumper
 
 STND_KEYS = {
@@ -50,6 +70,11 @@ STND_KEYS = {
 END_KEYS = {
     ":help": "help",
 }
+NAVIGATION_KEYS = ["KEY_DOWN", "KEY_UP", "KEY_NPAGE", "KEY_PPAGE", "^F", "^B"]
+# lines tokenized at a time in the background, between them the lock is free for the screen
+IDLE_TOKENIZE_LINES = 200
+# and when prefetching, which stops early if the screen is waiting
+PREFETCH_TOKENIZE_LINES = 10
 
 # pylint: disable=inherit-non-class
 # pylint: disable=too-few-public-methods
@@ -68,6 +93,12 @@ class Content(NamedTuple):
     showing: Any
 
 
+class Tail(NamedTuple):
+    """lines of text as they're added to, eg a log, shown without joining them"""
+
+    lines: List[str]
+
+
 class Menu(NamedTuple):
     """details about the currently showing menu"""
 
@@ -126,7 +157,19 @@ class UserInterface(CursesWindow):
         super().__init__()
         self._color_menu_item: Callable[[int, str, Dict[str, Any]], int]
         self._colorizer = Colorize(share_dir=share_dir)
+        # the tokenizer's regexes can't be searched from two threads at once
+        self._colorizer_lock = threading.Lock()
+        # the screen is waiting for the colorizer, or the ui was closed, prefetches give way
+        self._colorizer_wanted = 0
+        self._closed = False
+        self._content_cache = ContentCache()
+        self._content_search: Union[ContentSearch, None] = None
+        self._content_searched: Any = None
+        self._content_step = 0
+        # what the neighbours were last prefetched for
+        self._prefetched_for: Union[Tuple, None] = None
         self._content_heading: Callable[[Any, int], Union[CursesLines, None]]
+        self._content_idle: Union[threading.Event, None] = None
         self._default_colors = None
         self._default_pairs = None
         self._default_obj_serialization = "source.yaml"
@@ -135,13 +178,18 @@ class UserInterface(CursesWindow):
         self._kegexes = kegexes
         self._logger = logging.getLogger(__name__)
         self._menu_filter: Union[Pattern, None] = None
+        self._menu_filter_cache = MenuFilterCache()
         self._menu_indicies: Tuple[int, ...] = tuple()
+        self._menu_layout_cache = MenuLayoutCache()
+        self._menu_line_cache = MenuLineCache()
         self._no_osc4 = no_osc4
 
         self._pbar_width = pbar_width
         self._prefix_color = 8
         self._refresh = [refresh]
-        self._rgb_to_curses_color_idx: Dict[str, int] = {}
+        # the curses color pair for each rgb color, filled when the colors are set
+        self._palette: Dict[Union[Tuple[int, int, int], None], int] = {}
+        self._rgb_to_curses_color_idx: Dict[Tuple[int, int, int], int] = {}
         self._screen_miny = screen_miny
         self._scroll = 0
         self._theme_dir = os.path.join(share_dir, "themes")
@@ -154,6 +202,18 @@ class UserInterface(CursesWindow):
         self._screen: Window = curses.initscr()
         self._screen.timeout(refresh)
         self._one_line_input = FormHandlerText(screen=self._screen)
+        STATS.register_cache("ui.menu_filter", self._menu_filter_cache.cache_info)
+        STATS.register_cache("ui.menu_layout", self._menu_layout_cache.cache_info)
+        STATS.register_cache("ui.column_layout", lru_cache_info(column_layout))
+        STATS.register_cache("ui.menu_lines", self._menu_line_cache.cache_info)
+        STATS.register_cache("ui.content", self._content_cache.cache_info)
+
+    def close(self) -> None:
+        """Stop anything still running in the background, before exiting"""
+        self._closed = True
+        self._tokenize_rest(None)
+        self._end_search()
+        self._content_cache.shutdown()
 
     def clear(self) -> None:
         """ clear the screen"""
@@ -328,15 +388,17 @@ class UserInterface(CursesWindow):
                 line=tuple([line_part]),
             )
 
-    def _get_input_line(self) -> str:
+    def _get_input_line(self, prompt: str = ":") -> str:
         """get one line of input from the user
 
+        :param prompt: shown before the input
+        :type prompt: str
         :return: the lines
         :rtype: str
         """
         self.disable_refresh()
         form_field = FieldText(name="one_line", prompt="")
-        clp = CursesLinePart(column=0, string=":", color=curses.color_pair(0), decoration=0)
+        clp = CursesLinePart(column=0, string=prompt, color=curses.color_pair(0), decoration=0)
         input_at = self._screen_h - 1  # screen y is zero based
         self._add_line(window=self._screen, lineno=input_at, line=tuple([clp]))
         self._screen.refresh()
@@ -363,6 +425,7 @@ class UserInterface(CursesWindow):
         key_dict: dict,
         await_input: bool,
         count: int,
+        searchable: bool = False,
     ) -> str:
         # pylint: disable=too-many-branches
         # pylint: disable=too-many-locals
@@ -377,6 +440,8 @@ class UserInterface(CursesWindow):
         :type key_dict: dict
         :param await_input: Should we wait for a key
         :type await_input: bool
+        :param searchable: Content is showing, so the search keys are valid
+        :type searchable: bool
         :return: the key pressed
         :rtype: str
         """
@@ -393,31 +458,34 @@ class UserInterface(CursesWindow):
 
         keypad = set(str(x) for x in range(0, 10))
         other_valid_keys = ["+", "-", "_", "KEY_F(5)", "^[", "\x1b"]
+        if searchable:
+            other_valid_keys += ["/", "n", "N"]
 
         while True:
-            self._screen.erase()
-            prefix = " " * (index_width + len("|")) if indent_heading else None
-            for idx, line in enumerate(heading):
-                self._add_line(window=self._screen, lineno=idx, line=line, prefix=prefix)
-            self._add_line(window=self._screen, lineno=footer_at, line=footer)
-
-            for idx, line in enumerate(lines):
-                line_index = line_numbers[idx]
-                prefix = "{idx}\u2502".format(idx=str(line_index).rjust(index_width))
-                self._add_line(
-                    window=self._screen, lineno=idx + len(heading), line=line, prefix=prefix
-                )
+            with STATS.timer("ui.draw"):
+                self._screen.erase()
+                prefix = " " * (index_width + len("|")) if indent_heading else None
+                for idx, line in enumerate(heading):
+                    self._add_line(window=self._screen, lineno=idx, line=line, prefix=prefix)
+                self._add_line(window=self._screen, lineno=footer_at, line=footer)
+
+                for idx, line in enumerate(lines):
+                    line_index = line_numbers[idx]
+                    prefix = "{idx}\u2502".format(idx=str(line_index).rjust(index_width))
+                    self._add_line(
+                        window=self._screen, lineno=idx + len(heading), line=line, prefix=prefix
+                    )
 
-            if count > viewport_h:
-                self._scroll_bar(
-                    viewport_h=viewport_h,
-                    len_heading=len(heading),
-                    menu_size=count,
-                    body_start=self._scroll - viewport_h,
-                    body_stop=self._scroll,
-                )
+                if count > viewport_h:
+                    self._scroll_bar(
+                        viewport_h=viewport_h,
+                        len_heading=len(heading),
+                        menu_size=count,
+                        body_start=self._scroll - viewport_h,
+                        body_stop=self._scroll,
+                    )
 
-            self._screen.refresh()
+                self._screen.refresh()
 
             if await_input:
                 char = self._screen.getch()
@@ -435,17 +503,10 @@ class UserInterface(CursesWindow):
                 return_value = key
             elif key in keypad or key in other_valid_keys:
                 return_value = key
-            elif key == "KEY_DOWN":
-                self.scroll(max(min(self.scroll() + 1, count), viewport_h))
-                return_value = key
-            elif key == "KEY_UP":
-                self.scroll(max(self.scroll() - 1, viewport_h))
-                return_value = key
-            elif key in ["^F", "KEY_NPAGE"]:
-                self.scroll(max(min(self.scroll() + viewport_h, count), viewport_h))
-                return_value = key
-            elif key in ["^B", "KEY_PPAGE"]:
-                self.scroll(max(self.scroll() - viewport_h, viewport_h))
+            elif key in NAVIGATION_KEYS:
+                # keys held down queue up, move for all of them then show one frame
+                for navigation_key in [key] + self._pending_navigation_keys():
+                    self._navigate(navigation_key, viewport_h, count)
                 return_value = key
             elif key == ":":
                 colon_entry = self._get_input_line()
@@ -456,6 +517,50 @@ class UserInterface(CursesWindow):
             if return_value is not None:
                 return return_value
 
+    def _navigate(self, key: str, viewport_h: int, count: int) -> None:
+        """Scroll for one navigation key
+
+        :param key: The key pressed
+        :type key: str
+        :param viewport_h: The height of the body
+        :type viewport_h: int
+        :param count: The number of lines or menu entries
+        :type count: int
+        """
+        if key == "KEY_DOWN":
+            self.scroll(max(min(self.scroll() + 1, count), viewport_h))
+        elif key == "KEY_UP":
+            self.scroll(max(self.scroll() - 1, viewport_h))
+        elif key in ["^F", "KEY_NPAGE"]:
+            self.scroll(max(min(self.scroll() + viewport_h, count), viewport_h))
+        elif key in ["^B", "KEY_PPAGE"]:
+            self.scroll(max(self.scroll() - viewport_h, viewport_h))
+
+    def _pending_navigation_keys(self) -> List[str]:
+        """Take the navigation keys already waiting, without waiting for more.
+        The first key that isn't for navigation is put back for next time.
+
+        :return: The navigation keys
+        :rtype: list of str
+        """
+        keys = []
+        self._screen.nodelay(True)
+        try:
+            while True:
+                char = self._screen.getch()
+                if char == -1:
+                    break
+                key = curses.keyname(char).decode()
+                if key not in NAVIGATION_KEYS:
+                    curses.ungetch(char)
+                    break
+                keys.append(key)
+        finally:
+            self._screen.nodelay(False)
+            self._screen.timeout(self._refresh[-1])
+        STATS.gauge("ui.key_batch", len(keys) + 1)
+        return keys
+
     def _action_match(self, entry: str) -> Union[Tuple[str, Action], Tuple[None, None]]:
         """attempt to match the user input against the regexes
         provided by each action
@@ -471,131 +576,455 @@ class UserInterface(CursesWindow):
                 return kegex.name, Action(match=match, value=entry)
         return None, None
 
-    def _serialize_color(self, obj: Any) -> CursesLines:
-        """Serialize, if neccesary and color an obj
+    @contextlib.contextmanager
+    def _colorizer_held(self, background: bool) -> Iterator[None]:
+        """Hold the colorizer, the screen before any prefetch
 
-        :param obj: the object to color
+        :param background: Is it for a prefetch
+        :type background: bool
+        :raises Skipped: For a prefetch, if the screen is waiting or the ui was closed
+        """
+        if background:
+            if self._colorizer_wanted or self._closed:
+                raise Skipped()
+            with self._colorizer_lock:
+                yield
+            return
+        self._colorizer_wanted += 1
+        try:
+            with self._colorizer_lock:
+                yield
+        finally:
+            self._colorizer_wanted -= 1
+
+    def _render_content(
+        self, obj: Any, xform: str, filter_keys: Union[Callable, None], background: bool = False
+    ) -> List:
+        """Filter, serialize and tokenize an obj, this is also run in
+        the prefetch threads so only uses what's passed and the colorizer
+
+        :param obj: the object to render
         :type obj: Any
+        :param xform: the xform to serialize with
+        :type xform: str
+        :param filter_keys: filter the keys of a dict, if they are hidden
+        :type filter_keys: callable or None
+        :param background: Is it a prefetch, that gives way to the screen
+        :type background: bool
+        :raises Skipped: For a prefetch that gave way, it's rendered when shown
+        :return: The lines from the colorizer
+        :rtype: list
+        """
+        if isinstance(obj, Tail):
+            with self._colorizer_held(background):
+                return self._colorizer.tail(source=obj.lines, scope=xform)
+        if filter_keys is not None and isinstance(obj, dict):
+            obj = filter_keys(obj)
+        if xform in ("source.yaml", "source.json"):
+            # colored as it's serialized, unless it needs the grammar
+            with STATS.timer("ui.serialize"):
+                lines = self._colorizer.serialize(obj=obj, scope=xform)
+            if lines is not None:
+                return lines
+        if xform == "source.ansi":
+            string = obj
+        else:
+            with STATS.timer("ui.serialize"):
+                if xform == "source.yaml":
+                    string = yaml.dump(
+                        obj,
+                        default_flow_style=False,
+                        Dumper=Dumper,
+                        explicit_start=True,
+                        sort_keys=True,
+                    )
+                elif xform == "source.json":
+                    string = json.dumps(obj, indent=4, sort_keys=True)
+                else:
+                    string = obj
+        return self._colorize_string(string, xform, background)
+
+    def _colorize_string(self, string: str, xform: str, background: bool) -> Any:
+        """Tokenize and color a serialized obj, a document is only tokenized
+        as far as the screen, the rest as it's shown
+
+        :param string: the serialized obj
+        :type string: str
+        :param xform: the xform it was serialized with
+        :type xform: str
+        :param background: Is it a prefetch, that gives way to the screen
+        :type background: bool
+        :return: The lines or document from the colorizer
+        :rtype: list or Document
+        """
+        with self._colorizer_held(background):
+            with STATS.timer("ui.colorize"):
+                if xform == "source.ansi":
+                    return self._colorizer.render(doc=string, scope=xform)
+                document = self._colorizer.document(doc=string, scope=xform)
+                if document is None:
+                    return self._colorizer.render(doc=string, scope=xform)
+                # the rest is tokenized as it's shown, or when idle
+                if not background:
+                    document.tokenize_to(self._screen_h)
+                    return document
+                # a few lines at a time, stopping if the screen is waiting
+                tokenized = 0
+                while tokenized < self._screen_h and not (self._colorizer_wanted or self._closed):
+                    tokenized += PREFETCH_TOKENIZE_LINES
+                    document.tokenize_to(tokenized)
+                return document
+
+    def _finish_content(
+        self, colorized: Union[List, Document, TailDocument], xform: str
+    ) -> CursesLineStore:
+        """Make the lines for curses from the colorized lines
+
+        :param colorized: the lines or document from the colorizer
+        :type colorized: list, Document or TailDocument
+        :param xform: the xform the lines were serialized with
+        :type xform: str
         :return: The generated lines
-        :rtype: CursesLines
+        :rtype: CursesLineStore
+        """
+        if isinstance(colorized, Document):
+            return LazyLineStore(colorized, functools.partial(self._fill_lines, colorized))
+        if isinstance(colorized, TailDocument):
+            # only the lines around those showing, eg the end of a log
+            return WindowLineStore(colorized, functools.partial(self._fill_lines, colorized))
+        if xform == "source.ansi":
+            return CursesLineStore(colorized)
+        with STATS.timer("ui.color_lines"):
+            return self._color_lines_for_term(colorized)
+
+    def _content_renderer(
+        self, background: bool = False
+    ) -> Tuple[Callable[[Any], Any], Callable[[Any], Any]]:
+        """The render and key functions for content, given the current
+        xform and hidden keys
+
+        :param background: Render for a prefetch, that gives way to the screen
+        :type background: bool
+        :return: The render function and the key function
+        :rtype: callable, callable
         """
-        if self.xform() == "source.ansi":
-            return self._colorizer.render(doc=obj, scope=self.xform())
-        if self.xform() == "source.yaml":
-            string = yaml.dump(
-                obj, default_flow_style=False, Dumper=Dumper, explicit_start=True, sort_keys=True
+        filter_keys = self._filter_content_keys if self._hide_keys else None
+        render = functools.partial(
+            self._render_content,
+            xform=self.xform(),
+            filter_keys=filter_keys,
+            background=background,
+        )
+        xform = self.xform()
+
+        def key(obj: Any) -> Any:
+            if isinstance(obj, Tail):
+                # the same lines as they grow, the cache holds them so the id isn't reused
+                return (id(obj.lines), xform)
+            return self._content_cache.key(obj, xform, filter_keys)
+
+        return render, key
+
+    def _fill_lines(
+        self, document: Union[Document, TailDocument], start: int, stop: int
+    ) -> Iterable[Tuple[str, Iterable[CursesLineRun]]]:
+        """Color some lines of a document for the terminal, as they're shown
+
+        :param document: The document from the colorizer
+        :type document: Document or TailDocument
+        :param start: The first line
+        :type start: int
+        :param stop: The line to stop before
+        :type stop: int
+        :return: The string and runs of each line
+        :rtype: list of tuples
+        """
+        with self._colorizer_held(background=False):
+            with STATS.timer("ui.colorize"):
+                lines = document.colored_lines(start, stop)
+        with STATS.timer("ui.color_lines"):
+            return list(self._line_runs(lines))
+
+    def _tokenize_rest(self, lines: Union[CursesLineStore, None]) -> None:
+        """Tokenize the rest of the content being shown in the background,
+        so it's ready to scroll to. Anything from earlier content is stopped.
+
+        :param lines: The lines being shown, None if nothing is
+        :type lines: CursesLineStore or None
+        """
+        if self._content_idle is not None:
+            self._content_idle.set()
+            self._content_idle = None
+        document = getattr(lines, "texts", None)
+        if not isinstance(document, Document) or document.complete:
+            return
+
+        stop = threading.Event()
+
+        def tokenize() -> None:
+            while not stop.is_set() and not document.complete:
+                with self._colorizer_lock:
+                    document.tokenize_to(len(document.colored) + IDLE_TOKENIZE_LINES)
+
+        threading.Thread(target=tokenize, name="tokenize", daemon=True).start()
+        self._content_idle = stop
+
+    def _set_colors(self) -> None:
+        """Set the colors for curses, then map each of the theme's colors
+        to a curses color pair once, rather than for each line part shown
+        """
+        super()._set_colors()
+        self._palette = {None: curses.color_pair(0)}
+        for color in sorted(self._colorizer.theme_colors()):
+            self._palette_color(color)
+
+    def _palette_color(self, color: Tuple[int, int, int]) -> int:
+        """Add an rgb color to the palette, with custom colors a curses color is
+        made for it, otherwise it's mapped to the closest terminal color
+
+        :param color: The rgb color
+        :type color: tuple
+        :return: the curses color pair
+        :rtype: int
+        """
+        red, green, blue = color
+        if self._custom_colors_enabled:
+            # start custom colors at 16
+            if not self._rgb_to_curses_color_idx:
+                curses_colors_idx = 16
+            else:
+                curses_colors_idx = max(self._rgb_to_curses_color_idx.values()) + 1
+            self._rgb_to_curses_color_idx[color] = curses_colors_idx
+            scale = 1000 / 255
+            curses.init_color(
+                curses_colors_idx, int(red * scale), int(green * scale), int(blue * scale)
+            )
+            self._logger.debug(
+                "Added color: %s:%s",
+                curses_colors_idx,
+                curses.color_content(curses_colors_idx),
             )
-        elif self.xform() == "source.json":
-            string = json.dumps(obj, indent=4, sort_keys=True)
+            curses.init_pair(curses_colors_idx, curses_colors_idx, -1)
         else:
-            string = obj
-        colorized = self._colorizer.render(doc=string, scope=self.xform())
-        lines = self._color_lines_for_term(colorized)
-        return lines
+            curses_colors_idx = rgb_to_ansi(red, green, blue, self._number_colors)
+        pair = self._palette[color] = curses.color_pair(curses_colors_idx)
+        return pair
 
-    def _color_lines_for_term(self, lines: List) -> CursesLines:
+    def _color_lines_for_term(self, lines: List) -> CursesLineStore:
         """Give a list of dicts from tokenized lines
         transform them into lines for curses
-        add colors as needed, maintain a mapping of rgb colors
-        to curses colors in self._rgb_to_curses_color_idx
 
         :params lines: the lines to transform
         :type lines: list of lists of dicts
             Lines[LinePart[{"color": rgb, "chars": text, "column": n},...]]
         :return: the lines ready for curses
-        :type: CursesLines
+        :type: CursesLineStore
         """
-        if self._custom_colors_enabled:
-            unique_colors = list(
-                set(chars["color"] for line in lines for chars in line if chars["color"])
-            )
-            # start custom colors at 16
-            for color in unique_colors:
-                scale = 1000 / 255
-                red, green, blue = color
-                if color not in self._rgb_to_curses_color_idx:
-                    if not self._rgb_to_curses_color_idx:
-                        curses_colors_idx = 16
-                    else:
-                        curses_colors_idx = max(self._rgb_to_curses_color_idx.values()) + 1
-
-                    self._rgb_to_curses_color_idx[color] = curses_colors_idx
-                    curses.init_color(
-                        curses_colors_idx, int(red * scale), int(green * scale), int(blue * scale)
-                    )
-                    self._logger.debug(
-                        "Added color: %s:%s",
-                        curses_colors_idx,
-                        curses.color_content(curses_colors_idx),
-                    )
-                    curses.init_pair(curses_colors_idx, curses_colors_idx, -1)
         colored_lines = self._colored_lines(lines)
         return colored_lines
 
-    def _colored_lines(self, lines: List[List[Dict]]) -> CursesLines:
+    def _colored_lines(self, lines: List[List[Dict]]) -> CursesLineStore:
         """color each of the lines
 
         :params lines: the lines to transform
         :type lines: list of lists of dicts
             Lines[LinePart[{"color": rgb, "chars": text, "column": n},...]]
         :return: all the lines
-        :rtype: CursesLines
+        :rtype: CursesLineStore
         """
-        return tuple(self._colored_line(line) for line in lines)
+        store = CursesLineStore()
+        for string, runs in self._line_runs(lines):
+            store.append_runs(string, runs)
+        return store
 
-    def _colored_line(self, line: List[Dict]) -> CursesLine:
-        """color one line
+    def _line_runs(self, lines: List[List[Dict]]) -> Iterator[Tuple[str, Iterator[CursesLineRun]]]:
+        """The string and runs of each line
 
-        :param line: the line to transform
-        :type line: lists of dicts
-            LinePart[{"color": rgb, "chars": text, "column": n},...]
-        :return one colored line:
-        :rtype: CursesLine
+        :params lines: the lines to transform
+        :type lines: list of lists of dicts
+        :return: The string and runs of each line
+        :rtype: An iterator of tuples
         """
-        return tuple(self._colored_line_part(line_part) for line_part in line)
+        palette = self._palette
+        for line in lines:
+            yield "".join(lp_dict["chars"] for lp_dict in line), (
+                (
+                    lp_dict["column"],
+                    len(lp_dict["chars"]),
+                    palette[lp_dict["color"]]
+                    if lp_dict["color"] in palette
+                    else self._curses_color(lp_dict),
+                    0,
+                )
+                for lp_dict in line
+            )
 
-    def _colored_line_part(self, lp_dict: Dict) -> CursesLinePart:
-        """color one linepart
+    def _curses_color(self, lp_dict: Dict) -> int:
+        """get the curses color for one linepart
 
         :param lp_dict: a dict describing the line part
         :type lp_dict: dict {"color": rgb, "chars": text, "column": n}
-        :return: the colored line part
-        :rtype: CursesLinePart
+        :return: the curses color pair
+        :rtype: int
         """
-        if lp_dict["color"]:
-            if self._custom_colors_enabled:
-                color = self._rgb_to_curses_color_idx[lp_dict["color"]]
-            else:
-                red, green, blue = lp_dict["color"]
-                color = rgb_to_ansi(red, green, blue, self._number_colors)
-        else:
-            color = 0
-        return CursesLinePart(
-            column=lp_dict["column"],
-            string=lp_dict["chars"],
-            color=curses.color_pair(color),
-            decoration=0,
-        )
+        color = self._palette.get(lp_dict["color"])
+        if color is None:
+            # not one of the theme's colors
+            color = self._palette_color(lp_dict["color"])
+        return color
 
-    def _filter_and_serialize(self, obj: Any) -> Tuple[Union[CursesLines, None], CursesLines]:
+    def _filter_and_serialize(self, obj: Any) -> Tuple[Union[CursesLines, None], CursesLineStore]:
         """filter an obj and serialize
 
         :param obj: the obj to serialize
         :type obj: Any
         :return: the serialize lines ready for display
-        :rtype: CursesLines
+        :rtype: CursesLineStore
         """
         heading = self._content_heading(obj, self._screen_w)
-        filtered_obj = (
-            self._filter_content_keys(obj) if self._hide_keys and isinstance(obj, dict) else obj
-        )
-        lines = self._serialize_color(filtered_obj)
+        if isinstance(obj, CursesLineStore):
+            # already lines for curses, eg stdout as it grows
+            return heading, obj
+        render, key = self._content_renderer()
+        finish = functools.partial(self._finish_content, xform=self.xform())
+        lines = self._content_cache.lines(obj, key(obj), render, finish)
         return heading, lines
 
+    def _neighbour(self, index: int, step: int) -> Union[int, None]:
+        """Find the next or previous entry of the menu, wrapping around
+
+        :param index: The entry being shown
+        :type index: int
+        :param step: 1 for the next, -1 for the previous
+        :type step: int
+        :return: The index of the entry, None if there isn't one
+        :rtype: int or None
+        """
+        less = [i for i in self._menu_indicies if i - index < 0]
+        more = [i for i in self._menu_indicies if i - index > 0]
+        if step > 0:
+            ordered_indicies = more + less
+        else:
+            ordered_indicies = list(reversed(less)) + list(reversed(more))
+        return ordered_indicies[0] if ordered_indicies else None
+
+    def _prefetch_neighbours(self, objs: List[Any], index: int) -> None:
+        """Render the entries either side of the one being shown, and the one
+        after that in the direction last moved, while the user looks at this one.
+        Nothing is done when the same entry, unchanged, is shown again.
+
+        :param objs: A list of one or more object
+        :type objs: A list of Any
+        :param index: The entry being shown
+        :type index: int
+        """
+        obj = objs[index]
+        shown = (
+            id(objs),
+            index,
+            row_version(obj) if isinstance(obj, dict) else None,
+            id(self._menu_indicies),
+            self._content_step,
+            self.xform(),
+            self._hide_keys,
+        )
+        if shown == self._prefetched_for:
+            # only refreshed, eg while a playbook runs
+            return
+        self._prefetched_for = shown
+        step = self._content_step or 1
+        ahead = self._neighbour(index, step)
+        targets = [ahead, self._neighbour(index, -step)]
+        if ahead is not None and self._content_step:
+            targets.insert(1, self._neighbour(ahead, step))
+        render, key = self._content_renderer(background=True)
+        self._content_cache.prefetch(
+            [
+                (objs[target], key(objs[target]))
+                for target in targets
+                if target is not None and target != index and target < len(objs)
+            ],
+            render,
+        )
+
     def _show_form(self, obj: Form) -> Form:
         res = obj.present(screen=self._screen)
         return res
 
+    def _search(self, pattern: str, lines: CursesLineStore) -> Union[ContentSearch, None]:
+        """Start searching the content for a regex, jump to the first match
+
+        :param pattern: The regex, nothing stops searching
+        :type pattern: str
+        :param lines: The lines to search
+        :type lines: CursesLineStore
+        :return: The search
+        :rtype: ContentSearch or None
+        """
+        if self._content_search is not None:
+            self._content_search.cancel()
+        if not pattern:
+            return None
+        try:
+            regex = re.compile(pattern)
+        except re.error as exc:
+            self._logger.error("Regex for search was invalid: %s", pattern)
+            self._logger.exception(exc)
+            return None
+        search = ContentSearch(regex, lines)
+        search.pending = 1
+        return search
+
+    def _end_search(self) -> None:
+        """Stop searching the content, the matches are forgotten"""
+        if self._content_search is not None:
+            self._content_search.cancel()
+        self._content_search = None
+        self._content_searched = None
+
+    @staticmethod
+    def _search_target(obj: Any) -> Any:
+        """The thing a search is for, a tail is shown anew as its lines grow
+
+        :param obj: The object being shown
+        :type obj: Any
+        :return: The object, or a tail's lines
+        :rtype: Any
+        """
+        if isinstance(obj, Tail):
+            return obj.lines
+        return obj
+
+    def _search_jump(
+        self, search: ContentSearch, first: int, last: int, not_body: int, count: int
+    ) -> bool:
+        # pylint: disable=too-many-arguments
+        """Scroll to put the next or previous match at the top
+
+        :param search: The search
+        :type search: ContentSearch
+        :param first: The first line showing
+        :type first: int
+        :param last: The last line showing
+        :type last: int
+        :param not_body: The height of the heading and footer
+        :type not_body: int
+        :param count: The number of lines
+        :type count: int
+        :return: True if scrolled
+        :rtype: bool
+        """
+        match = search.next_match(first, last, search.pending)
+        if match is None:
+            if not search.indexing:
+                # there's nothing to find
+                search.pending = 0
+            return False
+        search.pending = 0
+        viewport_h = self._screen_h - not_body
+        self.scroll(max(min(match + viewport_h, count), viewport_h))
+        return True
+
     def _show_obj_from_list(self, objs: List[Any], index: int, await_input: bool) -> Interaction:
         # pylint: disable=too-many-arguments
         # pylint: disable=too-many-branches
@@ -611,6 +1040,12 @@ class UserInterface(CursesWindow):
         :rtype: Interaction
         """
         heading, lines = self._filter_and_serialize(objs[index])
+        self._tokenize_rest(lines)
+        if len(objs) > 1:
+            self._prefetch_neighbours(objs, index)
+        # a search is kept while the same thing is shown, eg as it is refreshed
+        if self._content_searched is not self._search_target(objs[index]):
+            self._end_search()
         while True:
             if heading is not None:
                 heading_len = len(heading)
@@ -625,6 +1060,15 @@ class UserInterface(CursesWindow):
 
             first_line_idx = max(0, last_line_idx - (self._screen_h - 1 - heading_len - footer_len))
 
+            search = self._content_search
+            if search is not None:
+                if search.lines is not lines:
+                    search = self._content_search = search.restart(lines)
+                if search.pending and self._search_jump(
+                    search, first_line_idx, last_line_idx, heading_len + footer_len, len(lines)
+                ):
+                    continue
+
             if len(objs) > 1:
                 key_dict = {
                     "+": "previous",
@@ -634,18 +1078,36 @@ class UserInterface(CursesWindow):
             else:
                 key_dict = {}
 
+            showing = lines[first_line_idx : last_line_idx + 1]
+            if search is not None:
+                key_dict["n/N"] = "{count}{more} matches".format(
+                    count=len(search.matches), more="+" if search.indexing else ""
+                )
+                showing = search.highlight(showing)
+
             line_numbers = tuple(range(first_line_idx, last_line_idx + 1))
 
             entry = self._display(
-                lines=lines[first_line_idx : last_line_idx + 1],
+                lines=showing,
                 line_numbers=line_numbers,
                 heading=heading,
                 indent_heading=False,
                 key_dict=key_dict,
                 await_input=await_input,
                 count=len(lines),
+                searchable=True,
             )
-            if entry in ["KEY_DOWN", "KEY_UP", "KEY_NPAGE", "KEY_PPAGE", "^F", "^B"]:
+            if entry in NAVIGATION_KEYS:
+                continue
+
+            if entry == "/":
+                self._content_search = self._search(self._get_input_line(prompt="/"), lines)
+                self._content_searched = self._search_target(objs[index])
+                continue
+
+            if entry in ["n", "N"]:
+                if self._content_search is not None:
+                    self._content_search.pending = 1 if entry == "n" else -1
                 continue
 
             if entry == "KEY_RESIZE":
@@ -655,30 +1117,21 @@ class UserInterface(CursesWindow):
             if entry == "_":
                 self._hide_keys = not self._hide_keys
                 heading, lines = self._filter_and_serialize(objs[index])
+                self._tokenize_rest(lines)
 
             # get the less or more, wrap, incase we jumped out of the menu indices
-            elif entry == "-":
-                less = list(reversed([i for i in self._menu_indicies if i - index < 0]))
-                more = list(reversed([i for i in self._menu_indicies if i - index > 0]))
-
-                ordered_indicies = less + more
-                if ordered_indicies:
-                    index = ordered_indicies[0]
-                    self.scroll(0)
-                    entry = "KEY_F(5)"
-
-            elif entry == "+":
-                more = [i for i in self._menu_indicies if i - index > 0]
-                less = [i for i in self._menu_indicies if i - index < 0]
-
-                ordered_indicies = more + less
-                if ordered_indicies:
-                    index = ordered_indicies[0]
+            elif entry in ["-", "+"]:
+                step = 1 if entry == "+" else -1
+                neighbour = self._neighbour(index, step)
+                if neighbour is not None:
+                    index = neighbour
+                    self._content_step = step
                     self.scroll(0)
                     entry = "KEY_F(5)"
 
             elif entry.isnumeric():
                 index = int(entry) % len(objs)
+                self._content_step = 0
                 self.scroll(0)
                 entry = "KEY_F(5)"
 
@@ -695,38 +1148,9 @@ class UserInterface(CursesWindow):
                 )
 
                 content = Content(showing=filtered)
+                self._tokenize_rest(None)
                 return Interaction(name=name, action=action, content=content, ui=self._ui)
 
-    def _obj_match_filter(self, obj: Dict, columns: List) -> bool:
-        """Check a dict's columns against a regex
-
-        :param obj: The dict to check
-        :type obj: dict
-        :param columns: The dicts keys to check
-        :type columns: list
-        :return: True if a mtch else False
-        :rtype: bool
-        """
-        for key in columns:
-            if self._search_value(self.menu_filter(), obj[key]):
-                return True
-        return False
-
-    @staticmethod
-    @lru_cache(maxsize=None)
-    def _search_value(regex: Pattern, value: str) -> Union[Match, None]:
-        """check a str against a regex
-        lru_cache enabled because this is hit during resize
-
-        :param regex: the compiled regex
-        :type regex: Pattern
-        :param value: the string to check
-        :type value: str
-        :return: the match if made
-        :rtype: Match or None
-        """
-        return regex.search(str(value))
-
     def _get_heading_menu_items(
         self, current: List, columns: List, indicies
     ) -> Tuple[CursesLines, CursesLines]:
@@ -746,6 +1170,8 @@ class UserInterface(CursesWindow):
             screen_w=self._screen_w,
             number_colors=self._number_colors,
             color_menu_item=self._color_menu_item,
+            layout_cache=self._menu_layout_cache,
+            line_cache=self._menu_line_cache,
         )
         menu_heading, menu_items = menu_builder.build(
             current,
@@ -776,10 +1202,11 @@ class UserInterface(CursesWindow):
 
             first_line_idx = max(0, last_line_idx - (self._screen_h - 3))
 
-            if self.menu_filter():
-                self._menu_indicies = tuple(
-                    idx for idx, mi in enumerate(current) if self._obj_match_filter(mi, columns)
-                )
+            if self._menu_filter:
+                with STATS.timer("ui.menu_filter"):
+                    self._menu_indicies = self._menu_filter_cache.indicies(
+                        self._menu_filter, current, columns
+                    )
                 line_numbers = tuple(range(last_line_idx - first_line_idx + 1))
                 self._scroll = min(len(self._menu_indicies), self._scroll)
             else:
@@ -787,7 +1214,10 @@ class UserInterface(CursesWindow):
                 line_numbers = self._menu_indicies[first_line_idx : last_line_idx + 1]
 
             showing_idxs = self._menu_indicies[first_line_idx : last_line_idx + 1]
-            menu_heading, menu_lines = self._get_heading_menu_items(current, columns, showing_idxs)
+            with STATS.timer("ui.menu_build"):
+                menu_heading, menu_lines = self._get_heading_menu_items(
+                    current, columns, showing_idxs
+                )
 
             entry = self._display(
                 lines=menu_lines,
@@ -799,7 +1229,7 @@ class UserInterface(CursesWindow):
                 await_input=await_input,
             )
 
-            if entry in ["KEY_RESIZE", "KEY_DOWN", "KEY_UP", "KEY_NPAGE", "KEY_PPAGE", "^F", "^B"]:
+            if entry == "KEY_RESIZE" or entry in NAVIGATION_KEYS:
                 continue
 
             name, action = self._action_match(entry)
@@ -815,7 +1245,7 @@ class UserInterface(CursesWindow):
 
     def show(
         self,
-        obj: Union[List, Dict, str, bool, int, float],
+        obj: Union[List, Dict, str, bool, int, float, CursesLineStore, Tail],
         xform: str = "",
         index: int = None,
         columns: List = None,
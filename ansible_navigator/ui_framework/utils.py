@@ -4,29 +4,101 @@ import functools
 import re
 from math import floor
 
-from typing import List
+from typing import Any
+from typing import Dict
+from typing import Tuple
 
 
-def convert_percentage(dyct: dict, keys: List, pbar_width: int) -> None:
-    """convert a string % to a little progress bar
-    not recursive
-    80% = 80%|XXXXXXXX  |
+class RowClock:
+    # pylint: disable=too-few-public-methods
+    """Hands out row versions, now is the most recent one
 
-    :pararm dicts: a list fo dictionaries
-    :type dicts: list of dictionaries
-    :param keys: The keys to convert in each dictionary
-    :type keys: list of str
+    The versions are kept here, not in the rows, so they never end up in
+    anything a row is written to, like an artifact. A dict can't be weakly
+    referenced, so the row is kept with its version, that way its id can't
+    be reused while the version is known. The owner of the rows must forget
+    them once they won't be shown again, or they are kept until exit.
+    """
+
+    def __init__(self) -> None:
+        self.now = 0
+        self.versions: Dict[int, Tuple[Dict, int]] = {}
+
+    def tick(self) -> int:
+        """advance the clock
+
+        :return: the new time
+        :rtype: int
+        """
+        self.now += 1
+        return self.now
+
+
+ROW_CLOCK = RowClock()
+
+
+def touch(dyct: Dict) -> None:
+    """note a menu row has changed, so anything cached for it is rebuilt
+
+    :param dyct: the menu row
+    :type dyct: dict
+    """
+    ROW_CLOCK.versions[id(dyct)] = (dyct, ROW_CLOCK.tick())
+
+
+def forget(dyct: Dict) -> None:
+    """forget the version of a menu row that won't be shown again
+
+    :param dyct: the menu row
+    :type dyct: dict
+    """
+    entry = ROW_CLOCK.versions.get(id(dyct))
+    if entry is not None and entry[0] is dyct:
+        del ROW_CLOCK.versions[id(dyct)]
+
+
+def row_version(dyct: Dict) -> int:
+    """return the version of a menu row, rows never touched are 0
+
+    :param dyct: the menu row
+    :type dyct: dict
+    :return: the version
+    :rtype: int
+    """
+    entry = ROW_CLOCK.versions.get(id(dyct))
+    if entry is None or entry[0] is not dyct:
+        return 0
+    return entry[1]
+
+
+def progress_bar(value: str, pbar_width: int) -> str:
+    """the little progress bar for a string %
+
+    :param value: the percent, eg 80%
+    :type value: str
+    :param pbar_width: The width of the progress bar
+    :type pbar_width: int
+    :return: the percent followed by the bar
+    :rtype: str
+    """
+    numx = floor(pbar_width / 100 * int(value[0:-1]))
+    return "{value} {numx}".format(value=value.rjust(4), numx=("\u2587" * numx).ljust(pbar_width))
+
+
+def cell_text(value: Any, pbar_width: int) -> str:
+    """the text shown for a value in a menu, a % is shown as a progress bar
+
+    :param value: the value from a menu row
+    :type value: any
     :param pbar_width: The width of the progress bar
     :type pbar_width: int
+    :return: the text
+    :rtype: str
     """
-    for key in keys:
-        value = dyct[key]
-        if is_percent(str(value)):
-            numx = floor(pbar_width / 100 * int(value[0:-1]))
-            dyct["_" + key] = value
-            dyct[key] = "{value} {numx}".format(
-                value=value.rjust(4), numx=("\u2587" * numx).ljust(pbar_width)
-            )
+    text = str(value)
+    if is_percent(text):
+        return progress_bar(text, pbar_width)
+    return text
 
 
 @functools.lru_cache(maxsize=None)
@@ -46,16 +118,22 @@ def distribute(available, weights):
     :type available: int
     :param weights: numbers
     :type weights: list of int
+    :return: the amount for each weight
+    :rtype: list of int
     """
     total = sum(weights)
     if available < total:
-        while available != total:
-            maxv = max(weights)
-            maxvs = [i for i, j in enumerate(weights) if j == maxv]
-            for idx in maxvs:
-                weights[idx] -= 1
-                if sum(weights) == available:
-                    return weights
+        # the widest are capped, find the cap from the narrowest up
+        prefix = 0
+        for capped, weight in zip(range(len(weights), 0, -1), sorted(weights)):
+            if prefix + weight * capped >= available:
+                cap, extra = divmod(available - prefix, capped)
+                break
+            prefix += weight
+        # what's left over goes to the rightmost of those capped
+        over = [idx for idx, weight in enumerate(weights) if weight > cap]
+        wider = set(over[len(over) - extra :]) if extra else set()
+        return [cap + 1 if idx in wider else min(weight, cap) for idx, weight in enumerate(weights)]
 
     distributed_amounts = []
     total_weights = sum(weights)
@@ -0,0 +1,302 @@
+""" an in-memory screen backend, for running the user interface without a terminal
+"""
+import curses
+
+from collections import deque
+from contextlib import contextmanager
+from typing import Deque
+from typing import Dict
+from typing import Iterable
+from typing import Iterator
+from typing import List
+from typing import Tuple
+from typing import Union
+
+# ncurses keeps the color pair number in bits 8-15 of an attribute
+COLOR_PAIR_SHIFT = 8
+
+
+def _key_names() -> Dict[int, bytes]:
+    """Build the key code to name mapping curses.keyname would provide
+
+    :return: the key codes and their names
+    :rtype: dict
+    """
+    names: Dict[int, bytes] = {}
+    for name in sorted(dir(curses), reverse=True):
+        if not name.startswith("KEY_") or name in ("KEY_MIN", "KEY_MAX"):
+            continue
+        code = getattr(curses, name)
+        if name[4:5] == "F" and name[5:].isdigit():
+            name = "KEY_F({num})".format(num=name[5:])
+        names.setdefault(code, name.encode())
+    return names
+
+
+KEY_NAMES = _key_names()
+
+
+def keyname(char: int) -> bytes:
+    """Return the name of a key, as curses.keyname would
+
+    :param char: The key code
+    :type char: int
+    :return: The key name
+    :rtype: bytes
+    """
+    if char in KEY_NAMES:
+        return KEY_NAMES[char]
+    if 0 <= char < 32:
+        return "^{char}".format(char=chr(char + 64)).encode()
+    if char == 127:
+        return b"^?"
+    return chr(char).encode()
+
+
+def color_pair(number: int) -> int:
+    """Return the attribute for a color pair, as curses.color_pair would
+
+    :param number: The color pair number
+    :type number: int
+    :return: The attribute value
+    :rtype: int
+    """
+    return (number << COLOR_PAIR_SHIFT) & curses.A_COLOR
+
+
+class ScriptedKeys:
+    """A source of key presses, scripted up front
+
+    Keys can be given as key codes, single characters or curses key names
+    such as ``KEY_DOWN``. Once the script is exhausted -1 is returned, the
+    same as a curses getch that timed out.
+    """
+
+    def __init__(self, keys: Iterable[Union[int, str]] = ()) -> None:
+        self._keys: Deque[int] = deque()
+        self.extend(keys)
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    @staticmethod
+    def _code(key: Union[int, str]) -> int:
+        """convert a key to a key code"""
+        if isinstance(key, int):
+            return key
+        if len(key) == 1:
+            return ord(key)
+        return getattr(curses, key)
+
+    def extend(self, keys: Iterable[Union[int, str]]) -> None:
+        """add keys to the end of the script"""
+        self._keys.extend(self._code(key) for key in keys)
+
+    def push(self, key: Union[int, str]) -> None:
+        """put a key back at the front of the script, as curses.ungetch would"""
+        self._keys.appendleft(self._code(key))
+
+    def get(self) -> int:
+        """get the next key or -1 if there are none"""
+        if self._keys:
+            return self._keys.popleft()
+        return -1
+
+
+class VirtualScreen:
+    # pylint: disable=too-many-instance-attributes
+    """An in-memory terminal
+
+    Implements the subset of the curses window api used to draw the user
+    interface and keeps the resulting characters and attributes, so what
+    was drawn can be inspected and frames can be timed without a tty.
+    """
+
+    def __init__(
+        self, height: int = 24, width: int = 80, keys: Union[ScriptedKeys, None] = None
+    ) -> None:
+        """start
+
+        :param height: The height of the screen
+        :type height: int
+        :param width: The width of the screen
+        :type width: int
+        :param keys: The key source for getch
+        :type keys: ScriptedKeys or None
+        """
+        self.keys = keys if keys is not None else ScriptedKeys()
+        self.refreshes = 0
+        self.timeout_ms = -1
+        self._height = height
+        self._width = width
+        self._cursor = (0, 0)
+        self._cells: List[List[Tuple[str, int]]] = []
+        self.erase()
+
+    def resize(self, height: int, width: int) -> None:
+        """Resize the screen and queue a KEY_RESIZE, as a terminal would
+
+        :param height: The new height of the screen
+        :type height: int
+        :param width: The new width of the screen
+        :type width: int
+        """
+        self._height = height
+        self._width = width
+        self.erase()
+        self.keys.push(curses.KEY_RESIZE)
+
+    def getmaxyx(self) -> Tuple[int, int]:
+        """the size of the screen"""
+        return self._height, self._width
+
+    def getyx(self) -> Tuple[int, int]:
+        """the cursor position"""
+        return self._cursor
+
+    def move(self, lineno: int, column: int) -> None:
+        """move the cursor"""
+        if not (0 <= lineno < self._height and 0 <= column < self._width):
+            raise curses.error("move() returned ERR")
+        self._cursor = (lineno, column)
+
+    def addstr(self, lineno: int, column: int, text: str, attr: int = 0) -> None:
+        """write a string at a position, wrapping as curses does
+
+        :raises curses.error: When the string runs off the end of the screen
+        """
+        self.move(lineno, column)
+        for char in text:
+            self._cells[lineno][column] = (char, attr)
+            column += 1
+            if column == self._width:
+                if lineno == self._height - 1:
+                    raise curses.error("addstr() returned ERR")
+                lineno, column = lineno + 1, 0
+            self._cursor = (lineno, column)
+
+    def addch(self, char: Union[int, str], attr: int = 0) -> None:
+        """write one character at the cursor, used by curses.textpad"""
+        lineno, column = self._cursor
+        self.addstr(lineno, column, chr(char) if isinstance(char, int) else char, attr)
+
+    def inch(self, *position: int) -> int:
+        """the character and attributes at the cursor, or a line and column"""
+        lineno, column = position or self._cursor
+        char, attr = self._cells[lineno][column]
+        return ord(char) | attr
+
+    def delch(self) -> None:
+        """delete the character at the cursor, moving the rest of the line left"""
+        lineno, column = self._cursor
+        del self._cells[lineno][column]
+        self._cells[lineno].append((" ", 0))
+
+    def erase(self) -> None:
+        """blank the screen"""
+        self._cells = [[(" ", 0)] * self._width for _ in range(self._height)]
+        self._cursor = (0, 0)
+
+    def clear(self) -> None:
+        """blank the screen"""
+        self.erase()
+
+    def clrtoeol(self) -> None:
+        """blank from the cursor to the end of the line"""
+        lineno, column = self._cursor
+        self._cells[lineno][column:] = [(" ", 0)] * (self._width - column)
+
+    def refresh(self) -> None:
+        """count the frames drawn"""
+        self.refreshes += 1
+
+    def noutrefresh(self) -> None:
+        """count the frames drawn"""
+        self.refreshes += 1
+
+    def timeout(self, delay: int) -> None:
+        """record the getch timeout"""
+        self.timeout_ms = delay
+
+    def nodelay(self, flag: bool) -> None:
+        """record the getch timeout"""
+        self.timeout_ms = 0 if flag else -1
+
+    def keypad(self, flag: bool) -> None:
+        """keypad mode is always on"""
+
+    def getch(self) -> int:
+        """the next key from the key source"""
+        return self.keys.get()
+
+    def line(self, lineno: int) -> str:
+        """Return the text on one line of the screen
+
+        :param lineno: The line number
+        :type lineno: int
+        :return: The text, without trailing whitespace
+        :rtype: str
+        """
+        return "".join(char for char, _attr in self._cells[lineno]).rstrip()
+
+    def attrs(self, lineno: int) -> List[int]:
+        """Return the attributes for each column of one line
+
+        :param lineno: The line number
+        :type lineno: int
+        :return: The attributes
+        :rtype: list of int
+        """
+        return [attr for _char, attr in self._cells[lineno]]
+
+    def text(self) -> str:
+        """Return all the text on the screen
+
+        :return: The text, one line per row
+        :rtype: str
+        """
+        return "\n".join(self.line(lineno) for lineno in range(self._height))
+
+
+@contextmanager
+def virtual_curses(screen: VirtualScreen, colors: int = 256) -> Iterator[VirtualScreen]:
+    """Swap the curses functions the user interface uses for ones
+    backed by a virtual screen, restoring them on exit
+
+    :param screen: The screen that initscr and newwin will draw to
+    :type screen: VirtualScreen
+    :param colors: The number of colors the virtual terminal supports
+    :type colors: int
+    """
+    replacements = {
+        "COLORS": colors,
+        "COLOR_PAIRS": colors,
+        "beep": lambda: None,
+        "can_change_color": lambda: False,
+        "color_content": lambda number: (0, 0, 0),
+        "color_pair": color_pair,
+        "curs_set": lambda visibility: None,
+        "doupdate": lambda: None,
+        "flash": lambda: None,
+        "init_color": lambda number, red, green, blue: None,
+        "init_pair": lambda number, foreground, background: None,
+        "initscr": lambda: screen,
+        "keyname": keyname,
+        "newwin": lambda height, width, lineno=0, column=0: VirtualScreen(
+            height=height, width=width, keys=screen.keys
+        ),
+        "ungetch": screen.keys.push,
+        "use_default_colors": lambda: None,
+    }
+    missing = object()
+    originals = {name: getattr(curses, name, missing) for name in replacements}
+    for name, replacement in replacements.items():
+        setattr(curses, name, replacement)
+    try:
+        yield screen
+    finally:
+        for name, original in originals.items():
+            if original is missing:
+                delattr(curses, name)
+            else:
+                setattr(curses, name, original)
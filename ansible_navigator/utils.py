@@ -258,3 +258,61 @@ def _get_kvs(args, collection_doc_cache_path):
     mod = importlib.util.module_from_spec(spec)
     spec.loader.exec_module(mod)
     return mod.KeyValueStore(collection_doc_cache_path)
+
+
+class FileTail:
+    # pylint: disable=too-few-public-methods
+    """Follow a file as it's appended to, eg the log, reading only what was added
+
+    The offset read to and the inode are kept. A file that's shorter than
+    the offset was truncated, and one with another inode was replaced,
+    either way it's read again from the start into a new list of lines.
+    """
+
+    def __init__(self, path: str) -> None:
+        """start
+
+        :param path: The file to follow
+        :type path: str
+        """
+        self.path = path
+        self.lines: List[str] = []
+        self.offset = 0
+        self.resets = 0
+        self._inode: Tuple[int, int] = (0, 0)
+        # the bytes of a line not yet complete
+        self._partial = b""
+
+    def read(self) -> int:
+        """Read what was added to the file since last time
+
+        :return: The number of lines added
+        :rtype: int
+        """
+        try:
+            file_stat = os.stat(self.path)
+        except FileNotFoundError:
+            file_stat = None
+        inode = (file_stat.st_dev, file_stat.st_ino) if file_stat else (0, 0)
+        size = file_stat.st_size if file_stat else 0
+        if inode != self._inode or size < self.offset:
+            if self.offset or self.lines:
+                logger.debug("%s was truncated or replaced, reading from the start", self.path)
+                self.resets += 1
+            self._inode = inode
+            self.lines = []
+            self.offset = 0
+            self._partial = b""
+        if size == self.offset:
+            return 0
+
+        with open(self.path, "rb") as fhand:
+            fhand.seek(self.offset)
+            data = fhand.read(size - self.offset)
+        self.offset += len(data)
+        data = self._partial + data
+        end = data.rfind(b"\n") + 1
+        self._partial = data[end:]
+        added = data[:end].decode("utf-8", errors="replace").splitlines()
+        self.lines.extend(added)
+        return len(added)
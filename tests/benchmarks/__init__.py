@@ -0,0 +1 @@
+""" benchmarks, run each with python -m tests.benchmarks.<name> """
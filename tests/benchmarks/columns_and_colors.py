@@ -0,0 +1,64 @@
+""" time columns_and_colors for a minified json line as it gets longer,
+the time per character should stay about the same
+
+python -m tests.benchmarks.columns_and_colors --max-length 256000
+"""
+import argparse
+import json
+import time
+
+from ansible_navigator.tm_tokenize.tokenize import tokenize
+from ansible_navigator.ui_framework.colorize import Colorize
+from ansible_navigator.ui_framework.colorize import columns_and_colors
+
+from .ui_frames import SHARE_DIR
+
+
+def minified_json(length: int) -> str:
+    """Make a line of minified json, at least some length
+
+    :param length: The minimum length
+    :type length: int
+    :return: The json
+    :rtype: str
+    """
+    entry = {"name": "task", "changed": False, "rc": 0, "stdout": "some output"}
+    count = length // len(json.dumps(entry, separators=(",", ":"))) + 1
+    return json.dumps([entry] * count, separators=(",", ":"))
+
+
+def main() -> None:
+    """run the benchmarks"""
+    # pylint: disable=protected-access
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--max-length", type=int, default=256000, help="longest line")
+    parser.add_argument("--repeat", type=int, default=3, help="runs for each length")
+    args = parser.parse_args()
+
+    colorize = Colorize(share_dir=SHARE_DIR)
+    compiler = colorize._grammars.compiler_for_scope("source.json")
+    schema = colorize._schema
+
+    length = 1000
+    while length <= args.max_length:
+        line = minified_json(length)
+        _state, regions = tokenize(compiler, compiler.root_state, line, True)
+        times = []
+        for _ in range(args.repeat):
+            start = time.perf_counter()
+            columns_and_colors([(regions, line)], schema)
+            times.append(time.perf_counter() - start)
+        best = min(times)
+        print(
+            "length={length:<9} regions={regions:<8} {time:9.3f}ms {per:7.1f}ns/char".format(
+                length=len(line),
+                regions=len(regions),
+                time=best * 1000,
+                per=best / len(line) * 1e9,
+            )
+        )
+        length *= 4
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,72 @@
+""" measure loading each grammar from the share dir, the time to read its
+json, build its rules and compile enough of it to tokenize a first line,
+the work a cache of grammars could save at start up
+
+python -m tests.benchmarks.grammars
+"""
+import argparse
+import os
+import time
+
+from typing import Dict
+
+from ansible_navigator.tm_tokenize.grammars import Grammar
+from ansible_navigator.tm_tokenize.grammars import Grammars
+from ansible_navigator.tm_tokenize.reg import make_backref_reg
+from ansible_navigator.tm_tokenize.reg import make_reg
+from ansible_navigator.tm_tokenize.reg import make_regset
+from ansible_navigator.tm_tokenize.tokenize import tokenize
+
+from .ui_frames import SHARE_DIR
+
+SCOPES = ("source.json", "source.yaml", "text.log", "text.html.basic", "text.html.markdown")
+
+
+def measure(scope: str, line: str) -> Dict[str, float]:
+    """Load one grammar, as if for the first time
+
+    :param scope: The scope of the grammar
+    :type scope: str
+    :param line: The first line to tokenize
+    :type line: str
+    :return: The seconds to read, build and compile it
+    :rtype: dict
+    """
+    # pylint: disable=protected-access
+    for cached in (make_reg, make_regset, make_backref_reg):
+        cached.cache_clear()
+    grammars = Grammars(os.path.join(SHARE_DIR, "grammar"))
+    start = time.perf_counter()
+    raw = grammars._raw_for_scope(scope)
+    read = time.perf_counter()
+    grammars._parsed[scope] = Grammar.make(raw)
+    built = time.perf_counter()
+    compiler = grammars.compiler_for_scope(scope)
+    tokenize(compiler, compiler.root_state, line, True)
+    compiled = time.perf_counter()
+    return {"read": read - start, "build": built - read, "compile": compiled - built}
+
+
+def main() -> None:
+    """run the benchmarks"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--repeat", type=int, default=5, help="runs for each grammar")
+    parser.add_argument("--line", default="key: [1, 'two']", help="the first line to tokenize")
+    args = parser.parse_args()
+
+    for scope in SCOPES:
+        try:
+            runs = [measure(scope, args.line) for _ in range(args.repeat)]
+        except Exception as exc:  # pylint: disable=broad-except
+            # eg a grammar the installed oniguruma can't compile
+            print("{scope:<20} failed: {exc}".format(scope=scope, exc=exc))
+            continue
+        best = {step: min(run[step] for run in runs) * 1000 for step in runs[0]}
+        print(
+            "{scope:<20} {read:>6.2f} ms read {build:>6.2f} ms build "
+            "{compile:>6.2f} ms compile".format(scope=scope, **best)
+        )
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,218 @@
+""" measure the tokenizer against a corpus of the content shown by the
+user interface, lines and bytes per second for each scope and the peak
+memory used by Colorize.render, compared to a saved baseline if given
+
+python -m tests.benchmarks.tokenizer --save /tmp/baseline.json
+python -m tests.benchmarks.tokenizer --compare /tmp/baseline.json
+"""
+import argparse
+import json
+import os
+import sys
+import time
+import tracemalloc
+
+from typing import Dict
+from typing import List
+from typing import NamedTuple
+
+from ansible_navigator.tm_tokenize.tokenize import tokenize
+from ansible_navigator.ui_framework.colorize import Colorize
+from ansible_navigator.ui_framework.virtual_screen import VirtualScreen
+from ansible_navigator.ui_framework.virtual_screen import virtual_curses
+from ansible_navigator.yaml import Dumper
+from ansible_navigator.yaml import yaml
+
+from .columns_and_colors import minified_json
+from .ui_frames import SHARE_DIR
+from .ui_frames import task_rows
+
+
+class Sample(NamedTuple):
+    # pylint: disable=inherit-non-class
+    # pylint: disable=too-few-public-methods
+    """One input of the corpus"""
+
+    name: str
+    scope: str
+    text: str
+
+
+class Result(NamedTuple):
+    # pylint: disable=inherit-non-class
+    # pylint: disable=too-few-public-methods
+    """The measurements for one sample"""
+
+    lines_per_sec: float
+    bytes_per_sec: float
+    peak_bytes: int
+
+
+def ansible_stdout(count: int) -> str:
+    """Make some output that looks like ansible-playbook's, with colors
+
+    :param count: The number of tasks
+    :type count: int
+    :return: The output
+    :rtype: str
+    """
+    lines = ["", "PLAY [all] " + "*" * 60, ""]
+    for idx in range(count):
+        lines.append("TASK [Task number {idx} does something useful] ".format(idx=idx) + "*" * 30)
+        color, result = (("32", "ok"), ("33", "changed"), ("31", "fatal"))[idx % 3]
+        for host in range(5):
+            lines.append(
+                "\x1b[0;{color}m{result}: [host{host}.example.com]\x1b[0m".format(
+                    color=color, result=result, host=host
+                )
+            )
+        lines.append("")
+    return "\n".join(lines)
+
+
+def corpus(scale: float) -> List[Sample]:
+    """The inputs to measure, representative of what is shown
+
+    :param scale: Make the generated inputs bigger or smaller
+    :type scale: float
+    :return: The samples
+    :rtype: list of Sample
+    """
+    rows = task_rows(max(1, int(200 * scale)))
+    samples = [
+        Sample(
+            "yaml task results",
+            "source.yaml",
+            yaml.dump(
+                rows, default_flow_style=False, Dumper=Dumper, explicit_start=True, sort_keys=True
+            ),
+        ),
+        Sample("json pretty", "source.json", json.dumps(rows, indent=4, sort_keys=True)),
+        Sample("json minified", "source.json", minified_json(int(200000 * scale))),
+        Sample("ansible stdout", "text.log", ansible_stdout(int(500 * scale))),
+        Sample("ansible stdout", "source.ansi", ansible_stdout(int(500 * scale))),
+    ]
+    for name in ("welcome.md", "help.md"):
+        with open(os.path.join(SHARE_DIR, "markdown", name), encoding="utf-8") as fhand:
+            samples.append(Sample(name, "text.html.markdown", fhand.read()))
+    return samples
+
+
+def measure(sample: Sample, repeat: int) -> Result:
+    """Time the tokenizer over a sample and find the peak memory of rendering it
+
+    :param sample: The sample
+    :type sample: Sample
+    :param repeat: Take the best of this many runs
+    :type repeat: int
+    :return: The measurements
+    :rtype: Result
+    """
+    # pylint: disable=protected-access
+    lines = sample.text.splitlines()
+    best = float("inf")
+    # the first run compiles the grammar's regexes, it isn't counted
+    for run in range(repeat + 1):
+        colorize = Colorize(share_dir=SHARE_DIR)
+        start = time.perf_counter()
+        if sample.scope == "source.ansi":
+            colorize.render(sample.text, sample.scope)
+        else:
+            compiler = colorize._grammars.compiler_for_scope(sample.scope)
+            state = compiler.root_state
+            for idx, line in enumerate(lines):
+                state, _regions = tokenize(compiler, state, line, idx == 0)
+        if run:
+            best = min(best, time.perf_counter() - start)
+
+    colorize = Colorize(share_dir=SHARE_DIR)
+    tracemalloc.start()
+    colorize.render(sample.text, sample.scope)
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return Result(
+        lines_per_sec=len(lines) / best,
+        bytes_per_sec=len(sample.text.encode("utf-8")) / best,
+        peak_bytes=peak,
+    )
+
+
+def compare(results: Dict[str, Dict], baseline: Dict[str, Dict], threshold: float) -> List[str]:
+    """Find the samples that are slower or use more memory than the baseline
+
+    :param results: The measurements, by sample
+    :type results: dict
+    :param baseline: The saved measurements, by sample
+    :type baseline: dict
+    :param threshold: The fraction worse than the baseline allowed
+    :type threshold: float
+    :return: A description of each regression
+    :rtype: list of str
+    """
+    regressions = []
+    for key, result in results.items():
+        before = baseline.get(key)
+        if before is None:
+            continue
+        if result["bytes_per_sec"] < before["bytes_per_sec"] * (1 - threshold):
+            regressions.append(
+                "{key}: {before:.0f} -> {after:.0f} bytes/sec".format(
+                    key=key, before=before["bytes_per_sec"], after=result["bytes_per_sec"]
+                )
+            )
+        if result["peak_bytes"] > before["peak_bytes"] * (1 + threshold):
+            regressions.append(
+                "{key}: {before} -> {after} peak bytes".format(
+                    key=key, before=before["peak_bytes"], after=result["peak_bytes"]
+                )
+            )
+    return regressions
+
+
+def main() -> None:
+    """run the benchmarks"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--scale", type=float, default=1.0, help="size of the generated inputs")
+    parser.add_argument("--repeat", type=int, default=3, help="runs for each sample")
+    parser.add_argument("--save", help="save the results as a baseline to this file")
+    parser.add_argument("--compare", help="compare the results to a baseline in this file")
+    parser.add_argument(
+        "--threshold", type=float, default=0.1, help="fraction worse than the baseline allowed"
+    )
+    args = parser.parse_args()
+
+    results = {}
+    # ansi colors are converted to curses color pairs
+    with virtual_curses(VirtualScreen()):
+        for sample in corpus(args.scale):
+            key = "{name} ({scope})".format(name=sample.name, scope=sample.scope)
+            try:
+                result = measure(sample, args.repeat)
+            except Exception as exc:  # pylint: disable=broad-except
+                # eg a grammar the installed oniguruma can't compile
+                print("{key:<40} failed: {exc}".format(key=key, exc=exc))
+                continue
+            results[key] = result._asdict()
+            print(
+                "{key:<40} {lines:>10.1f} lines/s {bytes:>12.0f} bytes/s {peak:>10} peak".format(
+                    key=key,
+                    lines=result.lines_per_sec,
+                    bytes=result.bytes_per_sec,
+                    peak=result.peak_bytes,
+                )
+            )
+
+    if args.save:
+        with open(args.save, "w", encoding="utf-8") as fhand:
+            json.dump(results, fhand, indent=4, sort_keys=True)
+    if args.compare:
+        with open(args.compare, encoding="utf-8") as fhand:
+            regressions = compare(results, json.load(fhand), args.threshold)
+        for regression in regressions:
+            print("regression", regression)
+        if regressions:
+            sys.exit(1)
+
+
+if __name__ == "__main__":
+    main()
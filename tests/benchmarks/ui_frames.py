@@ -0,0 +1,135 @@
+""" time the frames drawn by the user interface, using a virtual screen
+
+python -m tests.benchmarks.ui_frames --rows 50000 --keys 200
+"""
+import argparse
+import os
+import re
+import time
+
+from collections import namedtuple
+from typing import Callable
+from typing import Dict
+from typing import List
+
+from ansible_navigator.ui_framework import UserInterface
+from ansible_navigator.ui_framework.virtual_screen import ScriptedKeys
+from ansible_navigator.ui_framework.virtual_screen import VirtualScreen
+from ansible_navigator.ui_framework.virtual_screen import virtual_curses
+
+SHARE_DIR = os.path.join(
+    os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))),
+    "share",
+    "ansible_navigator",
+)
+
+Kegex = namedtuple("Kegex", ("name", "kegex"))
+KEGEXES = [
+    Kegex(name="refresh", kegex=re.compile(r"^KEY_F\(5\)$")),
+    Kegex(name="select", kegex=re.compile(r"^\d+$")),
+]
+
+TASK_COLUMNS = ["__result", "__host", "__number", "__changed", "__task", "__task_action"]
+
+
+def task_rows(count: int) -> List[Dict]:
+    """Generate some rows that look like the explore task list
+
+    :param count: The number of rows
+    :type count: int
+    :return: The rows
+    :rtype: list of dicts
+    """
+    return [
+        {
+            "__result": ("OK", "FAILED", "SKIPPED")[idx % 3],
+            "__host": "host{idx}.example.com".format(idx=idx % 97),
+            "__number": idx,
+            "__changed": bool(idx % 2),
+            "__task": "Task number {idx} does something useful".format(idx=idx),
+            "__task_action": "ansible.builtin.command",
+            "res": {"stdout_lines": ["line {n}".format(n=n) for n in range(idx % 50)]},
+        }
+        for idx in range(count)
+    ]
+
+
+def headless_ui() -> UserInterface:
+    """Create a user interface, within virtual_curses
+    it will draw to the virtual screen
+
+    :return: The user interface
+    :rtype: UserInterface
+    """
+    return UserInterface(
+        screen_miny=3,
+        no_osc4=True,
+        kegexes=lambda: KEGEXES,
+        refresh=100,
+        share_dir=SHARE_DIR,
+    )
+
+
+def time_frames(show: Callable, screen: VirtualScreen, keys: int, key: str) -> List[float]:
+    """Time each frame, each frame is one key press
+
+    :param show: Calls ui.show once
+    :type show: callable
+    :param screen: The virtual screen
+    :type screen: VirtualScreen
+    :param keys: The number of key presses
+    :type keys: int
+    :param key: The key to press
+    :type key: str
+    :return: The time for each frame in seconds
+    :rtype: list of float
+    """
+    times = []
+    for _ in range(keys):
+        screen.keys.extend([key])
+        start = time.perf_counter()
+        show()
+        times.append(time.perf_counter() - start)
+    return times
+
+
+def report(name: str, times: List[float]) -> None:
+    """Print the p50, p95 and max for some frame times"""
+    ordered = sorted(times)
+    print(
+        "{name:<24} frames={count:<6} p50={p50:8.3f}ms p95={p95:8.3f}ms max={max:8.3f}ms".format(
+            name=name,
+            count=len(ordered),
+            p50=ordered[len(ordered) // 2] * 1000,
+            p95=ordered[int(len(ordered) * 0.95)] * 1000,
+            max=ordered[-1] * 1000,
+        )
+    )
+
+
+def main() -> None:
+    """run the benchmarks"""
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument("--rows", type=int, default=10000, help="rows in the menu")
+    parser.add_argument("--keys", type=int, default=100, help="key presses per benchmark")
+    parser.add_argument("--height", type=int, default=50, help="screen height")
+    parser.add_argument("--width", type=int, default=200, help="screen width")
+    args = parser.parse_args()
+
+    rows = task_rows(args.rows)
+    screen = VirtualScreen(height=args.height, width=args.width, keys=ScriptedKeys())
+    with virtual_curses(screen):
+        ui = headless_ui()
+        menu = lambda: ui.show(rows, columns=TASK_COLUMNS)
+        report("menu scroll", time_frames(menu, screen, args.keys, "KEY_DOWN"))
+        report("menu page", time_frames(menu, screen, args.keys, "KEY_NPAGE"))
+
+        ui.scroll(0)
+        content = lambda: ui.show(rows, index=args.rows - 1)
+        report("content scroll", time_frames(content, screen, args.keys, "KEY_DOWN"))
+        content = lambda: ui.show(rows, index=args.rows - 1, xform="source.json")
+        report("content json", time_frames(content, screen, args.keys, "KEY_DOWN"))
+
+
+if __name__ == "__main__":
+    main()
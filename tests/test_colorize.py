@@ -0,0 +1,318 @@
+import curses
+import json
+import random
+
+from ansible_navigator.tm_tokenize.region import Region
+from ansible_navigator.tm_tokenize.scopes import SCOPES
+from ansible_navigator.ui_framework.colorize import AnsiLineStore
+from ansible_navigator.ui_framework.colorize import AnsiLines
+from ansible_navigator.ui_framework.colorize import ColorSchema
+from ansible_navigator.ui_framework.colorize import Colorize
+from ansible_navigator.ui_framework.colorize import Highlighter
+from ansible_navigator.ui_framework.colorize import ansi_to_curses
+from ansible_navigator.ui_framework.colorize import columns_and_colors
+from ansible_navigator.ui_framework.virtual_screen import VirtualScreen
+from ansible_navigator.ui_framework.virtual_screen import virtual_curses
+from ansible_navigator.yaml import Dumper
+from ansible_navigator.yaml import yaml
+
+from .benchmarks.ui_frames import SHARE_DIR
+
+LINES = ["---\n", "key: |\n"] + ["  line {idx}: 'text'\n".format(idx=idx) for idx in range(8)]
+
+
+def _fresh(colorize, doc, scope):
+    compiler = colorize._grammars.compiler_for_scope(scope)
+    return Highlighter(compiler, colorize._schema).render(doc)
+
+
+def test_growing_document():
+    colorize = Colorize(share_dir=SHARE_DIR)
+    # a checkpoint every line, so it resumes from the line that changed
+    highlighter = Highlighter(
+        colorize._grammars.compiler_for_scope("source.yaml"), colorize._schema, checkpoint_lines=1
+    )
+    docs = [
+        "".join(LINES[:3]),
+        # complete lines added
+        "".join(LINES[:5]),
+        # a partial line, then the rest of it
+        "".join(LINES[:5]) + LINES[5][:8],
+        "".join(LINES[:7]),
+        # a change part way through
+        "".join(LINES[:2]) + "changed\n" + "".join(LINES[3:]),
+        "",
+    ]
+    for doc in docs:
+        assert highlighter.render(doc) == _fresh(colorize, doc, "source.yaml")
+    assert highlighter.reused == 3 + 5 + 5 + 2
+    assert highlighter.tokenized == 3 + 2 + 1 + 2 + 8
+
+
+def test_document_is_lazy():
+    colorize = Colorize(share_dir=SHARE_DIR)
+    highlighter = Highlighter(
+        colorize._grammars.compiler_for_scope("source.yaml"), colorize._schema, checkpoint_lines=4
+    )
+    doc = "".join(LINES)
+    document = highlighter.document(doc)
+    assert len(document) == len(LINES)
+    assert document.colored_lines(0, 3) == _fresh(colorize, doc, "source.yaml")[:3]
+    assert highlighter.tokenized == 3
+    assert not document.complete
+    partly = document.nbytes()
+    assert partly > 2 * len(doc)
+    assert document.colored_lines(0, len(document)) == _fresh(colorize, doc, "source.yaml")
+    assert document.complete
+    # the memory used grows as it's colored
+    assert document.nbytes() > partly
+
+    # a change after the checkpoint at line 4, it resumes from there
+    changed = "".join(LINES[:6]) + "changed\n" + "".join(LINES[7:])
+    document = highlighter.document(changed)
+    assert highlighter.reused == 4
+    assert document.nbytes() > 2 * len(changed)
+    assert document.colored_lines(0, len(document)) == _fresh(colorize, changed, "source.yaml")
+    assert highlighter.tokenized == len(LINES) + 6
+
+
+def test_growing_yaml():
+    colorize = Colorize(share_dir=SHARE_DIR)
+    doc = "---\nkey: |\n  some text\n"
+    first = colorize.render(doc, "source.yaml")
+    second = colorize.render(doc + "  more text\nother: 1\n", "source.yaml")
+    assert second[: len(first)] == first
+    assert second == _fresh(colorize, doc + "  more text\nother: 1\n", "source.yaml")
+
+
+def _per_character(lines, schema):
+    """the original, a dict per character grouped by color"""
+    result = []
+    for regions, line in lines:
+        char_dicts = [{"chars": c, "color": None} for c in line]
+        for region in regions:
+            color = schema.get_color(SCOPES[region.scope])
+            if color:
+                for idx in range(region.start, region.end):
+                    char_dicts[idx]["color"] = color
+        grouped = char_dicts[:1] or [{"chars": line, "color": None}]
+        for entry in char_dicts[1:]:
+            if entry["color"] == grouped[-1]["color"]:
+                grouped[-1]["chars"] += entry["chars"]
+            else:
+                grouped.append(entry)
+        column = 0
+        for chunk in grouped:
+            chunk["column"] = column
+            column += len(chunk["chars"])
+        result.append(grouped)
+    return result
+
+
+def test_columns_and_colors_matches_per_character():
+    rand = random.Random(0)
+    schema = Colorize(share_dir=SHARE_DIR)._schema
+    scopes = [("source.json",), ("string.quoted",), ("constant.numeric",), ("nothing.here",)]
+    scopes = [SCOPES.intern(scope) for scope in scopes]
+    lines = []
+    for _ in range(500):
+        line = "x" * rand.randint(0, 40)
+        cuts = sorted(rand.sample(range(len(line) + 1), min(len(line) + 1, rand.randint(0, 6))))
+        regions = tuple(
+            Region(start, end, rand.choice(scopes)) for start, end in zip(cuts, cuts[1:])
+        )
+        if regions and rand.random() < 0.2:
+            # overlapping
+            regions += (Region(0, len(line), rand.choice(scopes)),)
+        lines.append((regions, line))
+    assert columns_and_colors(lines, schema) == _per_character(lines, schema)
+
+
+def test_color_schema():
+    schema = ColorSchema(
+        {
+            "tokenColors": [
+                {"scope": "emphasis", "settings": {"fontStyle": "italic"}},
+                {"scope": ["string", "string.quoted"], "settings": {"foreground": "#010203"}},
+                {"scope": "string.quoted", "settings": {"foreground": "#040506"}},
+                {"scope": "keyword", "settings": {"foreground": "#070809"}},
+            ]
+        }
+    )
+    # the longest prefix of the innermost name, the first entry for a selector
+    assert schema.get_color(("source.yaml", "string.quoted.double.yaml")) == (1, 2, 3)
+    assert schema.get_color(("keyword.control", "string.unquoted")) == (1, 2, 3)
+    assert schema.get_color(("keyword.control", "meta.thing")) == (7, 8, 9)
+    # found, but without a foreground
+    assert schema.get_color(("keyword", "emphasis")) is None
+    assert schema.get_color(("source.yaml",)) is None
+    # and by the id of an interned scope
+    scope_id = SCOPES.intern(("source.yaml", "string.quoted.double.yaml"))
+    assert schema.color_of(scope_id) == (1, 2, 3)
+    assert schema.color_of(SCOPES.intern(("source.yaml",))) is None
+
+
+def test_ansi_to_curses():
+    with virtual_curses(VirtualScreen()):
+        line = ansi_to_curses("\x1b[0;32mok: [host]\x1b[0m \x1b[1mbold\x1b[m done")
+        assert [(part.column, part.string, part.color, part.decoration) for part in line] == [
+            (0, "ok: [host]", curses.color_pair(2), 0),
+            (10, " ", 0, 0),
+            (11, "bold", 0, curses.A_BOLD),
+            (15, " done", 0, 0),
+        ]
+
+
+def test_ansi_lines_carry_color():
+    stdout = ["\x1b[0;31mfailed: [host] =>", "  msg: oops\x1b[0m", "next"]
+    with virtual_curses(VirtualScreen()):
+        ansi = AnsiLines()
+        first = ansi.render("\n".join(stdout[:2]))
+        # the color continues to the next line, until reset
+        assert first[1][0].color == curses.color_pair(1)
+        lines = ansi.render("\n".join(stdout))
+        assert lines[:2] == first
+        assert lines[2][0].color == 0
+    # the last line is converted again, in case it grew
+    assert (ansi.reused, ansi.converted) == (1, 4)
+
+
+def test_ansi_line_store():
+    colors = ["\x1b[0;31m", "\x1b[0;32m", "\x1b[1m", "\x1b[0m", ""]
+    stdout = [
+        "{color}line {idx}{reset}".format(
+            color=colors[idx % 5], idx=idx, reset=colors[3] if idx % 7 == 0 else ""
+        )
+        for idx in range(500)
+    ]
+    with virtual_curses(VirtualScreen()):
+        expected = AnsiLines().render("\n".join(stdout))
+        source = stdout[:100]
+        store = AnsiLineStore(source, checkpoint_lines=16, ring_lines=32)
+        assert store[90:100] == tuple(expected[90:100])
+        # only the lines asked for were converted
+        assert store.converted == 10
+        # the source grows, the store with it
+        source.extend(stdout[100:])
+        assert len(store) == 500
+        assert store[490:] == tuple(expected[490:])
+        assert store[5] == expected[5]
+        assert store.text(7) == "line 7"
+        assert list(store.runs(1)) == [
+            (part.column, len(part.string), part.color, part.decoration) for part in expected[1]
+        ]
+        assert store.converted == 22
+        assert len(store._ring) <= 32
+
+
+def test_tail_document():
+    colorize = Colorize(share_dir=SHARE_DIR)
+    # json lines, the grammar's state is the same after each
+    source = [
+        json.dumps({"event": "runner_on_ok", "counter": idx, "ok": idx % 2 == 0})
+        for idx in range(300)
+    ]
+    tail = colorize.tail(source=source[:200], scope="source.json")
+    expected = _fresh(colorize, "\n".join(source), "source.json")
+    # from the end, without tokenizing the rest
+    assert tail.colored_lines(190, 200) == expected[190:200]
+    tail.source.extend(source[200:])
+    assert len(tail) == 300
+    assert tail.colored_lines(200, 300) == expected[200:]
+    assert tail.colored_lines(0, 1) == expected[:1]
+
+    plain = colorize.tail(source=["a", "b"], scope="text.unknown")
+    assert plain.colored_lines(1, 2) == [[{"column": 0, "chars": "b", "color": None}]]
+
+
+def test_line_budget():
+    colorize = Colorize(share_dir=SHARE_DIR)
+    compiler = colorize._grammars.compiler_for_scope("source.json")
+    long_line = '["' + "x" * 100 + '"]'
+    doc = "\n".join([long_line, "[1]"])
+
+    highlighter = Highlighter(compiler, colorize._schema, max_line_length=10)
+    lines = highlighter.render(doc)
+    # only the start is colored, the rest of the line is plain
+    assert "".join(part["chars"] for part in lines[0]) == long_line
+    assert lines[0][-1]["chars"].endswith("x" * 90 + '"]')
+    assert lines[0][-1]["color"] is None
+    assert lines[1] == _fresh(colorize, "[1]", "source.json")[0]
+    assert (highlighter.too_long, highlighter.too_slow) == (1, 0)
+
+    # no time at all, only the first region is found
+    highlighter = Highlighter(compiler, colorize._schema, line_time_budget=-1)
+    lines = highlighter.render(doc)
+    assert "".join(part["chars"] for part in lines[0]) == long_line
+    assert highlighter.too_slow == 2
+
+
+def _random_str(rand):
+    kind = rand.random()
+    if kind < 0.3:
+        return rand.choice(
+            ["", "true", "null", "1.5", "a: b", "#x", "- x", "it's", '"q"', "@at", "x #y"]
+        )
+    if kind < 0.45:
+        # about as long as a simple key can be
+        return rand.choice("abz") * rand.randint(120, 135)
+    words = ["word", "é", "ü€", "line\n", "\t", "'", '"', ":", "\\", " ", "\n\n", "0"]
+    return "".join(rand.choice(words) for _ in range(rand.randint(1, 30)))
+
+
+def _random_obj(rand, depth=0):
+    kind = rand.random()
+    if depth > 3 or kind < 0.4:
+        return rand.choice([None, True, 7, -2.5, 1e20, [], {}, _random_str(rand)])
+    if kind < 0.7:
+        return [_random_obj(rand, depth + 1) for _ in range(rand.randint(1, 4))]
+    return {_random_str(rand): _random_obj(rand, depth + 1) for _ in range(rand.randint(1, 4))}
+
+
+def test_serialize_matches_dump_and_grammar():
+    rand = random.Random(0)
+    colorize = Colorize(share_dir=SHARE_DIR, line_time_budget=60)
+    serialized = 0
+    for _ in range(200):
+        obj = {"key": _random_obj(rand)}
+        for scope, text in (
+            (
+                "source.yaml",
+                yaml.dump(obj, default_flow_style=False, Dumper=Dumper, explicit_start=True),
+            ),
+            ("source.json", json.dumps(obj, indent=4, sort_keys=True)),
+        ):
+            lines = colorize.serialize(obj, scope)
+            if lines is None:
+                continue
+            serialized += 1
+            assert ["".join(part["chars"] for part in line) for line in lines] == text.splitlines()
+            assert lines == _fresh(colorize, text, scope)
+    # most, some are left for the grammar
+    assert serialized > 250
+
+
+def test_serialize_matches_the_grammar():
+    colorize = Colorize(share_dir=SHARE_DIR)
+    obj = {
+        "changed": False,
+        "cmd": ["ls", "-l", "/tmp"],
+        "delta": "0:00:00.003",
+        "empty": {},
+        "nested": [{"a": 1.5, "b": None}, [1e20, "it's"], []],
+        "rc": 0,
+        "start": "2021-01-01 10:00:00.123",
+        "stdout": 'total 0\n\tsome output with "quotes" and é ' + "word " * 30,
+        "true": "yes",
+        10: "x: y",
+    }
+    text = yaml.dump(obj, default_flow_style=False, Dumper=Dumper, explicit_start=True)
+    assert colorize.serialize(obj, "source.yaml") == _fresh(colorize, text, "source.yaml")
+    json_obj = {str(key): value for key, value in obj.items()}
+    text = json.dumps(json_obj, indent=4, sort_keys=True)
+    assert colorize.serialize(json_obj, "source.json") == _fresh(colorize, text, "source.json")
+
+    # left for the grammar, an alias and a type only the yaml representer knows of
+    assert colorize.serialize({"a": obj["cmd"], "b": obj["cmd"]}, "source.yaml") is None
+    assert colorize.serialize({"a": (1, 2)}, "source.yaml") is None
+    assert colorize.serialize({"a": float("nan")}, "source.json") is None
@@ -0,0 +1,179 @@
+import functools
+import threading
+
+from ansible_navigator.ui_framework.content_cache import ContentCache
+from ansible_navigator.ui_framework.content_cache import Skipped
+from ansible_navigator.ui_framework.content_cache import digest
+from ansible_navigator.ui_framework.curses_defs import CursesLinePart
+from ansible_navigator.ui_framework.curses_defs import CursesLineStore
+from ansible_navigator.ui_framework.utils import touch
+from ansible_navigator.ui_framework.virtual_screen import ScriptedKeys
+from ansible_navigator.ui_framework.virtual_screen import VirtualScreen
+from ansible_navigator.ui_framework.virtual_screen import virtual_curses
+
+from .benchmarks.ui_frames import headless_ui
+from .benchmarks.ui_frames import task_rows
+
+
+def _finish(colorized):
+    return CursesLineStore([(CursesLinePart(column=0, string=colorized, color=0, decoration=0),)])
+
+
+def _counts(cache):
+    info = cache.cache_info()
+    return {name: info[name] for name in ("hits", "misses", "prefetched", "size")}
+
+
+def test_key():
+    row = {"a": 1}
+    # the text isn't kept in the key
+    assert ContentCache.key("text", "xform") == (digest("text"), "xform")
+    assert ContentCache.key(row, "xform") == (id(row), 0, "xform")
+    touch(row)
+    assert ContentCache.key(row, "xform") != (id(row), 0, "xform")
+    assert ContentCache.key(["not", "cached"], "xform") is None
+
+
+def test_lines_cached():
+    cache = ContentCache()
+    rendered = []
+    render = lambda obj: rendered.append(obj) or obj.upper()
+    lines = cache.lines("one", ("one",), render, _finish)
+    assert lines.text(0) == "ONE"
+    assert cache.lines("one", ("one",), render, _finish) is lines
+    assert rendered == ["one"]
+    assert _counts(cache) == {"hits": 1, "misses": 1, "prefetched": 0, "size": 1}
+    assert cache.cache_info()["bytes"] == lines.nbytes()
+
+
+def test_bounded_by_bytes():
+    lines = _finish("x" * 1000)
+    # room for about two
+    cache = ContentCache(max_bytes=lines.nbytes() * 5 // 2)
+    for text in ("one", "two", "six"):
+        cache.lines(text, (text,), lambda obj: obj * 334, _finish)
+    info = cache.cache_info()
+    assert (info["size"], info["evictions"]) == (2, 1)
+    assert info["evicted_bytes"] == info["bytes"] // 2
+    # the oldest went first
+    assert list(cache._entries) == [("two",), ("six",)]
+    # too big to keep, but still shown
+    big = cache.lines("big", ("big",), lambda obj: obj * 5000, _finish)
+    assert big.text(0).startswith("bigbig")
+    info = cache.cache_info()
+    assert (info["size"], info["too_big"]) == (2, 1)
+    assert info["bytes"] <= info["max_bytes"]
+
+
+def test_prefetch_waits_and_cancels():
+    cache = ContentCache()
+    started = threading.Event()
+    release = threading.Event()
+
+    def render(obj):
+        started.set()
+        release.wait()
+        return obj.upper()
+
+    cache.prefetch([("one", ("one",)), ("two", ("two",))], render)
+    started.wait()
+    # two hasn't started, it's cancelled when no longer wanted
+    cache.prefetch([("one", ("one",))], render)
+    release.set()
+    assert cache.lines("one", ("one",), render, _finish).text(0) == "ONE"
+    assert _counts(cache) == {"hits": 1, "misses": 0, "prefetched": 2, "size": 1}
+
+
+def test_neighbours_prefetched():
+    rows = task_rows(10)
+    screen = VirtualScreen(height=10, width=80, keys=ScriptedKeys(["+"]))
+    with virtual_curses(screen):
+        ui = headless_ui()
+        ui.show(rows, columns=["__task"], await_input=False)
+        interaction = ui.show(rows, index=4)
+        assert interaction.action.value == 5
+        ui.show(rows, index=5, await_input=False)
+    # 4 and 6 either side of 5, then 7 after moving forward
+    info = ui._content_cache.cache_info()
+    assert (info["hits"], info["misses"], info["prefetched"]) == (1, 1, 4)
+
+
+def test_neighbours_prefetched_once():
+    rows = task_rows(10)
+    screen = VirtualScreen(height=10, width=80)
+    with virtual_curses(screen):
+        ui = headless_ui()
+        ui.show(rows, columns=["__task"], await_input=False)
+        prefetch = ui._content_cache.prefetch
+        calls = []
+        ui._content_cache.prefetch = lambda *args: calls.append(args) or prefetch(*args)
+        # refreshed, eg while a playbook runs
+        for _refresh in range(3):
+            ui.show(rows, index=4, await_input=False)
+        assert len(calls) == 1
+        touch(rows[4])
+        ui.show(rows, index=4, await_input=False)
+        ui.show(rows, index=5, await_input=False)
+    assert len(calls) == 3
+
+
+def test_skipped_and_shutdown():
+    cache = ContentCache()
+    started = threading.Event()
+    release = threading.Event()
+
+    def render(obj):
+        if obj == "skip":
+            raise Skipped()
+        started.set()
+        release.wait()
+        return obj.upper()
+
+    cache.prefetch([("skip", ("skip",))], render)
+    # given way in the background, rendered by the caller
+    assert cache.lines("skip", ("skip",), lambda obj: "shown", _finish).text(0) == "shown"
+
+    cache.prefetch([("one", ("one",)), ("two", ("two",))], render)
+    started.wait()
+    executor = cache._executor
+    cache.shutdown()
+    assert cache._executor is None
+    # the one waiting is cancelled, the one running isn't waited for
+    assert cache._entries[("two",)].future.cancelled()
+    assert not cache._entries[("one",)].future.done()
+    release.set()
+    executor.shutdown(wait=True)
+    assert cache.lines("two", ("two",), str.upper, _finish).text(0) == "TWO"
+
+
+def test_failed_prefetch_rendered_again():
+    cache = ContentCache()
+
+    def render(obj):
+        raise RuntimeError("dictionary changed size during iteration")
+
+    cache.prefetch([("fail", ("fail",))], render)
+    assert cache.lines("fail", ("fail",), lambda obj: "again", _finish).text(0) == "again"
+
+
+def test_prefetch_gives_way_to_the_screen():
+    doc = "".join("line {idx}\n".format(idx=idx) for idx in range(100))
+    with virtual_curses(VirtualScreen(height=10, width=80)):
+        ui = headless_ui()
+        render = functools.partial(
+            ui._render_content, xform="text.html.markdown", filter_keys=None, background=True
+        )
+        # the screen's worth
+        assert len(render(doc).colored) == 10
+        skipped = []
+        with ui._colorizer_held(background=False):
+            try:
+                render(doc)
+            except Skipped:
+                skipped.append("waiting")
+        ui.close()
+        try:
+            render(doc)
+        except Skipped:
+            skipped.append("closed")
+    assert skipped == ["waiting", "closed"]
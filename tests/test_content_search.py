@@ -0,0 +1,107 @@
+import curses
+import re
+
+from ansible_navigator.ui_framework.content_search import ContentSearch
+from ansible_navigator.ui_framework.curses_defs import CursesLinePart
+from ansible_navigator.ui_framework.curses_defs import CursesLineStore
+from ansible_navigator.ui_framework.virtual_screen import ScriptedKeys
+from ansible_navigator.ui_framework.virtual_screen import VirtualScreen
+from ansible_navigator.ui_framework.virtual_screen import virtual_curses
+
+from .benchmarks.ui_frames import TASK_COLUMNS
+from .benchmarks.ui_frames import headless_ui
+from .benchmarks.ui_frames import task_rows
+
+
+def _store(texts):
+    store = CursesLineStore()
+    for text in texts:
+        store.append((CursesLinePart(column=0, string=text, color=0, decoration=0),))
+    return store
+
+
+def test_next_and_previous():
+    lines = _store("line {idx}".format(idx=idx) for idx in range(100))
+    search = ContentSearch(re.compile(r"[37]$"), lines)
+    assert search.next_match(0, 9, 1) == 3
+    assert search.next_match(3, 12, 1) == 7
+    assert search.next_match(3, 12, -1) == 3
+    # the last match isn't showing, start from what is
+    assert search.next_match(50, 59, 1) == 53
+    assert search.next_match(90, 99, 1) == 93
+    assert search.next_match(93, 99, 1) == 97
+    # wrap around
+    assert search.next_match(97, 99, 1) == 3
+    assert search.next_match(0, 2, -1) == 97
+
+
+def test_background_index():
+    lines = _store("line {idx}".format(idx=idx) for idx in range(100000))
+    search = ContentSearch(re.compile(r"9999"), lines, background_lines=1000)
+    search.update()
+    assert search.indexing or search.matches
+    search._thread.join()
+    assert search.matches == [idx for idx in range(100000) if "9999" in str(idx)]
+
+
+def test_highlight():
+    line = (
+        CursesLinePart(column=0, string="key: ", color=1, decoration=0),
+        CursesLinePart(column=5, string="value", color=2, decoration=0),
+    )
+    search = ContentSearch(re.compile(r": va"), _store([]))
+    (highlighted,) = search.highlight((line,))
+    assert highlighted == (
+        CursesLinePart(column=0, string="key", color=1, decoration=0),
+        CursesLinePart(column=3, string=": ", color=1, decoration=curses.A_REVERSE),
+        CursesLinePart(column=5, string="va", color=2, decoration=curses.A_REVERSE),
+        CursesLinePart(column=7, string="lue", color=2, decoration=0),
+    )
+
+
+def test_search_headless():
+    obj = {"key_{idx:02}".format(idx=idx): idx for idx in range(50)}
+    keys = ScriptedKeys(["/", "2", "\n", "n", "n", "N"])
+    screen = VirtualScreen(height=10, width=80, keys=keys)
+    with virtual_curses(screen):
+        ui = headless_ui()
+        ui.show(obj)
+    # key_02, key_12, key_20 then back to key_12 at the top
+    assert screen.line(0) == "13│key_12: 12"
+    assert "14 matches" in screen.line(9)
+    assert screen.attrs(0)[8] & curses.A_REVERSE
+
+
+def test_search_keys_only_for_content():
+    keys = ScriptedKeys(["/", "KEY_DOWN"])
+    screen = VirtualScreen(height=10, width=120, keys=keys)
+    entries = []
+    with virtual_curses(screen):
+        ui = headless_ui()
+        display = ui._display
+
+        def recorded(*args, **kwargs):
+            entries.append(display(*args, **kwargs))
+            return entries[-1]
+
+        ui._display = recorded
+        ui.show(task_rows(20), columns=TASK_COLUMNS)
+    # the / was ignored by the menu
+    assert entries == ["KEY_DOWN", "KEY_F(5)"]
+
+
+def test_search_reset_for_other_content():
+    first = {"key_{idx:02}".format(idx=idx): idx for idx in range(50)}
+    keys = ScriptedKeys(["/", "2", "\n"])
+    screen = VirtualScreen(height=10, width=80, keys=keys)
+    with virtual_curses(screen):
+        ui = headless_ui()
+        ui.show(first)
+        assert "14 matches" in screen.line(9)
+        # shown again, eg refreshed, the search is kept
+        ui.show(first)
+        assert "14 matches" in screen.line(9)
+        ui.show({"other": 2})
+        assert "matches" not in screen.line(9)
+        ui.show(first)
+    assert "matches" not in screen.line(9)
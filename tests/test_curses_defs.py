@@ -0,0 +1,77 @@
+from ansible_navigator.ui_framework.curses_defs import CursesLinePart
+from ansible_navigator.ui_framework.curses_defs import CursesLineStore
+from ansible_navigator.ui_framework.curses_defs import WindowLineStore
+
+
+LINES = (
+    (
+        CursesLinePart(column=0, string="key", color=256, decoration=0),
+        CursesLinePart(column=3, string=": ", color=0, decoration=0),
+        CursesLinePart(column=5, string="value", color=512, decoration=4),
+    ),
+    (),
+    (CursesLinePart(column=2, string="indented", color=0, decoration=0),),
+)
+
+
+def test_store_round_trip():
+    store = CursesLineStore(LINES)
+    assert len(store) == 3
+    assert tuple(store) == LINES
+    assert store[0] == LINES[0]
+    assert store[-1] == LINES[-1]
+
+
+def test_store_slice_and_text():
+    store = CursesLineStore(LINES)
+    assert store[1:3] == LINES[1:3]
+    assert store.text(0) == "key: value"
+    assert store.text(1) == ""
+    assert list(store.runs(0)) == [(0, 3, 256, 0), (3, 2, 0, 0), (5, 5, 512, 4)]
+
+
+def test_store_append_runs_skips_empty():
+    store = CursesLineStore()
+    store.append_runs("", [(0, 0, 0, 0)])
+    store.append_runs("abc", [(0, 1, 0, 0), (1, 2, 256, 0)])
+    assert store[0] == ()
+    assert store[1] == (
+        CursesLinePart(column=0, string="a", color=0, decoration=0),
+        CursesLinePart(column=1, string="bc", color=256, decoration=0),
+    )
+
+
+def test_store_index_error():
+    store = CursesLineStore(LINES)
+    try:
+        store[3]  # pylint: disable=pointless-statement
+    except IndexError:
+        return
+    raise AssertionError("expected IndexError")
+
+
+def test_window_store_fills_around_the_lines_asked_for():
+    texts = ["line {idx}".format(idx=idx) for idx in range(1000)]
+    fills = []
+
+    def fill(start, stop):
+        fills.append((start, stop))
+        return [
+            (text, [(0, len(text), idx, 0)]) for idx, text in enumerate(texts[start:stop], start)
+        ]
+
+    store = WindowLineStore(texts, fill, ring_lines=20)
+    assert store[995:] == tuple(
+        (CursesLinePart(column=0, string=text, color=idx, decoration=0),)
+        for idx, text in enumerate(texts[995:], 995)
+    )
+    # the end only, up to the line already filled
+    assert fills == [(995, 1000)]
+    assert store[990:996][0][0].string == "line 990"
+    assert fills == [(995, 1000), (990, 995)]
+    # the source grows, the store with it
+    texts.append("line 1000")
+    assert len(store) == 1001
+    assert store.text(1000) == "line 1000"
+    assert list(store.runs(1000)) == [(0, 9, 1000, 0)]
+    assert store.filled == 11
@@ -0,0 +1,52 @@
+import json
+import re
+
+from argparse import Namespace
+from unittest import mock
+
+import pytest
+
+from ansible_navigator.ui_framework.utils import ROW_CLOCK
+from ansible_navigator.ui_framework.utils import row_version
+
+explore = pytest.importorskip("ansible_navigator.actions.explore")
+
+
+def _artifact(path):
+    tasks = [
+        {"__result": "OK", "__changed": bool(idx % 2), "__task": "task {idx}".format(idx=idx)}
+        for idx in range(3)
+    ]
+    play = {"__play_name": "play", "__percent_complete": "0%", "tasks": tasks}
+    with open(path, "w", encoding="utf-8") as fhand:
+        artifact = {
+            "version": "1.0.0",
+            "plays": [play],
+            "stdout": [],
+            "status": "successful",
+            "status_color": 10,
+        }
+        json.dump(artifact, fhand)
+
+
+def test_row_versions_forgotten_on_exit(tmp_path):
+    artifact = tmp_path / "artifact.json"
+    _artifact(artifact)
+    action = explore.Action(args=Namespace())
+    match = re.match(action.KEGEX, "load {artifact}".format(artifact=artifact))
+    interaction = mock.MagicMock()
+    interaction.action.match = match
+    interaction.ui.scroll.return_value = 0
+    app = mock.MagicMock()
+    app.args = Namespace(app="welcome")
+    touched = []
+
+    def show(obj, **_kwargs):
+        touched.extend(row_version(play) for play in obj)
+
+    interaction.ui.show.side_effect = show
+    action.run(interaction=interaction, app=app)
+    # the plays were shown with their stats, then the user went back
+    assert touched and touched[0] != 0
+    rows = [action._plays.value[0]] + action._plays.value[0]["tasks"]
+    assert not any(id(row) in ROW_CLOCK.versions for row in rows)
@@ -0,0 +1,37 @@
+from ansible_navigator.ui_framework.menu_builder import MenuBuilder
+from ansible_navigator.ui_framework.menu_builder import MenuLineCache
+from ansible_navigator.ui_framework.utils import touch
+from ansible_navigator.ui_framework.virtual_screen import VirtualScreen
+from ansible_navigator.ui_framework.virtual_screen import virtual_curses
+
+
+def _strings(lines):
+    return [[part.string for part in line] for line in lines]
+
+
+def test_lines_cached_until_touched():
+    rows = [{"__name": "one", "__% done": "50%"}, {"__name": "two", "__% done": "100%"}]
+    columns = ["__name", "__% done"]
+    cache = MenuLineCache()
+    with virtual_curses(VirtualScreen()):
+        builder = MenuBuilder(
+            pbar_width=4,
+            screen_w=30,
+            number_colors=16,
+            color_menu_item=lambda *_args: 0,
+            line_cache=cache,
+        )
+        _heading, lines = builder.build(rows, columns, (0, 1))
+        assert _strings(lines) == [["one", " 50% ▇▇  "], ["two", "100% ▇▇▇▇"]]
+        # the rows aren't changed to show the progress bar
+        assert rows[0]["__% done"] == "50%"
+
+        rows[0]["__name"] = "uno"
+        _heading, again = builder.build(rows, columns, (0, 1))
+        assert again == lines
+        assert cache.cache_info() == {"hits": 2, "misses": 2, "size": 2}
+
+        touch(rows[0])
+        _heading, again = builder.build(rows, columns, (0, 1))
+        assert again[0][0].string == "uno"
+        assert again[1] is lines[1]
@@ -0,0 +1,58 @@
+import json
+import re
+
+from ansible_navigator.ui_framework.menu_filter import MenuFilterCache
+from ansible_navigator.ui_framework.utils import ROW_CLOCK
+from ansible_navigator.ui_framework.utils import forget
+from ansible_navigator.ui_framework.utils import row_version
+from ansible_navigator.ui_framework.utils import touch
+
+COLUMNS = ["__result", "__task"]
+
+
+def rows(count):
+    return [{"__result": "OK", "__task": "task {idx}".format(idx=idx)} for idx in range(count)]
+
+
+def test_appended_rows_only_tested():
+    cache = MenuFilterCache()
+    regex = re.compile("task 1")
+    menu = rows(20)
+    assert cache.indicies(regex, menu, COLUMNS) == (1, 10, 11, 12, 13, 14, 15, 16, 17, 18, 19)
+    assert cache.misses == 20
+    menu.extend(rows(2))
+    assert cache.indicies(regex, menu, COLUMNS)[-2:] == (19, 21)
+    assert cache.misses == 22
+    cache.indicies(regex, menu, COLUMNS)
+    assert cache.misses == 22
+
+
+def test_touched_rows_retested():
+    cache = MenuFilterCache()
+    regex = re.compile("FAILED")
+    menu = rows(5)
+    assert cache.indicies(regex, menu, COLUMNS) == ()
+    menu[3]["__result"] = "FAILED"
+    touch(menu[3])
+    assert cache.indicies(regex, menu, COLUMNS) == (3,)
+    assert cache.misses == 6
+
+
+def test_touch_leaves_the_row_alone():
+    menu = rows(2)
+    before = json.dumps(menu)
+    touch(menu[0])
+    # versions aren't written to the row, eg into an artifact
+    assert json.dumps(menu) == before
+    assert row_version(menu[0]) == ROW_CLOCK.now
+    assert row_version(menu[1]) == 0
+    forget(menu[0])
+    assert row_version(menu[0]) == 0
+
+
+def test_new_filter_empties_cache():
+    cache = MenuFilterCache()
+    menu = rows(5)
+    cache.indicies(re.compile("OK"), menu, COLUMNS)
+    assert cache.indicies(re.compile("task 4"), menu, COLUMNS) == (4,)
+    assert cache.cache_info()["size"] == 1
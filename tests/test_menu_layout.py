@@ -0,0 +1,53 @@
+import random
+
+from ansible_navigator.ui_framework.menu_layout import MenuLayoutCache
+from ansible_navigator.ui_framework.menu_layout import column_layout
+from ansible_navigator.ui_framework.utils import distribute
+from ansible_navigator.ui_framework.utils import touch
+
+
+def _shrink_widest(available, weights):
+    """the original, take one from the widest columns until they fit"""
+    weights = list(weights)
+    while sum(weights) != available:
+        maxv = max(weights)
+        for idx in [i for i, j in enumerate(weights) if j == maxv]:
+            weights[idx] -= 1
+            if sum(weights) == available:
+                break
+    return weights
+
+
+def test_distribute_matches_shrinking():
+    rand = random.Random(0)
+    for _ in range(2000):
+        weights = [rand.randint(1, 40) for _ in range(rand.randint(1, 8))]
+        available = rand.randint(0, sum(weights) - 1)
+        assert distribute(available, weights) == _shrink_widest(available, weights)
+
+
+def test_distribute_when_it_fits():
+    assert distribute(10, [2, 3]) == [4, 6]
+
+
+def test_widths_grow_with_rows():
+    rows = [{"__name": "a", "__% done": "5%"}]
+    cache = MenuLayoutCache()
+    # header, progress bar is 4 + 1 + pbar_width
+    assert cache.widths(rows, ["__name", "__% done"], 11) == (4, 16)
+    rows.append({"__name": "abcdefg", "__% done": "100%"})
+    assert cache.widths(rows, ["__name", "__% done"], 11) == (7, 16)
+    rows[0]["__name"] = "abcdefghij"
+    assert cache.widths(rows, ["__name", "__% done"], 11) == (7, 16)
+    touch(rows[0])
+    assert cache.widths(rows, ["__name", "__% done"], 11) == (10, 16)
+    # widths are kept when the rows shrink, so the columns don't jump
+    rows.pop(0)
+    assert cache.widths(rows, ["__name", "__% done"], 11) == (10, 16)
+    assert cache.cache_info() == {"hits": 2, "misses": 3, "size": 1}
+
+
+def test_column_layout():
+    # the columns are widened to fill the screen
+    assert column_layout((3, 5), 20) == ((0, 8, 20), (8, 12))
+    assert column_layout((3, 9), 8) == ((0, 4, 8), (4, 4))
@@ -0,0 +1,41 @@
+import functools
+
+from ansible_navigator.stats import Stats
+from ansible_navigator.stats import lru_cache_info
+
+
+def test_timings_ring_buffer():
+    stats = Stats(ring_size=10)
+    for value in range(100):
+        stats.record("stage", value / 1000)
+    timing = stats.summary()["timings"]["stage"]
+    assert timing["count"] == 10
+    assert timing["p50_ms"] == 95
+    assert timing["max_ms"] == 99
+
+
+def test_timer_and_gauge():
+    stats = Stats()
+    with stats.timer("block"):
+        pass
+    stats.gauge("depth", 3)
+    summary = stats.summary()
+    assert summary["timings"]["block"]["count"] == 1
+    assert summary["gauges"] == {"depth": 3}
+
+
+def test_cache_hit_rate():
+    @functools.lru_cache(maxsize=None)
+    def double(value):
+        return value * 2
+
+    stats = Stats()
+    stats.register_cache("double", lru_cache_info(double))
+    for value in (1, 1, 1, 2):
+        double(value)
+    assert stats.summary()["caches"]["double"] == {
+        "hits": 2,
+        "misses": 2,
+        "size": 2,
+        "hit_rate": 0.5,
+    }
@@ -0,0 +1,75 @@
+import re
+
+from ansible_navigator.tm_tokenize.reg import BACKREF_CACHE_SIZE
+from ansible_navigator.tm_tokenize.reg import make_backref_reg
+from ansible_navigator.tm_tokenize.reg import make_expanded_reg
+from ansible_navigator.tm_tokenize.reg import make_reg
+from ansible_navigator.tm_tokenize.rules import Entry
+from ansible_navigator.tm_tokenize.scopes import SCOPES
+from ansible_navigator.tm_tokenize.state import State
+
+
+def _entry(name):
+    return Entry(SCOPES.intern((name,)), None, ("", 0))
+
+
+def test_push_pop_share_the_stack():
+    root = State.root(_entry("root"))
+    state = root.push(_entry("a")).push(_entry("b"))
+    assert state.parent.parent is root
+    assert state.pop().pop() is root
+    assert [SCOPES[entry.scope] for entry in state.entries] == [("root",), ("a",), ("b",)]
+
+
+def test_equal_states_hash_equal():
+    first = State.root(_entry("root")).push(_entry("a"))
+    second = State.root(_entry("root")).push(_entry("a"))
+    assert first is not second
+    assert first == second
+    assert hash(first) == hash(second)
+    assert first != first.push(_entry("b")).pop().push(_entry("c"))
+    assert len({first, second}) == 1
+
+
+def test_deep_states_hash_and_compare():
+    first = second = State.root(_entry("root"))
+    for _ in range(5000):
+        first = first.push(_entry("a"))
+        second = second.push(_entry("a"))
+    assert hash(first) == hash(second)
+    assert first == second
+    assert first != second.pop().push(_entry("b"))
+    assert first.pop() != second
+
+
+def test_while_states():
+    state = State.root(_entry("root"))
+    state = state.push_while("outer", _entry("quote")).push(_entry("a"))
+    state = state.push_while("inner", _entry("list")).push(_entry("b"))
+    whiles = state.while_states()
+    assert [while_state.while_rule for while_state in whiles] == ["outer", "inner"]
+    assert SCOPES[whiles[0].pop_while().cur.scope] == ("root",)
+
+
+def test_expanded_regs_are_bounded():
+    static = make_expanded_reg(re.match("(a)", "a"), "^end$")
+    assert static is make_reg("^end$")
+
+    make_backref_reg.cache_clear()
+    for count in range(BACKREF_CACHE_SIZE + 10):
+        match = re.match("(\\w+)", f"EOF{count}")
+        reg = make_expanded_reg(match, "^\\1$")
+        assert reg.search(f"EOF{count}", 0, True, True)
+    assert make_expanded_reg(match, "^\\1$") is reg
+    info = make_backref_reg.cache_info()
+    assert info.currsize == BACKREF_CACHE_SIZE
+    assert info.hits == 1
+
+
+def test_scopes_interned():
+    scope_id = SCOPES.intern(("source.yaml",))
+    pushed = SCOPES.push(scope_id, ("string.quoted", "punctuation"))
+    assert SCOPES[pushed] == ("source.yaml", "string.quoted", "punctuation")
+    assert SCOPES.push(scope_id, ("string.quoted", "punctuation")) == pushed
+    assert SCOPES.intern(("source.yaml", "string.quoted", "punctuation")) == pushed
+    assert SCOPES.push(pushed, ()) == pushed
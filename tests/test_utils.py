@@ -0,0 +1,38 @@
+import os
+
+from ansible_navigator.utils import FileTail
+
+
+def test_file_tail(tmp_path):
+    path = str(tmp_path / "navigator.log")
+    tail = FileTail(path)
+    assert tail.read() == 0
+
+    with open(path, "w") as fhand:
+        fhand.write("one\ntwo\nthr")
+    assert tail.read() == 2
+    assert tail.lines == ["one", "two"]
+    # only what was added, the partial line once it's complete
+    with open(path, "a") as fhand:
+        fhand.write("ee\n\n")
+    lines = tail.lines
+    assert tail.read() == 2
+    assert tail.lines is lines
+    assert lines == ["one", "two", "three", ""]
+    assert tail.offset == os.path.getsize(path)
+
+    # truncated, eg at startup, read again from the start into new lines
+    with open(path, "w") as fhand:
+        fhand.write("new\n")
+    assert tail.read() == 1
+    assert tail.lines == ["new"]
+    assert lines == ["one", "two", "three", ""]
+    assert tail.resets == 1
+
+    # replaced, even if it's longer
+    with open(path + ".new", "w") as fhand:
+        fhand.write("other\nfile\n")
+    os.replace(path + ".new", path)
+    tail.read()
+    assert tail.lines == ["other", "file"]
+    assert tail.resets == 2
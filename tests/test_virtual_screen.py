@@ -0,0 +1,153 @@
+import curses
+
+from ansible_navigator.ui_framework import Tail
+from ansible_navigator.ui_framework.colorize import AnsiLineStore
+from ansible_navigator.ui_framework.virtual_screen import ScriptedKeys
+from ansible_navigator.ui_framework.virtual_screen import VirtualScreen
+from ansible_navigator.ui_framework.virtual_screen import keyname
+from ansible_navigator.ui_framework.virtual_screen import virtual_curses
+
+from .benchmarks.ui_frames import TASK_COLUMNS
+from .benchmarks.ui_frames import headless_ui
+from .benchmarks.ui_frames import task_rows
+
+
+def test_keyname():
+    assert keyname(curses.KEY_DOWN) == b"KEY_DOWN"
+    assert keyname(curses.KEY_F5) == b"KEY_F(5)"
+    assert keyname(6) == b"^F"
+    assert keyname(ord("7")) == b"7"
+
+
+def test_scripted_keys():
+    keys = ScriptedKeys(["KEY_UP", "q", 10])
+    keys.push("KEY_DOWN")
+    assert [keys.get() for _ in range(5)] == [curses.KEY_DOWN, curses.KEY_UP, ord("q"), 10, -1]
+
+
+def test_addstr_errors_at_last_cell():
+    screen = VirtualScreen(height=2, width=4)
+    screen.addstr(0, 0, "abcdef")
+    assert screen.text() == "abcd\nef"
+    try:
+        screen.addstr(1, 2, "xy")
+    except curses.error:
+        assert screen.line(1) == "efxy"
+        return
+    raise AssertionError("expected curses.error")
+
+
+def test_curses_restored():
+    original = curses.color_pair
+    with virtual_curses(VirtualScreen()):
+        assert curses.color_pair(2) == 2 << 8
+    assert curses.color_pair is original
+
+
+def test_menu_headless():
+    screen = VirtualScreen(height=10, width=120, keys=ScriptedKeys(["KEY_DOWN"]))
+    with virtual_curses(screen):
+        ui = headless_ui()
+        interaction = ui.show(task_rows(20), columns=TASK_COLUMNS)
+    assert interaction.name == "refresh"
+    heading = ["RESULT", "HOST", "NUMBER", "CHANGED", "TASK", "TASK", "ACTION"]
+    assert screen.line(0).split() == heading
+    # scrolled down by one
+    assert screen.line(1).startswith(" 1│FAILED")
+    assert screen.refreshes == 2
+
+
+def test_content_headless():
+    screen = VirtualScreen(height=10, width=80)
+    with virtual_curses(screen):
+        ui = headless_ui()
+        ui.show({"key": "value"})
+    assert screen.line(0) == "0│---"
+    assert screen.line(1) == "1│key: value"
+
+
+def test_held_keys_one_frame():
+    keys = ScriptedKeys(["KEY_DOWN"] * 5 + ["KEY_NPAGE", "KEY_UP", "7", "KEY_DOWN"])
+    screen = VirtualScreen(height=10, width=120, keys=keys)
+    with virtual_curses(screen):
+        ui = headless_ui()
+        interaction = ui.show(task_rows(40), columns=TASK_COLUMNS)
+    # 8 rows showing, scrolled down 5, a page of 8 then up 1
+    assert screen.line(1).startswith("12│")
+    # the first frame, then one for all the keys before the 7
+    assert interaction.name == "select"
+    assert interaction.action.value == 7
+    assert screen.refreshes == 2
+    assert len(keys) == 1
+
+
+def test_content_tokenized_from_the_top():
+    obj = "---\n" + "".join("key_{idx:04}: {idx}\n".format(idx=idx) for idx in range(2000))
+    screen = VirtualScreen(height=10, width=80, keys=ScriptedKeys(["KEY_NPAGE"]))
+    with virtual_curses(screen):
+        ui = headless_ui()
+        ui._tokenize_rest = lambda lines: None
+        ui.show(obj, xform="text.html.markdown")
+        lines = ui._filter_and_serialize(obj)[1]
+    # the first screens, not all 2001 lines
+    assert len(lines) == 2001
+    assert lines.filled < 2001
+    assert screen.line(0).startswith("   9│key_0008: 8")
+
+
+def test_content_serialized_in_color():
+    obj = {"key_{idx:04}".format(idx=idx): idx for idx in range(2000)}
+    screen = VirtualScreen(height=10, width=80)
+    with virtual_curses(screen):
+        ui = headless_ui()
+        ui.show(obj, xform="source.yaml", await_input=False)
+        lines = ui._filter_and_serialize(obj)[1]
+    assert len(lines) == 2001
+    # the key and value each in the theme's color
+    assert [part.string for part in lines[1]] == ["key_0000", ": ", "0"]
+    assert len({part.color for part in lines[1]}) == 3
+
+
+def test_stream_shows_the_end():
+    stdout = ["\x1b[0;32mok: [host{idx}]\x1b[0m".format(idx=idx) for idx in range(100000)]
+    screen = VirtualScreen(height=10, width=80)
+    with virtual_curses(screen):
+        ui = headless_ui()
+        lines = AnsiLineStore(stdout)
+        ui.scroll(len(stdout))
+        ui.show(obj=lines, xform="source.ansi", await_input=False)
+        stdout.append("done")
+        ui.scroll(len(stdout))
+        ui.show(obj=lines, xform="source.ansi", await_input=False)
+    assert screen.line(8).startswith("100000│done ")
+    assert screen.line(7).startswith(" 99999│ok: [host99999]")
+    # only the lines showing
+    assert lines.converted < 20
+
+
+def test_tail_shows_the_end():
+    log = ['{{"counter": {idx}, "ok": true}}'.format(idx=idx) for idx in range(50000)]
+    screen = VirtualScreen(height=10, width=80)
+    with virtual_curses(screen):
+        ui = headless_ui()
+        for _ in range(2):
+            ui.scroll(len(log))
+            ui.show(obj=Tail(log), xform="source.json", await_input=False)
+            log.append('{"done": true}')
+        lines = ui._filter_and_serialize(Tail(log))[1]
+    assert screen.line(8).startswith('50000│{"done": true}')
+    # the same store as the lines grew, only the lines showing were colored
+    assert len(lines) == 50002
+    assert lines.filled < 20
+    assert len({part.color for part in lines[50000]}) > 1
+
+
+def test_theme_palette():
+    screen = VirtualScreen(height=10, width=80)
+    with virtual_curses(screen, colors=16):
+        ui = headless_ui()
+        # every color in the theme is mapped to a color pair up front
+        assert set(ui._palette) == ui._colorizer.theme_colors() | {None}
+        ui.show({"key": "value"})
+    key_color = ui._colorizer.render("key: value", "source.yaml")[0][0]["color"]
+    assert screen.attrs(1)[2] == ui._palette[key_color] != 0